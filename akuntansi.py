@@ -0,0 +1,156 @@
+import pandas as pd
+
+from buku_besar import BatchPosting
+from skema import SKEMA_INVENTARIS, terapkan_skema
+
+# --- LOGIKA AKUNTANSI ---
+# Posting, saldo, dan laporan tanpa Streamlit. jamfix.py hanya memanggil fungsi
+# di sini lalu menampilkan hasilnya; benchmark.py memakai fungsi yang sama.
+# Modul ini diimpor sekali per proses, jadi tidak ikut dievaluasi ulang setiap rerun.
+
+KOLOM_DAFTAR_PEMBELIAN = ['item', 'qty', 'satuan', 'harga', 'metode_bayar']
+
+# Akun debit penjualan & akun kredit pembelian per metode pembayaran
+AKUN_PENJUALAN = {'Tunai': 'Kas', 'Kredit': 'Piutang Usaha'}
+AKUN_PEMBELIAN = {'Tunai': 'Kas', 'Kredit': 'Utang Usaha'}
+# Biaya bahan baku yang terpakai oleh penjualan (lihat persediaan.py)
+AKUN_HPP = 'Harga Pokok Penjualan'
+
+
+def daftar_pembelian_kosong():
+    return pd.DataFrame(columns=KOLOM_DAFTAR_PEMBELIAN)
+
+
+# --- POSTING ---
+def batch_penjualan(transaksi_id, tanggal, keranjang, batch=None):
+    # Satu baris transaksi per item keranjang, satu pasangan jurnal per metode bayar.
+    # batch: BatchPosting yang sudah ada (banyak keranjang diposting sekaligus)
+    batch = batch if batch is not None else BatchPosting()
+    total_metode = {metode: 0 for metode in AKUN_PENJUALAN}
+    for baris in keranjang:
+        total = baris['qty'] * baris['harga']
+        batch.tambah_transaksi({
+            'transaksi_id': transaksi_id, 'tanggal': tanggal, 'jenis': 'Penjualan',
+            'metode_bayar': baris['metode_bayar'], 'item': baris['item'], 'qty': baris['qty'],
+            'harga': baris['harga'], 'total': total, 'catatan': '',
+        })
+        if baris['metode_bayar'] in total_metode:
+            total_metode[baris['metode_bayar']] += total
+    for metode, total in total_metode.items():
+        if total > 0:
+            batch.tambah_jurnal(tanggal, f'Penjualan {metode} ID {transaksi_id}', total, total, AKUN_PENJUALAN[metode], 'Penjualan')
+    return batch
+
+
+def pemakaian_keranjang(matriks_resep, keranjang):
+    # Pemakaian bahan seluruh keranjang dihitung sekaligus dari matriks resep
+    return matriks_resep.pemakaian_bahan([baris['item'] for baris in keranjang], [baris['qty'] for baris in keranjang])
+
+
+def batch_hpp(tanggal, keterangan, biaya, batch):
+    # Jurnal HPP: bahan baku keluar dari persediaan menjadi beban
+    biaya = int(round(biaya))
+    if biaya > 0:
+        batch.tambah_jurnal(tanggal, keterangan, biaya, biaya, AKUN_HPP, 'Bahan Baku')
+    return batch
+
+
+def lot_pembelian(fifo, tanggal, daftar_pembelian):
+    # Satu lot HPP per baris pembelian
+    for item, qty, harga in daftar_pembelian[['item', 'qty', 'harga']].itertuples(index=False, name=None):
+        fifo.tambah(item, tanggal, qty, harga)
+
+
+def batch_pembelian(tanggal, daftar_pembelian, batch=None):
+    batch = batch if batch is not None else BatchPosting()
+    for item, qty, satuan, harga, metode_bayar in daftar_pembelian[KOLOM_DAFTAR_PEMBELIAN].itertuples(index=False, name=None):
+        total_harga = qty * harga
+        batch.tambah_transaksi({
+            'transaksi_id': '', 'tanggal': tanggal, 'jenis': 'Pembelian', 'metode_bayar': metode_bayar,
+            'item': item, 'qty': qty, 'harga': harga, 'total': total_harga, 'catatan': '',
+        })
+        if metode_bayar == 'Tunai':
+            batch.tambah_jurnal(tanggal, f'Pembelian {qty} {satuan} {item}', total_harga, total_harga, 'Bahan Baku', AKUN_PEMBELIAN[metode_bayar])
+        elif metode_bayar == 'Kredit':
+            batch.tambah_jurnal(tanggal, f'Pembelian Kredit {qty} {satuan} {item}', total_harga, total_harga, 'Bahan Baku', AKUN_PEMBELIAN[metode_bayar])
+    return batch
+
+
+def batch_pelunasan(tanggal, tagihan_id, jenis, pihak, jumlah, batch=None):
+    # Pelunasan (boleh sebagian) satu tagihan buku pembantu lewat Kas
+    batch = batch if batch is not None else BatchPosting()
+    if jenis == 'Piutang':
+        batch.tambah_jurnal(tanggal, f'Pelunasan Piutang {pihak} #{tagihan_id}', jumlah, jumlah, 'Kas', AKUN_PENJUALAN['Kredit'])
+    else:
+        batch.tambah_jurnal(tanggal, f'Pelunasan Utang {pihak} #{tagihan_id}', jumlah, jumlah, AKUN_PEMBELIAN['Kredit'], 'Kas')
+    return batch
+
+
+def tambah_stok_pembelian(inventaris, daftar_pembelian):
+    # Stok bahan yang sudah ada ditambah di tempat; bahan baru ditambahkan sebagai
+    # baris baru (min_stok 10). Mengembalikan DataFrame inventaris terbaru.
+    for item, qty, satuan in daftar_pembelian[['item', 'qty', 'satuan']].itertuples(index=False, name=None):
+        ada = inventaris['item'] == item
+        if ada.any():
+            inventaris.loc[ada, 'qty'] += qty
+        else:
+            new_item = {'item': item, 'qty': qty, 'satuan': satuan, 'min_stok': 10, 'status': 'Cukup'}
+            inventaris = terapkan_skema(pd.concat([inventaris, pd.DataFrame([new_item])], ignore_index=True), SKEMA_INVENTARIS)
+    return inventaris
+
+
+# --- LAPORAN ---
+# laba_rugi/neraca_saldo memakai total seluruh riwayat yang diperbarui setiap posting;
+# versi *_periode memakai tutup buku bulanan (periode.py) untuk rentang tanggal tertentu.
+# Beban pokok penjualan = saldo akun HPP (bukan total pembelian), jadi bahan yang
+# dibeli lebih dulu baru menjadi beban saat terpakai.
+def hitung_laba_rugi(total_jenis, saldo):
+    pendapatan = total_jenis.get('Penjualan', 0)
+    beban = saldo.saldo(AKUN_HPP)
+    return {'pendapatan': pendapatan, 'beban': beban, 'laba': pendapatan - beban}
+
+
+def hitung_neraca(saldo, laba):
+    neraca = {
+        'kas': saldo.saldo('Kas'),
+        'piutang': saldo.saldo('Piutang Usaha'),
+        'bahan_baku': saldo.saldo('Bahan Baku'),
+        'utang': -saldo.saldo('Utang Usaha'),
+        'laba': laba,
+    }
+    neraca['total_aset'] = neraca['kas'] + neraca['piutang'] + neraca['bahan_baku']
+    neraca['total_kewajiban_ekuitas'] = neraca['utang'] + laba
+    return neraca
+
+
+def laba_rugi(buku):
+    return hitung_laba_rugi(buku.rekap.total_jenis, buku.saldo)
+
+
+def neraca_saldo(buku):
+    # Saldo per akun diperbarui setiap posting, jadi tidak perlu memindai seluruh jurnal
+    return hitung_neraca(buku.saldo, laba_rugi(buku)['laba'])
+
+
+def laba_rugi_periode(periode, db, dari=None, sampai=None):
+    saldo, total_jenis = periode.mutasi(db, dari, sampai)
+    return hitung_laba_rugi(total_jenis, saldo)
+
+
+def neraca_saldo_periode(periode, db, sampai=None):
+    # Neraca per tanggal `sampai`: saldo & laba dari awal pembukuan s.d. tanggal itu
+    saldo, total_jenis = periode.mutasi(db, None, sampai)
+    return hitung_neraca(saldo, hitung_laba_rugi(total_jenis, saldo)['laba'])
+
+
+def grafik_dashboard(rekap):
+    # plotly baru diimpor saat Dashboard pertama kali dibuka
+    import plotly.express as px
+
+    df_tren_penjualan = rekap.tren_bulanan()
+    df_penjualan_per_produk = rekap.per_produk()
+    if df_tren_penjualan.empty:
+        return None, None
+    fig_tren = px.bar(df_tren_penjualan, x='bulan', y='total', title='Tren Penjualan dari Waktu ke Waktu')
+    fig_pie = px.pie(df_penjualan_per_produk, values='qty', names='item', title='Distribusi Penjualan Produk')
+    return fig_tren, fig_pie
@@ -0,0 +1,140 @@
+import os
+import shutil
+
+import pandas as pd
+
+from penyimpanan import KOLOM_JURNAL, KOLOM_TRANSAKSI
+from periode import akhir_periode, awal_periode
+
+# --- ARSIP PARQUET BULAN TERTUTUP ---
+# Baris transaksi & jurnal bulan yang sudah ditutup (periode.py) disalin ke file
+# Parquet per bulan:
+#
+#   <nama database>_arsip/transaksi/periode=2025-05/data.parquet
+#   <nama database>_arsip/jurnal/periode=2025-05/data.parquet
+#
+# Buku besar di memori cukup memuat baris periode berjalan; rekap & hitung ulang
+# saldo membaca arsip saat dibutuhkan, hanya partisi yang bersinggungan dengan
+# rentang tanggal dan hanya kolom yang diminta (file dibuka lewat memory-map).
+# SQLite tetap menyimpan seluruh riwayat untuk halaman jurnal/riwayat transaksi.
+#
+# Arsip bisa dibuat ulang kapan saja dari SQLite. Partisi bulan yang dibuka
+# kembali dihapus; tanpa pyarrow arsip tidak dipakai dan semua baris tetap dimuat.
+
+TABEL_ARSIP = {'transaksi': KOLOM_TRANSAKSI, 'jurnal': KOLOM_JURNAL}
+
+
+def _skema_arrow(pa):
+    teks, angka = pa.string(), pa.int64()
+    return {
+        'transaksi': pa.schema([
+            ('transaksi_id', teks), ('tanggal', pa.date32()), ('jenis', teks), ('metode_bayar', teks),
+            ('item', teks), ('qty', pa.float64()), ('harga', angka), ('total', angka), ('catatan', teks),
+        ]),
+        'jurnal': pa.schema([
+            ('tanggal', pa.date32()), ('keterangan', teks), ('debit', angka), ('kredit', angka),
+            ('akun', teks), ('kredit_akun', teks),
+        ]),
+    }
+
+
+class Arsip:
+    def __init__(self, folder):
+        self.folder = folder
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            self.pq = None
+        else:
+            self.pa, self.pq = pa, pq
+            self.skema = _skema_arrow(pa)
+
+    @classmethod
+    def untuk(cls, db):
+        return cls(os.path.splitext(os.path.abspath(db.path))[0] + '_arsip')
+
+    @property
+    def aktif(self):
+        return self.pq is not None
+
+    def _path(self, tabel, periode):
+        return os.path.join(self.folder, tabel, f'periode={periode}', 'data.parquet')
+
+    def daftar_periode(self, tabel):
+        folder = os.path.join(self.folder, tabel)
+        if not os.path.isdir(folder):
+            return []
+        return sorted(nama.split('=', 1)[1] for nama in os.listdir(folder) if nama.startswith('periode='))
+
+    def diarsipkan_sampai(self, periode_tertutup):
+        # Periode terakhir yang dirinya dan semua periode sebelumnya sudah diarsipkan
+        if not self.aktif:
+            return None
+        ada = set(self.daftar_periode('transaksi')) & set(self.daftar_periode('jurnal'))
+        batas = None
+        for periode in periode_tertutup:
+            if periode not in ada:
+                break
+            batas = periode
+        return batas
+
+    # --- TULIS ---
+    def tulis(self, db, periode):
+        dari, sampai = awal_periode(periode), akhir_periode(periode)
+        for tabel, kolom in TABEL_ARSIP.items():
+            df = db.muat_transaksi(dari, sampai) if tabel == 'transaksi' else db.muat_jurnal(dari, sampai)
+            path = self._path(tabel, periode)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # ditulis ke file sementara dulu supaya partisi tidak pernah setengah jadi
+            self.pq.write_table(self.pa.Table.from_pandas(df[kolom], schema=self.skema[tabel], preserve_index=False), path + '.tmp')
+            os.replace(path + '.tmp', path)
+
+    def hapus(self, periode):
+        for tabel in TABEL_ARSIP:
+            shutil.rmtree(os.path.dirname(self._path(tabel, periode)), ignore_errors=True)
+
+    def hapus_semua(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def lengkapi(self, db, periode_tertutup):
+        # Menyamakan arsip dengan daftar periode tertutup: partisi yang belum ada
+        # ditulis, partisi periode yang sudah dibuka kembali dihapus.
+        # Mengembalikan True kalau ada yang berubah.
+        if not self.aktif:
+            return False
+        tertutup = set(periode_tertutup)
+        berubah = False
+        for tabel in TABEL_ARSIP:
+            for periode in self.daftar_periode(tabel):
+                if periode not in tertutup:
+                    self.hapus(periode)
+                    berubah = True
+        ada = set(self.daftar_periode('transaksi')) & set(self.daftar_periode('jurnal'))
+        for periode in periode_tertutup:
+            if periode not in ada:
+                self.tulis(db, periode)
+                berubah = True
+        return berubah
+
+    # --- BACA ---
+    def baca(self, tabel, dari=None, sampai=None, kolom=None):
+        # Baris arsip bertanggal dari..sampai (None = tanpa batas) sebagai DataFrame;
+        # tanggal berupa datetime64
+        kolom = list(kolom or TABEL_ARSIP[tabel])
+        bagian = []
+        for periode in self.daftar_periode(tabel):
+            awal, akhir = awal_periode(periode), akhir_periode(periode)
+            if (dari is not None and akhir < dari) or (sampai is not None and awal > sampai):
+                continue
+            # bulan yang hanya sebagian masuk rentang perlu kolom tanggal untuk disaring
+            sebagian = (dari is not None and awal < dari) or (sampai is not None and akhir > sampai)
+            dibaca = kolom + ['tanggal'] if sebagian and 'tanggal' not in kolom else kolom
+            df = self.pq.read_table(self._path(tabel, periode), columns=dibaca, memory_map=True).to_pandas(date_as_object=False)
+            if sebagian:
+                tanggal = df['tanggal'].dt.date
+                df = df[((tanggal >= dari) if dari is not None else True) & ((tanggal <= sampai) if sampai is not None else True)][kolom]
+            bagian.append(df)
+        if not bagian:
+            return pd.DataFrame({k: pd.Series(dtype=object) for k in kolom})
+        return pd.concat(bagian, ignore_index=True)
@@ -0,0 +1,250 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import uuid
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+import akuntansi
+from buku_besar import BukuBesar
+from buku_pembantu import tagihan_impor
+from data_awal import data_awal, resep_awal
+from impor import UKURAN_CHUNK, siapkan_chunk
+from penyimpanan import Penyimpanan
+from periode import PeriodeBuku, periode_dari
+from prakiraan import PemakaianHarian, prakiraan_restock
+from resep import MatriksResep, kurangi_stok
+from skema import SKEMA_INVENTARIS, terapkan_skema
+
+# --- BENCHMARK ---
+# Menjalankan jalur-jalur utama aplikasi tanpa Streamlit di atas buku besar
+# sintetis (10 ribu / 100 ribu / 1 juta transaksi) lalu menulis hasilnya sebagai
+# JSON, supaya hasil antar rilis bisa dibandingkan.
+#
+#   python benchmark.py --ukuran 10000 100000 --output hasil.json
+#
+# Data sintetis memakai produk, bahan baku, harga, dan akun yang sama dengan
+# data awal aplikasi, dan jurnalnya dibuat lewat siapkan_chunk() (impor.py)
+# sehingga bentuknya sama dengan hasil posting kasir.
+
+UKURAN_DEFAULT = [10_000, 100_000, 1_000_000]
+ULANG_DEFAULT = 20
+ANGGOTA_KERANJANG = 3
+
+
+# --- DATA SINTETIS ---
+def buat_data_sintetis(n, seed=0, hari=3 * 365):
+    # n baris transaksi mentah (format impor): ±85% penjualan dalam keranjang
+    # (rata-rata 2.5 item) dengan transaksi_id yang sama, sisanya pembelian bahan baku
+    rng = np.random.default_rng(seed)
+    _, _, inventaris, harga_jual = data_awal()
+    produk = np.array(list(harga_jual), dtype=object)
+    bahan = inventaris['item'].to_numpy(dtype=object)
+
+    jual = rng.random(n) < 0.85
+    item = np.where(jual, produk[rng.integers(len(produk), size=n)], bahan[rng.integers(len(bahan), size=n)])
+    qty = np.where(jual, rng.integers(1, 21, size=n), rng.integers(1, 51, size=n))
+    harga = np.where(jual, np.nan, rng.integers(10, 41, size=n) * 500.0)
+    metode = np.where(rng.random(n) < 0.8, 'Tunai', 'Kredit').astype(object)
+
+    # Keranjang baru dimulai rata-rata setiap 2.5 baris penjualan; satu keranjang
+    # memakai satu transaksi_id dan satu metode bayar
+    mulai = jual & (rng.random(n) < 0.4)
+    if jual.any():
+        mulai[np.argmax(jual)] = True
+    nomor = np.cumsum(mulai) - 1
+    baris_awal = np.flatnonzero(mulai)
+    id_keranjang = np.array([str(uuid.uuid4()) for _ in range(len(baris_awal))], dtype=object)
+    transaksi_id = np.full(n, '', dtype=object)
+    transaksi_id[jual] = id_keranjang[nomor[jual]]
+    metode[jual] = metode[baris_awal[nomor[jual]]]
+
+    awal = np.datetime64(date.today()) - np.timedelta64(hari, 'D')
+    tanggal = awal + np.sort(rng.integers(0, hari, size=n)).astype('timedelta64[D]')
+
+    return pd.DataFrame({
+        'transaksi_id': transaksi_id,
+        'tanggal': tanggal,
+        'jenis': np.where(jual, 'Penjualan', 'Pembelian'),
+        'metode_bayar': metode,
+        'item': item,
+        'qty': qty,
+        'harga': harga,
+    })
+
+
+def siapkan_database(path, n, seed=0):
+    # Database SQLite berisi data awal (inventaris, harga jual, resep) + n transaksi sintetis
+    db = Penyimpanan(path)
+    _, _, inventaris, harga_jual = data_awal()
+    db.simpan(inventaris=inventaris, harga_jual=harga_jual, resep=resep_awal())
+    satuan_bahan = dict(zip(inventaris['item'], inventaris['satuan']))
+    mentah = buat_data_sintetis(n, seed)
+    for awal in range(0, n, UKURAN_CHUNK):
+        transaksi, jurnal, _, _ = siapkan_chunk(mentah.iloc[awal:awal + UKURAN_CHUNK], harga_jual, satuan_bahan)
+        # penjualan/pembelian kredit juga menjadi tagihan di buku pembantu
+        tagihan = tagihan_impor(transaksi)
+        db.simpan(transaksi=transaksi, jurnal=jurnal, tagihan=tagihan)
+    return db
+
+
+# --- JALUR YANG DIUKUR ---
+# Sama dengan jamfix.py (lewat akuntansi.py), tanpa st.session_state
+class Aplikasi:
+    def __init__(self, db):
+        self.db = db
+        self.buku = BukuBesar(db.muat_transaksi(), db.muat_jurnal())
+        self.inventaris = terapkan_skema(db.muat_inventaris(), SKEMA_INVENTARIS)
+        self.harga_jual = db.muat_harga_jual()
+        self.matriks_resep = MatriksResep(db.muat_resep())
+        self.pemakaian = PemakaianHarian.dari_db(db, self.matriks_resep)
+        self.periode = PeriodeBuku.dari_db(db)
+
+    def tutup_buku(self):
+        bulan_lalu = date.today().replace(day=1) - timedelta(days=1)
+        self.periode = self.periode.tutup(self.db, periode_dari(bulan_lalu))
+
+    def posting(self, batch):
+        self.db.simpan(transaksi=batch.transaksi, jurnal=batch.jurnal, inventaris=self.inventaris, harga_jual=self.harga_jual)
+        self.buku.posting(batch)
+
+    def penjualan(self, tanggal, keranjang):
+        # tambah_transaksi_penjualan
+        batch = akuntansi.batch_penjualan(str(uuid.uuid4()), tanggal, keranjang)
+        kurangi_stok(self.inventaris, akuntansi.pemakaian_keranjang(self.matriks_resep, keranjang))
+        self.posting(batch)
+
+    def pembelian(self, tanggal, daftar_pembelian):
+        # tambah_transaksi_pembelian
+        batch = akuntansi.batch_pembelian(tanggal, daftar_pembelian)
+        self.inventaris = akuntansi.tambah_stok_pembelian(self.inventaris, daftar_pembelian)
+        self.posting(batch)
+
+    def dashboard(self):
+        # angka ringkasan + data grafik (tanpa membuat figure plotly)
+        return akuntansi.laba_rugi(self.buku), self.buku.rekap.tren_bulanan(), self.buku.rekap.per_produk()
+
+    def laba_rugi(self):
+        return akuntansi.laba_rugi(self.buku)
+
+    def neraca_saldo(self):
+        return akuntansi.neraca_saldo(self.buku), self.buku.saldo.total_debit(), self.buku.saldo.total_kredit()
+
+    def laporan_periode(self, dari, sampai):
+        # Laba-rugi untuk rentang + neraca per akhir rentang (lewat tutup buku bulanan)
+        return akuntansi.laba_rugi_periode(self.periode, self.db, dari, sampai), akuntansi.neraca_saldo_periode(self.periode, self.db, sampai)
+
+    def jurnal_umum(self, batas=50):
+        return self.db.hitung_jurnal(), self.db.halaman_jurnal(batas)
+
+    def status_inventaris(self):
+        # Status stok dari prakiraan restock, sama dengan BukuBersama
+        self.inventaris['status'] = prakiraan_restock(self.inventaris, self.pemakaian)['status'].to_numpy()
+
+
+def _ukur(fungsi, ulang):
+    waktu = []
+    for _ in range(ulang):
+        mulai = time.perf_counter()
+        fungsi()
+        waktu.append((time.perf_counter() - mulai) * 1000)
+    waktu = np.array(waktu)
+    return {
+        'ulang': ulang,
+        'min_ms': round(float(waktu.min()), 3),
+        'median_ms': round(float(np.median(waktu)), 3),
+        'p95_ms': round(float(np.percentile(waktu, 95)), 3),
+        'max_ms': round(float(waktu.max()), 3),
+    }
+
+
+def jalankan(n, ulang=ULANG_DEFAULT, folder=None, seed=0):
+    hasil = {'jumlah_transaksi': n}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(folder or tmp, f'benchmark_{n}.db')
+        if os.path.exists(path):
+            os.remove(path)
+
+        mulai = time.perf_counter()
+        db = siapkan_database(path, n, seed)
+        hasil['siapkan_data_s'] = round(time.perf_counter() - mulai, 3)
+
+        mulai = time.perf_counter()
+        app = Aplikasi(db)
+        hasil['muat_buku_ms'] = round((time.perf_counter() - mulai) * 1000, 3)
+        hasil['jumlah_jurnal'] = len(app.buku.jurnal)
+
+        mulai = time.perf_counter()
+        app.tutup_buku()
+        hasil['tutup_buku_ms'] = round((time.perf_counter() - mulai) * 1000, 3)
+        akhir_bulan_lalu = date.today().replace(day=1) - timedelta(days=1)
+
+        rng = np.random.default_rng(seed + 1)
+        produk = list(app.harga_jual)
+        hari_ini = date.today()
+
+        def checkout():
+            keranjang = [
+                {'item': produk[i], 'qty': int(rng.integers(1, 6)), 'harga': app.harga_jual[produk[i]], 'metode_bayar': 'Tunai'}
+                for i in rng.choice(len(produk), ANGGOTA_KERANJANG, replace=False)
+            ]
+            app.penjualan(hari_ini, keranjang)
+
+        daftar_pembelian = pd.DataFrame([{'item': 'Tepung Terigu', 'qty': 5, 'satuan': 'kg', 'harga': 10000, 'metode_bayar': 'Tunai'}])
+
+        def pembelian():
+            app.pembelian(hari_ini, daftar_pembelian)
+
+        hasil['jalur'] = {
+            'checkout_penjualan': _ukur(checkout, ulang),
+            'pembelian': _ukur(pembelian, ulang),
+            'dashboard': _ukur(app.dashboard, ulang),
+            'laba_rugi': _ukur(app.laba_rugi, ulang),
+            'neraca_saldo': _ukur(app.neraca_saldo, ulang),
+            'laporan_sebulan': _ukur(lambda: app.laporan_periode(akhir_bulan_lalu.replace(day=1), akhir_bulan_lalu), ulang),
+            'laporan_setahun': _ukur(lambda: app.laporan_periode(akhir_bulan_lalu - timedelta(days=364), akhir_bulan_lalu), ulang),
+            'jurnal_umum_halaman': _ukur(app.jurnal_umum, ulang),
+            'status_inventaris': _ukur(app.status_inventaris, ulang),
+        }
+        db.conn.close()
+    return hasil
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark jalur utama aplikasi pada buku besar sintetis")
+    parser.add_argument('--ukuran', type=int, nargs='+', default=UKURAN_DEFAULT, help="jumlah transaksi sintetis (boleh lebih dari satu)")
+    parser.add_argument('--ulang', type=int, default=ULANG_DEFAULT, help="jumlah pengulangan per jalur")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--folder', help="simpan database sintetis di folder ini (default: folder sementara)")
+    parser.add_argument('--output', help="file JSON hasil (default: stdout)")
+    args = parser.parse_args(argv)
+
+    laporan = {
+        'waktu': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'hasil': [],
+    }
+    for n in args.ukuran:
+        print(f"benchmark {n:,} transaksi...", file=sys.stderr)
+        laporan['hasil'].append(jalankan(n, args.ulang, args.folder, args.seed))
+
+    teks = json.dumps(laporan, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(teks + '\n')
+    else:
+        print(teks)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,504 @@
+import queue
+import threading
+import uuid
+from concurrent.futures import Future
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+import akuntansi
+from arsip import Arsip
+from buku_besar import KOLOM_REKAP, BatchPosting, BukuBesar
+from buku_pembantu import PIHAK_UMUM, BukuPembantu, tagihan_baru, tagihan_impor, total_kredit
+from katalog import Katalog
+from penyimpanan import DataBerubah
+from periode import PeriodeBuku, akhir_periode, periode_dari
+from persediaan import PersediaanFIFO, hpp_riwayat
+from prakiraan import BATAS_PERINGATAN, PemakaianHarian, peringatan_baru, prakiraan_restock
+from resep import MatriksResep, kurangi_stok
+from skema import SKEMA_INVENTARIS, terapkan_skema
+
+# --- BUKU BESAR BERSAMA ---
+# Satu buku besar, inventaris, katalog & harga jual, dan resep untuk semua sesi dalam satu
+# proses. Setiap perubahan dikirim ke antrean dan dikerjakan satu per satu oleh
+# satu thread penulis: database ditulis lebih dulu (satu transaksi SQLite per
+# checkout/pembelian, termasuk stok), baru data di memori diperbarui, lalu
+# snapshot baru diterbitkan. posting_pesanan() menulis banyak keranjang/pembelian
+# sekaligus (API tanpa UI, kasir.py): satu transaksi SQLite, satu posting buku
+# besar, dan satu snapshot untuk seluruh batch. Pembaca cukup mengambil snapshot() terakhir tanpa
+# lock, jadi rerun sesi lain tidak pernah menunggu penulis (dan sebaliknya).
+#
+# Data yang sudah diterbitkan tidak pernah diubah lagi: penulis selalu bekerja
+# pada salinan inventaris/harga/resep lalu mengganti referensinya. Pembaca juga
+# tidak boleh mengubah isi snapshot.
+#
+# Penulis juga menutup buku (periode.py) untuk semua bulan penuh saat dibuat dan
+# setiap kali bulan berganti, lalu mengarsipkan bulan-bulan itu ke Parquet
+# (arsip.py): buku besar di memori hanya memuat baris setelah bulan terakhir
+# yang diarsipkan.
+#
+# Lot bahan baku untuk HPP FIFO (persediaan.py) juga dipegang penulis: pembelian
+# menambah lot, penjualan memakainya, dan jurnal HPP ikut dalam transaksi SQLite
+# checkout yang sama. Database lama yang belum punya HPP diputar ulang sekali saat
+# dibuka (jurnal HPP per hari). Impor massal (posting_kolom) diperlakukan sama per
+# potongan: penjualan impor dibebani HPP dari lot dan jurnal HPP per hari ditulis
+# bersama potongan itu. Lot hanya berubah kalau stok ikut diperbarui (perbarui_stok),
+# supaya lot dan stok inventaris tidak pernah berbeda arah.
+#
+# Penjualan/pembelian kredit juga menjadi tagihan di buku pembantu piutang & utang
+# (buku_pembantu.py) dalam transaksi SQLite yang sama; pelunasan() menjurnal
+# pembayarannya ke Kas.
+#
+# Status stok memakai prakiraan restock (prakiraan.py): setiap posting yang mengubah
+# stok atau pemakaian bahan menghitung ulang cakupan stok semua bahan sekali, lalu
+# bahan yang baru masuk Perlu Restock diterbitkan sebagai peringatan bernomor.
+#
+# Proses lain (kasir.py, impor.py) boleh menulis ke database yang sama. Id lot &
+# tagihan diberikan SQLite dan stok ditulis sebagai selisih, jadi tulisan kedua
+# proses tidak saling bertabrakan. Data di memori dicocokkan dengan PRAGMA
+# data_version: kalau proses lain sudah menulis, penulis memuat ulang semua data
+# sebelum perintah berikutnya (atau sendiri saat antrean kosong, diperiksa setiap
+# INTERVAL_CEK_VERSI_S detik) lalu menerbitkan snapshot baru; pembaca tidak pernah
+# menyentuh database. Penulisan yang ternyata didahului proses lain ditolak
+# Penyimpanan.simpan() (DataBerubah) lalu diulang dengan data baru.
+
+PERCOBAAN_TULIS = 3
+INTERVAL_CEK_VERSI_S = 1.0
+
+
+class Snapshot:
+    # Keadaan data bersama pada satu titik (buku: SnapshotBuku)
+    def __init__(self, buku, inventaris, katalog, resep, matriks_resep, periode, pembantu, restock, peringatan):
+        self.buku = buku
+        self.inventaris = inventaris
+        self.katalog = katalog
+        # harga berlaku per produk (dict), sama dengan katalog.harga_jual
+        self.harga_jual = katalog.harga_jual
+        self.resep = resep
+        self.matriks_resep = matriks_resep
+        self.periode = periode
+        # buku pembantu piutang & utang (tagihan belum lunas)
+        self.pembantu = pembantu
+        # prakiraan restock per bahan (urutan inventaris) & peringatan stok terakhir (tuple dict)
+        self.restock = restock
+        self.peringatan = peringatan
+
+
+def _dengan_status(inventaris, pemakaian):
+    # Status stok dari prakiraan restock; mengembalikan (inventaris, prakiraan)
+    restock = prakiraan_restock(inventaris, pemakaian)
+    inventaris['status'] = restock['status'].to_numpy()
+    return inventaris, restock
+
+
+def _selisih_stok(lama, baru):
+    # Baris inventaris `baru` yang berubah dibanding `lama`, qty berisi selisihnya
+    # (untuk Penyimpanan.simpan(stok=...)); bahan baru ikut dengan qty penuh
+    lama = lama.set_index('item').reindex(baru['item'])
+    selisih = baru['qty'].to_numpy(dtype=float) - lama['qty'].fillna(0).to_numpy(dtype=float)
+    berubah = (selisih != 0) | lama['qty'].isna().to_numpy()
+    for kolom in ('satuan', 'min_stok', 'status'):
+        berubah |= lama[kolom].to_numpy() != baru[kolom].to_numpy()
+    return baru[berubah].assign(qty=selisih[berubah])
+
+
+def _gabung_jurnal(kolom, baris):
+    # Baris jurnal batch (list dict) disambung ke jurnal berbentuk kolom (impor massal)
+    if not baris:
+        return kolom
+    tambahan = pd.DataFrame(baris)
+    tambahan['tanggal'] = pd.to_datetime(tambahan['tanggal'])
+    return {k: np.concatenate([np.asarray(kolom[k]), tambahan[k].to_numpy()]) for k in kolom}
+
+
+def _tanggal_awal(*daftar_tanggal):
+    # Tanggal paling awal dari beberapa kolom/list tanggal, None kalau semuanya kosong
+    awal = [np.min(tanggal) for tanggal in daftar_tanggal if len(tanggal)]
+    return min(pd.Timestamp(t) for t in awal) if awal else None
+
+
+def _periode_lalu():
+    return periode_dari(date.today().replace(day=1) - timedelta(days=1))
+
+
+class BukuBersama:
+    def __init__(self, db, arsip=None):
+        self.db = db
+        self.arsip = arsip if arsip is not None else Arsip.untuk(db)
+        self.restock = None
+        self.peringatan = ()
+        self._nomor_peringatan = 0
+        # _versi_data None: _jalankan() memuat semua data dari database lebih dulu
+        self._versi_data = None
+        self._jalankan(lambda: None)
+        self._terbitkan()
+        self._antrean = queue.Queue()
+        self._penulis = threading.Thread(target=self._jalankan_penulis, name='penulis-buku-besar', daemon=True)
+        self._penulis.start()
+
+    def snapshot(self):
+        # Tanpa lock & tanpa database: tulisan proses lain dimuat oleh penulis sendiri
+        return self._snapshot
+
+    def _muat(self):
+        # Semua data dibaca dari database. Versi data dicatat sebelum membaca, jadi
+        # tulisan proses lain selama pemuatan tetap memicu pemuatan ulang berikutnya
+        db = self.db
+        self._versi_data = db.versi_data()
+        self.katalog = Katalog.dari_db(db)
+        self.resep = db.muat_resep()
+        self.matriks_resep = MatriksResep(self.resep)
+        self.pemakaian = PemakaianHarian.dari_db(db, self.matriks_resep)
+        self.inventaris, restock = _dengan_status(terapkan_skema(db.muat_inventaris(), SKEMA_INVENTARIS), self.pemakaian)
+        if self.restock is None:
+            self.restock = restock
+        else:
+            self._perbarui_restock(restock)
+        self.periode = PeriodeBuku.dari_db(db)
+        self.fifo = PersediaanFIFO.dari_db(db)
+        self.pembantu = BukuPembantu.dari_db(db)
+        if not db.baca_pengaturan('hpp_fifo'):
+            self._mulai_hpp()
+        self.buku = None
+        self._tutup_periode()
+
+    def _jalankan(self, fungsi, *args):
+        # Menjalankan satu perintah dengan data yang sama dengan isi database
+        for percobaan in range(PERCOBAAN_TULIS):
+            try:
+                if self.db.versi_data() != self._versi_data:
+                    self._muat()
+                if self._bulan_tutup != periode_dari(date.today()):
+                    self._tutup_periode()
+                return fungsi(*args)
+            except DataBerubah:
+                # Perintah gagal sebelum database berubah; data di memori dimuat ulang
+                self._versi_data = None
+                if percobaan == PERCOBAAN_TULIS - 1:
+                    raise
+
+    def _terbitkan(self):
+        # Satu assignment atribut: pembaca melihat snapshot lama atau baru, tidak pernah setengah jadi
+        self._snapshot = Snapshot(self.buku.snapshot(), self.inventaris, self.katalog, self.resep, self.matriks_resep, self.periode, self.pembantu,
+            self.restock, self.peringatan,
+        )
+
+    # --- ANTREAN PENULIS ---
+    def _jalankan_penulis(self):
+        while True:
+            try:
+                future, fungsi, args = self._antrean.get(timeout=INTERVAL_CEK_VERSI_S)
+            except queue.Empty:
+                self._cek_versi()
+                continue
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                hasil = self._jalankan(fungsi, *args)
+            except BaseException as e:
+                # Database ditulis sebelum memori, jadi perintah yang gagal tidak
+                # mengubah apa pun; thread penulis tetap hidup untuk perintah berikutnya
+                future.set_exception(e)
+            else:
+                self._terbitkan()
+                future.set_result(hasil)
+
+    def _cek_versi(self):
+        # Antrean kosong: kalau proses lain sudah menulis, data dimuat ulang dan
+        # snapshot baru diterbitkan tanpa menunggu perintah berikutnya
+        try:
+            if self.db.versi_data() == self._versi_data:
+                return
+            self._jalankan(lambda: None)
+        except Exception:
+            # mis. database sedang dikunci proses lain; dicoba lagi pada pemeriksaan berikutnya
+            return
+        self._terbitkan()
+
+    def _kirim(self, fungsi, *args):
+        future = Future()
+        self._antrean.put((future, fungsi, args))
+        return future
+
+    def _tunggu(self, fungsi, *args):
+        # Pemanggil (rerun sesi) menunggu perintahnya selesai; error database diteruskan apa adanya
+        return self._kirim(fungsi, *args).result()
+
+    # --- PERINTAH ---
+    def penjualan(self, tanggal, keranjang, pihak=PIHAK_UMUM):
+        return self._tunggu(self._penjualan, tanggal, keranjang, pihak)
+
+    def posting_pesanan(self, daftar_pesanan):
+        return self._tunggu(self._posting_pesanan, daftar_pesanan)
+
+    def pembelian(self, tanggal, daftar_pembelian, pihak=PIHAK_UMUM):
+        return self._tunggu(self._pembelian, tanggal, daftar_pembelian, pihak)
+
+    def pelunasan(self, tanggal, tagihan_id, jumlah):
+        return self._tunggu(self._pelunasan, tanggal, tagihan_id, jumlah)
+
+    def posting_kolom(self, transaksi, jurnal, perbarui_stok=False):
+        return self._tunggu(self._posting_kolom, transaksi, jurnal, perbarui_stok)
+
+    def simpan_item_inventaris(self, item, qty, satuan, min_stok):
+        return self._tunggu(self._simpan_item_inventaris, item, qty, satuan, min_stok)
+
+    def ubah_katalog(self, produk):
+        return self._tunggu(self._ubah_katalog, produk)
+
+    def ubah_resep(self, resep):
+        return self._tunggu(self._ubah_resep, resep)
+
+    def hitung_ulang_saldo(self):
+        return self._tunggu(self._hitung_ulang_saldo)
+
+    def tutup_periode(self):
+        return self._tunggu(self._tutup_periode)
+
+    def reset(self):
+        return self._tunggu(self._reset)
+
+    # --- PELAKSANAAN (hanya di thread penulis) ---
+    def _simpan(self, **data):
+        # Penyimpanan.simpan() yang ditolak (DataBerubah) kalau proses lain sudah
+        # menulis sejak data di memori dimuat
+        return self.db.simpan(versi=self._versi_data, **data)
+
+    def _posting(self, batch, inventaris, lot=None, tagihan=(), pemakaian=None):
+        # inventaris: salinan baru milik penulis; selisih stoknya disimpan bersama baris
+        # batch (dan perubahan lot HPP & tagihan kredit baru) dalam satu transaksi;
+        # pemakaian: PemakaianHarian baru kalau batch berisi penjualan.
+        # Mengembalikan id lot & tagihan baru dari Penyimpanan.simpan()
+        pemakaian = pemakaian if pemakaian is not None else self.pemakaian
+        inventaris, restock = _dengan_status(inventaris, pemakaian)
+        stok = _selisih_stok(self.inventaris, inventaris)
+        if batch is None:
+            id_baru = self._simpan(stok=stok)
+        else:
+            self._buka_periode(_tanggal_awal([b['tanggal'] for b in batch.transaksi], [b['tanggal'] for b in batch.jurnal]))
+            id_baru = self._simpan(transaksi=batch.transaksi, jurnal=batch.jurnal, stok=stok, lot=lot, tagihan=tagihan)
+            self.buku.posting(batch)
+            if len(tagihan):
+                self.pembantu = self.pembantu.dengan(baru=tagihan, id_baru=id_baru['tagihan'])
+        self.inventaris = inventaris
+        self.pemakaian = pemakaian
+        self._perbarui_restock(restock)
+        return id_baru
+
+    def _perbarui_restock(self, restock):
+        peringatan = peringatan_baru(self.restock, restock)
+        for baris in peringatan:
+            self._nomor_peringatan += 1
+            baris['nomor'] = self._nomor_peringatan
+        if peringatan:
+            self.peringatan = (self.peringatan + tuple(peringatan))[-BATAS_PERINGATAN:]
+        self.restock = restock
+
+    def _hitung_ulang_prakiraan(self):
+        # Setelah impor atau perubahan resep: pemakaian harian dibaca ulang dari database
+        self.pemakaian = PemakaianHarian.dari_db(self.db, self.matriks_resep)
+        self.inventaris, restock = _dengan_status(self.inventaris.copy(), self.pemakaian)
+        self._perbarui_restock(restock)
+
+    def _penjualan(self, tanggal, keranjang, pihak):
+        return self._posting_pesanan([('Penjualan', tanggal, keranjang, pihak)])[0]
+
+    def _pembelian(self, tanggal, daftar_pembelian, pihak):
+        self._posting_pesanan([('Pembelian', tanggal, daftar_pembelian, pihak)])
+
+    def _posting_pesanan(self, daftar_pesanan):
+        # daftar_pesanan: list (jenis, tanggal, isi, pihak); isi = keranjang (list dict) untuk
+        # Penjualan atau DataFrame daftar pembelian untuk Pembelian, pihak = pelanggan/
+        # pemasok untuk tagihan kredit. Mengembalikan transaksi_id per pesanan (None untuk pembelian).
+        batch = BatchPosting()
+        inventaris = self.inventaris.copy()
+        hasil, baris_jual, tagihan, pemakaian_jual = [], [], [], []
+        self.fifo.mulai()
+        try:
+            for jenis, tanggal, isi, pihak in daftar_pesanan:
+                kredit = total_kredit(isi)
+                if jenis == 'Penjualan':
+                    transaksi_id = str(uuid.uuid4())
+                    akuntansi.batch_penjualan(transaksi_id, tanggal, isi, batch)
+                    pemakaian = akuntansi.pemakaian_keranjang(self.matriks_resep, isi)
+                    pemakaian_jual.append((tanggal, pemakaian))
+                    biaya = self.fifo.pakai_semua(pemakaian)
+                    akuntansi.batch_hpp(tanggal, f'HPP Penjualan ID {transaksi_id}', biaya, batch)
+                    if kredit > 0:
+                        tagihan.append(tagihan_baru('Piutang', pihak, transaksi_id, tanggal, kredit))
+                    baris_jual.extend(isi)
+                    hasil.append(transaksi_id)
+                    continue
+                # Stok diubah sesuai urutan pesanan: penjualan sebelum pembelian ini
+                # dikurangkan dulu (bahan baru dari pembelian tidak ikut terpakai)
+                if baris_jual:
+                    # UPDATE: mengurangi stok bahan baku, tidak langsung produk jadi
+                    inventaris = kurangi_stok(inventaris, akuntansi.pemakaian_keranjang(self.matriks_resep, baris_jual))
+                    baris_jual = []
+                akuntansi.batch_pembelian(tanggal, isi, batch)
+                akuntansi.lot_pembelian(self.fifo, tanggal, isi)
+                if kredit > 0:
+                    referensi = 'Pembelian ' + ', '.join(isi.loc[isi['metode_bayar'] == 'Kredit', 'item'].astype(str))
+                    tagihan.append(tagihan_baru('Utang', pihak, referensi, tanggal, kredit))
+                inventaris = akuntansi.tambah_stok_pembelian(inventaris, isi)
+                hasil.append(None)
+            if baris_jual:
+                inventaris = kurangi_stok(inventaris, akuntansi.pemakaian_keranjang(self.matriks_resep, baris_jual))
+            pemakaian = self.pemakaian.dengan(pemakaian_jual) if pemakaian_jual else None
+            id_baru = self._posting(batch, inventaris, self.fifo.perubahan(), tagihan, pemakaian)
+            self.fifo.selesai(id_baru['lot'])
+        except BaseException:
+            # lot di memori dikembalikan; database belum/tidak jadi berubah
+            self.fifo.batalkan()
+            raise
+        return hasil
+
+    def _posting_kolom(self, transaksi, jurnal, perbarui_stok=False):
+        # perbarui_stok: pembelian impor menambah lot & stok dan penjualan impor memakai
+        # keduanya, disimpan dalam satu transaksi SQLite. Tanpa itu impor hanya riwayat:
+        # HPP tetap dihitung dari lot, tetapi perubahan lot dibatalkan sehingga lot dan
+        # stok sama-sama tidak berubah.
+        self._buka_periode(_tanggal_awal(transaksi['tanggal'], jurnal['tanggal']))
+        tagihan = tagihan_impor(transaksi)
+        inventaris, stok, lot = self.inventaris, None, None
+        if perbarui_stok:
+            jual = transaksi['jenis'] == 'Penjualan'
+            pemakaian = self.matriks_resep.pemakaian_bahan(transaksi['item'][jual], transaksi['qty'][jual])
+            pembelian = pd.Series(transaksi['qty'][~jual]).groupby(transaksi['item'][~jual]).sum()
+            inventaris, _ = _dengan_status(kurangi_stok(self.inventaris.copy(), pemakaian.sub(pembelian, fill_value=0)), self.pemakaian)
+            stok = _selisih_stok(self.inventaris, inventaris)
+        self.fifo.mulai()
+        try:
+            # HPP penjualan impor dari lot FIFO, dijurnal per hari
+            biaya = hpp_riwayat(pd.DataFrame(transaksi), self.matriks_resep, self.fifo)
+            if perbarui_stok:
+                lot = self.fifo.perubahan()
+            else:
+                self.fifo.batalkan()
+            batch = BatchPosting()
+            for tanggal, nilai in sorted(biaya.items()):
+                tanggal = pd.Timestamp(tanggal).date()
+                akuntansi.batch_hpp(tanggal, f'HPP Penjualan Impor {tanggal}', nilai, batch)
+            jurnal = _gabung_jurnal(jurnal, batch.jurnal)
+            id_baru = self._simpan(transaksi=transaksi, jurnal=jurnal, tagihan=tagihan, lot=lot, stok=stok)
+            self.fifo.selesai(id_baru['lot'])
+        except BaseException:
+            self.fifo.batalkan()
+            raise
+        self.inventaris = inventaris
+        self.buku.posting_kolom(transaksi, jurnal)
+        if len(tagihan):
+            self.pembantu = self.pembantu.dengan(baru=tagihan, id_baru=id_baru['tagihan'])
+        self._hitung_ulang_prakiraan()
+
+    def _pelunasan(self, tanggal, tagihan_id, jumlah):
+        # Pembayaran (boleh sebagian) satu tagihan; ValueError kalau tagihan tidak
+        # ada/sudah lunas atau jumlahnya melebihi sisa
+        tagihan = self.pembantu.cari(tagihan_id)
+        if tagihan is None:
+            raise ValueError(f"Tagihan #{tagihan_id} tidak ada atau sudah lunas")
+        jumlah = int(round(jumlah))
+        sisa = int(tagihan['jumlah'] - tagihan['dibayar'])
+        if not 0 < jumlah <= sisa:
+            raise ValueError(f"Jumlah pelunasan harus antara 1 dan Rp{sisa:,.0f}")
+        batch = akuntansi.batch_pelunasan(tanggal, tagihan_id, tagihan['jenis'], tagihan['pihak'], jumlah)
+        self._buka_periode(pd.Timestamp(tanggal))
+        self._simpan(jurnal=batch.jurnal, pelunasan=[(tagihan_id, tanggal, jumlah)])
+        self.buku.posting(batch)
+        self.pembantu = self.pembantu.dengan(bayar={tagihan_id: jumlah})
+        return sisa - jumlah
+
+    def _simpan_item_inventaris(self, item, qty, satuan, min_stok):
+        inventaris = self.inventaris.copy()
+        ada = inventaris['item'] == item
+        if ada.any():
+            inventaris.loc[ada, ['qty', 'satuan', 'min_stok']] = [qty, satuan, min_stok]
+        else:
+            new_item = {'item': item, 'qty': qty, 'satuan': satuan, 'min_stok': min_stok, 'status': 'Cukup'}
+            inventaris = terapkan_skema(pd.concat([inventaris, pd.DataFrame([new_item])], ignore_index=True), SKEMA_INVENTARIS)
+        self._posting(None, inventaris)
+
+    def _ubah_katalog(self, produk):
+        # produk: baris katalog baru/berubah (Katalog.perubahan); riwayat harga ikut dicatat
+        if len(produk):
+            self.db.simpan_katalog(produk, versi=self._versi_data)
+            self.katalog = Katalog.dari_db(self.db)
+
+    def _ubah_resep(self, resep):
+        self._simpan(resep=resep)
+        self.resep = resep
+        self.matriks_resep = MatriksResep(resep)
+        self._hitung_ulang_prakiraan()
+
+    def _hitung_ulang_saldo(self):
+        jurnal_arsip = None
+        if self._diarsipkan_sampai is not None:
+            jurnal_arsip = self.arsip.baca(
+                'jurnal', sampai=akhir_periode(self._diarsipkan_sampai), kolom=['akun', 'kredit_akun', 'debit', 'kredit'])
+        return self.buku.hitung_ulang_saldo(jurnal_arsip)
+
+    def _mulai_hpp(self):
+        # Sekali untuk database yang sudah berisi transaksi sebelum ada HPP FIFO:
+        # riwayat pembelian & penjualan diputar ulang menjadi lot dan jurnal HPP per hari
+        self.fifo.mulai()
+        try:
+            biaya = hpp_riwayat(self.db.muat_transaksi(), self.matriks_resep, self.fifo)
+            batch = BatchPosting()
+            for tanggal in sorted(biaya):
+                akuntansi.batch_hpp(tanggal, f'HPP Penjualan {tanggal}', biaya[tanggal], batch)
+            if batch.jurnal:
+                periode = self.periode.buka(self.db, _tanggal_awal([b['tanggal'] for b in batch.jurnal]))
+                if periode is not self.periode:
+                    self.periode = periode
+                    self.arsip.lengkapi(self.db, periode.periode)
+            id_baru = self._simpan(jurnal=batch.jurnal, lot=self.fifo.perubahan(), pengaturan={'hpp_fifo': '1'})
+            self.fifo.selesai(id_baru['lot'])
+        except BaseException:
+            self.fifo.batalkan()
+            raise
+
+    def _tutup_periode(self):
+        # Menutup semua bulan penuh s.d. bulan lalu; mengembalikan periode tertutup terakhir
+        self.periode = self.periode.tutup(self.db, _periode_lalu())
+        self._bulan_tutup = periode_dari(date.today())
+        if self.arsip.lengkapi(self.db, self.periode.periode) or self.buku is None:
+            # bulan yang baru diarsipkan dikeluarkan dari memori
+            self.buku = self._muat_buku()
+        return self.periode.ditutup_sampai
+
+    def _buka_periode(self, tanggal):
+        periode = self.periode.buka(self.db, tanggal)
+        if periode is not self.periode:
+            # Baris bulan yang dibuka kembali dimuat lagi ke memori dari SQLite
+            self.periode = periode
+            self.arsip.lengkapi(self.db, periode.periode)
+            self.buku = self._muat_buku()
+
+    def _muat_buku(self):
+        # Saldo bulan yang sudah diarsipkan diambil dari tutup buku, rekap penjualannya
+        # dari arsip (kolom rekap saja); hanya baris sesudahnya yang dimuat ke memori
+        self._diarsipkan_sampai = self.arsip.diarsipkan_sampai(self.periode.periode)
+        if self._diarsipkan_sampai is None:
+            return BukuBesar(self.db.muat_transaksi(), self.db.muat_jurnal())
+        akhir = akhir_periode(self._diarsipkan_sampai)
+        saldo_arsip, _ = self.periode.mutasi(self.db, None, akhir)
+        transaksi_arsip = self.arsip.baca('transaksi', sampai=akhir, kolom=KOLOM_REKAP)
+        sejak = akhir + timedelta(days=1)
+        return BukuBesar(self.db.muat_transaksi(sejak), self.db.muat_jurnal(sejak), saldo_arsip, transaksi_arsip)
+
+    def _reset(self):
+        self.db.hapus_semua()
+        self.arsip.hapus_semua()
+        self._diarsipkan_sampai = None
+        self.buku = BukuBesar.kosong()
+        self.inventaris = self.inventaris.iloc[0:0]
+        self.katalog = Katalog()
+        self.resep = self.resep.iloc[0:0]
+        self.matriks_resep = MatriksResep(self.resep)
+        self.periode = PeriodeBuku()
+        self.fifo = PersediaanFIFO()
+        self.pembantu = BukuPembantu()
+        self.pemakaian = PemakaianHarian()
+        self.restock = prakiraan_restock(self.inventaris, self.pemakaian)
+        self.peringatan = ()
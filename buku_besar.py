@@ -0,0 +1,392 @@
+import uuid
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from skema import DTYPE_ARRAY, KATEGORI, SKEMA_JURNAL, SKEMA_TRANSAKSI, ke_array
+
+# --- BUKU BESAR (DI MEMORI) ---
+# Baris transaksi dan jurnal disimpan per kolom dalam array numpy yang
+# kapasitasnya digandakan saat penuh. Menambah baris tidak lagi menyalin
+# seluruh DataFrame (seperti pd.concat), jadi biaya posting tetap datar
+# walaupun buku sudah berisi ratusan ribu baris. Tipe tiap kolom mengikuti
+# skema.py (rupiah int64, kategori, datetime64).
+
+KAPASITAS_AWAL = 1024
+
+# Di bawah batas ini penjumlahan per kunci memakai loop biasa (lebih cepat untuk
+# satu keranjang); di atasnya memakai groupby pandas (untuk impor massal)
+BATAS_LOOP = 256
+
+# Kolom transaksi yang dipakai RekapPenjualan
+KOLOM_REKAP = ['tanggal', 'jenis', 'item', 'metode_bayar', 'qty', 'total']
+
+
+def _dtype_kode(jumlah_kategori):
+    # Sama dengan pilihan pandas untuk kode Categorical, supaya from_codes tidak menyalin
+    if jumlah_kategori < np.iinfo(np.int8).max:
+        return np.dtype(np.int8)
+    if jumlah_kategori < np.iinfo(np.int16).max:
+        return np.dtype(np.int16)
+    return np.dtype(np.int32)
+
+
+def _jumlahkan(kunci, nilai):
+    # kunci: list array kunci, nilai: list array angka (panjang sama).
+    # Menghasilkan (tuple kunci, list jumlah) per kunci unik.
+    if len(kunci[0]) <= BATAS_LOOP:
+        hasil = {}
+        for baris in zip(*kunci, *nilai):
+            k = baris[:len(kunci)]
+            if k in hasil:
+                hasil[k] = [a + b for a, b in zip(hasil[k], baris[len(kunci):])]
+            else:
+                hasil[k] = list(baris[len(kunci):])
+        return hasil.items()
+    df = pd.DataFrame({f'k{i}': k for i, k in enumerate(kunci)} | {f'v{i}': v for i, v in enumerate(nilai)})
+    grup = df.groupby([f'k{i}' for i in range(len(kunci))], sort=False, observed=True).sum()
+    index = grup.index if len(kunci) > 1 else [(k,) for k in grup.index]
+    return zip(index, grup.to_numpy().tolist())
+
+
+def _ke_kolom(baris, kolom):
+    # list of dict (satu dict per baris) -> dict kolom -> list
+    return {k: [row.get(k, '') for row in baris] for k in kolom}
+
+
+class TabelAppend:
+    def __init__(self, skema, kapasitas=KAPASITAS_AWAL):
+        self.skema = dict(skema)
+        self.kolom = list(skema)
+        self.n = 0
+        self.kapasitas = kapasitas
+        self.data = {k: np.empty(kapasitas, dtype=DTYPE_ARRAY[t]) for k, t in self.skema.items()}
+        # kategori[k]: daftar kategori kolom k, kode[k]: peta kategori -> kode
+        self.kategori = {k: [] for k, t in self.skema.items() if t == KATEGORI}
+        self.kode = {k: {} for k in self.kategori}
+        self._frame = None
+
+    @classmethod
+    def dari_frame(cls, df, skema, kapasitas=KAPASITAS_AWAL):
+        tabel = cls(skema, max(kapasitas, len(df) * 2))
+        tabel.tambah_kolom({k: df[k] if k in df.columns else [''] * len(df) for k in tabel.kolom})
+        return tabel
+
+    def __len__(self):
+        return self.n
+
+    def ukuran_memori(self):
+        # Byte array kolom yang dialokasikan (kolom teks: hanya pointer, tanpa isi string)
+        return sum(arr.nbytes for arr in self.data.values())
+
+    def _pastikan_kapasitas(self, jumlah):
+        if self.n + jumlah <= self.kapasitas:
+            return
+        kapasitas = self.kapasitas
+        while self.n + jumlah > kapasitas:
+            kapasitas *= 2
+        for k, arr in self.data.items():
+            baru = np.empty(kapasitas, dtype=arr.dtype)
+            baru[:self.n] = arr[:self.n]
+            self.data[k] = baru
+        self.kapasitas = kapasitas
+
+    def _kodekan(self, k, nilai):
+        # factorize dulu, jadi peta kategori hanya dicari sekali per nilai unik
+        posisi, unik = pd.factorize(nilai)
+        peta = self.kode[k]
+        kode_unik = np.empty(len(unik), dtype=np.int64)
+        for i, v in enumerate(unik):
+            if v not in peta:
+                peta[v] = len(self.kategori[k])
+                self.kategori[k].append(v)
+            kode_unik[i] = peta[v]
+        dtype = _dtype_kode(len(self.kategori[k]))
+        if dtype != self.data[k].dtype:
+            self.data[k] = self.data[k].astype(dtype)
+        return kode_unik[posisi]
+
+    def tambah_kolom(self, kolom):
+        # kolom: dict nama kolom -> array/list dengan panjang yang sama.
+        # Nilai diubah ke tipe skema dulu; hasilnya dikembalikan untuk dipakai
+        # rekap/saldo tanpa konversi ulang.
+        bertipe = {k: ke_array(self.skema[k], kolom[k]) for k in self.kolom}
+        jumlah = len(bertipe[self.kolom[0]])
+        if jumlah == 0:
+            return bertipe
+        self._pastikan_kapasitas(jumlah)
+        for k, tipe in self.skema.items():
+            nilai = self._kodekan(k, bertipe[k]) if tipe == KATEGORI else bertipe[k]
+            self.data[k][self.n:self.n + jumlah] = nilai
+        self.n += jumlah
+        self._frame = None
+        return bertipe
+
+    def frame(self):
+        # DataFrame hanya dibuat ulang setelah ada baris baru, dan hanya berupa
+        # view ke array (tanpa menyalin data)
+        if self._frame is None:
+            kolom = {}
+            for k, tipe in self.skema.items():
+                arr = self.data[k][:self.n]
+                if tipe == KATEGORI:
+                    dtype = pd.CategoricalDtype(pd.Index(self.kategori[k], dtype=object))
+                    kolom[k] = pd.Series(pd.Categorical.from_codes(arr, dtype=dtype, validate=False), copy=False)
+                else:
+                    kolom[k] = pd.Series(arr, dtype=arr.dtype, copy=False)
+            self._frame = pd.DataFrame(kolom, columns=self.kolom, copy=False)
+        return self._frame
+
+
+class BatchPosting:
+    # Menampung semua baris transaksi & jurnal satu keranjang (atau banyak keranjang
+    # sekaligus, lihat BukuBersama.posting_pesanan) sebelum diposting sekaligus
+    def __init__(self):
+        self.transaksi = []
+        self.jurnal = []
+
+    def tambah_transaksi(self, baris):
+        self.transaksi.append(baris)
+
+    def tambah_jurnal(self, tanggal, keterangan, debit, kredit, akun_debit, akun_kredit):
+        self.jurnal.append({'tanggal': tanggal, 'keterangan': keterangan, 'debit': debit, 'kredit': 0, 'akun': akun_debit, 'kredit_akun': ''})
+        self.jurnal.append({'tanggal': tanggal, 'keterangan': keterangan, 'debit': 0, 'kredit': kredit, 'akun': '', 'kredit_akun': akun_kredit})
+
+
+class SaldoAkun:
+    # Total debit & kredit per akun. Baris debit jurnal memakai kolom 'akun',
+    # baris kredit memakai kolom 'kredit_akun'.
+    def __init__(self):
+        self.debit = defaultdict(int)
+        self.kredit = defaultdict(int)
+
+    @classmethod
+    def dari_jurnal(cls, jurnal):
+        saldo = cls()
+        saldo.tambah_kolom({k: jurnal[k].to_numpy() for k in ('akun', 'kredit_akun', 'debit', 'kredit')})
+        return saldo
+
+    def tambah_kolom(self, kolom):
+        if len(kolom['debit']) == 0:
+            return
+        for (akun,), (jumlah,) in _jumlahkan([kolom['akun']], [kolom['debit']]):
+            self.debit[akun] += int(jumlah)
+        for (akun,), (jumlah,) in _jumlahkan([kolom['kredit_akun']], [kolom['kredit']]):
+            self.kredit[akun] += int(jumlah)
+
+    def salin(self):
+        saldo = SaldoAkun()
+        saldo.debit.update(self.debit)
+        saldo.kredit.update(self.kredit)
+        return saldo
+
+    def tambah(self, lain):
+        for akun, jumlah in lain.debit.items():
+            self.debit[akun] += jumlah
+        for akun, jumlah in lain.kredit.items():
+            self.kredit[akun] += jumlah
+
+    def saldo(self, akun):
+        # Saldo normal debit (aset); untuk akun bersaldo kredit pakai -saldo(akun)
+        return self.debit.get(akun, 0) - self.kredit.get(akun, 0)
+
+    def total_debit(self):
+        return sum(self.debit.values())
+
+    def total_kredit(self):
+        return sum(self.kredit.values())
+
+    def daftar_akun(self):
+        return sorted((set(self.debit) | set(self.kredit)) - {''})
+
+    def tabel(self):
+        akun = self.daftar_akun()
+        df = pd.DataFrame({
+            'akun': akun,
+            'debit': [self.debit.get(a, 0) for a in akun],
+            'kredit': [self.kredit.get(a, 0) for a in akun],
+        })
+        df['saldo'] = df['debit'] - df['kredit']
+        return df
+
+    def selisih(self, lain):
+        # Akun yang total debit/kreditnya berbeda dengan saldo lain
+        semua = set(self.debit) | set(self.kredit) | set(lain.debit) | set(lain.kredit)
+        return sorted(
+            a for a in semua
+            if self.debit.get(a, 0) != lain.debit.get(a, 0) or self.kredit.get(a, 0) != lain.kredit.get(a, 0)
+        )
+
+
+class RekapPenjualan:
+    # Rekap penjualan per (hari, item, metode_bayar) dan total per jenis transaksi,
+    # diperbarui setiap posting supaya Dashboard tidak memindai seluruh transaksi.
+    # Hari disimpan sebagai nomor hari sejak 1970-01-01. Nilai rekap berupa tuple
+    # (qty, total) yang diganti, bukan diubah, jadi salin() cukup menyalin dict.
+    def __init__(self):
+        self.penjualan = {}
+        self.total_jenis = defaultdict(int)
+
+    @classmethod
+    def dari_transaksi(cls, transaksi):
+        rekap = cls()
+        rekap.tambah_kolom({k: transaksi[k].to_numpy() for k in KOLOM_REKAP})
+        return rekap
+
+    def tambah_kolom(self, kolom):
+        if len(kolom['jenis']) == 0:
+            return
+        for (jenis,), (total,) in _jumlahkan([kolom['jenis']], [kolom['total']]):
+            self.total_jenis[jenis] += int(total)
+        jual = kolom['jenis'] == 'Penjualan'
+        if not jual.any():
+            return
+        hari = kolom['tanggal'][jual].astype('datetime64[D]').astype(np.int64)
+        for kunci, (qty, total) in _jumlahkan(
+            [hari, kolom['item'][jual], kolom['metode_bayar'][jual]],
+            [kolom['qty'][jual], kolom['total'][jual]],
+        ):
+            kunci = tuple(kunci)
+            lama_qty, lama_total = self.penjualan.get(kunci, (0, 0))
+            self.penjualan[kunci] = (lama_qty + qty, lama_total + int(total))
+
+    def salin(self):
+        rekap = RekapPenjualan()
+        rekap.penjualan = dict(self.penjualan)
+        rekap.total_jenis.update(self.total_jenis)
+        return rekap
+
+    def frame(self):
+        kunci = list(self.penjualan)
+        nilai = list(self.penjualan.values())
+        return pd.DataFrame({
+            'tanggal': pd.to_datetime(np.array([k[0] for k in kunci], dtype=np.int64), unit='D'),
+            'item': [k[1] for k in kunci],
+            'metode_bayar': [k[2] for k in kunci],
+            'qty': [v[0] for v in nilai],
+            'total': [v[1] for v in nilai],
+        })
+
+    def tren_bulanan(self):
+        df = self.frame()
+        if df.empty:
+            return pd.DataFrame(columns=['bulan', 'total'])
+        df['bulan'] = df['tanggal'].dt.strftime('%Y-%m')
+        return df.groupby('bulan')['total'].sum().reset_index()
+
+    def per_produk(self):
+        df = self.frame()
+        if df.empty:
+            return pd.DataFrame(columns=['item', 'qty'])
+        return df.groupby('item')['qty'].sum().reset_index()
+
+
+def _indeks_id(ids, awal=0):
+    # transaksi_id -> (baris awal, baris akhir) untuk id yang barisnya berurutan
+    # (selalu begitu untuk posting keranjang), atau array posisi kalau tidak.
+    # Id kosong (pembelian, data lama) tidak diindeks.
+    if len(ids) == 0:
+        return {}
+    if len(ids) <= BATAS_LOOP:
+        posisi = defaultdict(list)
+        for i, tid in enumerate(ids, awal):
+            if tid:
+                posisi[tid].append(i)
+        return {tid: (p[0], p[-1] + 1) if p[-1] - p[0] + 1 == len(p) else np.array(p) for tid, p in posisi.items()}
+    grup = pd.Series(np.arange(awal, awal + len(ids))).groupby(ids, sort=False)
+    indeks = {}
+    for tid, p in grup.indices.items():
+        if not tid:
+            continue
+        posisi = p + awal
+        indeks[tid] = (int(posisi[0]), int(posisi[-1]) + 1) if posisi[-1] - posisi[0] + 1 == len(posisi) else posisi
+    return indeks
+
+
+class BukuBesar:
+    def __init__(self, transaksi, jurnal, saldo_arsip=None, transaksi_arsip=None):
+        # id + versi dipakai sebagai kunci cache; versi naik setiap ada posting.
+        # transaksi/jurnal: baris yang dimuat ke memori. Bulan yang sudah diarsipkan
+        # (arsip.py) hanya ikut lewat saldo_arsip (SaldoAkun) dan transaksi_arsip
+        # (kolom rekap saja), tanpa disimpan barisnya.
+        self.id = uuid.uuid4().hex
+        self.versi = 0
+        self.transaksi = TabelAppend.dari_frame(transaksi, SKEMA_TRANSAKSI)
+        self.jurnal = TabelAppend.dari_frame(jurnal, SKEMA_JURNAL)
+        self.saldo = SaldoAkun.dari_jurnal(self.jurnal.frame())
+        self.rekap = RekapPenjualan.dari_transaksi(self.transaksi.frame())
+        if saldo_arsip is not None:
+            self.saldo.tambah(saldo_arsip)
+        if transaksi_arsip is not None and len(transaksi_arsip):
+            self.rekap.tambah_kolom({k: ke_array(SKEMA_TRANSAKSI[k], transaksi_arsip[k]) for k in KOLOM_REKAP})
+        self.indeks_transaksi = _indeks_id(self.transaksi.data['transaksi_id'][:len(self.transaksi)])
+
+    @classmethod
+    def kosong(cls):
+        return cls(pd.DataFrame(columns=list(SKEMA_TRANSAKSI)), pd.DataFrame(columns=list(SKEMA_JURNAL)))
+
+    def posting(self, batch):
+        self.posting_kolom(_ke_kolom(batch.transaksi, self.transaksi.kolom), _ke_kolom(batch.jurnal, self.jurnal.kolom))
+
+    def posting_kolom(self, transaksi, jurnal):
+        # transaksi, jurnal: dict kolom -> array (dipakai langsung oleh impor massal)
+        awal = len(self.transaksi)
+        kolom_transaksi = self.transaksi.tambah_kolom(transaksi)
+        self.indeks_transaksi.update(_indeks_id(kolom_transaksi['transaksi_id'], awal))
+        kolom_jurnal = self.jurnal.tambah_kolom(jurnal)
+        self.saldo.tambah_kolom(kolom_jurnal)
+        self.rekap.tambah_kolom(kolom_transaksi)
+        self.versi += 1
+
+    def baris_transaksi(self, transaksi_id):
+        # Baris satu transaksi tanpa memindai seluruh tabel; None kalau id tidak ada
+        posisi = self.indeks_transaksi.get(transaksi_id)
+        if posisi is None:
+            return None
+        if isinstance(posisi, tuple):
+            return self.transaksi.frame().iloc[posisi[0]:posisi[1]]
+        return self.transaksi.frame().iloc[posisi]
+
+    def snapshot(self):
+        return SnapshotBuku(self)
+
+    def hitung_ulang_saldo(self, jurnal_arsip=None):
+        # Menghitung ulang saldo dari seluruh jurnal (ditambah jurnal arsip, kalau ada)
+        # dan mengembalikan akun yang berbeda dengan saldo inkremental (list kosong berarti cocok)
+        saldo_baru = SaldoAkun.dari_jurnal(self.jurnal.frame())
+        if jurnal_arsip is not None and len(jurnal_arsip):
+            saldo_baru.tambah(SaldoAkun.dari_jurnal(jurnal_arsip))
+        selisih = self.saldo.selisih(saldo_baru)
+        self.saldo = saldo_baru
+        return selisih
+
+
+class SnapshotBuku:
+    # Keadaan buku besar pada satu versi, aman dibaca dari thread lain selama
+    # buku aslinya terus diposting: frame transaksi/jurnal hanya view ke baris
+    # [:n] tabel append (posting baru ditulis setelah baris n atau ke array baru),
+    # saldo & rekap berupa salinan. Dibuat oleh penulis setelah setiap posting.
+    def __init__(self, buku):
+        self.id = buku.id
+        self.versi = buku.versi
+        self.transaksi = buku.transaksi.frame()
+        self.jurnal = buku.jurnal.frame()
+        self.saldo = buku.saldo.salin()
+        self.rekap = buku.rekap.salin()
+        self.ukuran_memori = {'transaksi': buku.transaksi.ukuran_memori(), 'jurnal': buku.jurnal.ukuran_memori()}
+        # indeks hanya bertambah; id yang diposting setelah snapshot ini diabaikan
+        self._indeks_transaksi = buku.indeks_transaksi
+
+    def baris_transaksi(self, transaksi_id):
+        posisi = self._indeks_transaksi.get(transaksi_id)
+        if posisi is None:
+            return None
+        if isinstance(posisi, tuple):
+            if posisi[1] > len(self.transaksi):
+                return None
+            return self.transaksi.iloc[posisi[0]:posisi[1]]
+        if posisi[-1] >= len(self.transaksi):
+            return None
+        return self.transaksi.iloc[posisi]
+
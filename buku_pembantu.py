@@ -0,0 +1,166 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+# --- BUKU PEMBANTU PIUTANG & UTANG ---
+# Rincian akun Piutang Usaha & Utang Usaha per pelanggan/pemasok. Setiap penjualan
+# atau pembelian kredit menjadi satu tagihan (jumlah, jatuh tempo); pelunasan
+# (boleh sebagian) dijurnal ke Kas dan menambah kolom dibayar. Yang dimuat ke
+# memori hanya tagihan yang belum lunas, diurutkan menurut jatuh tempo, jadi umur
+# piutang/utang seluruh tagihan cukup dihitung dengan satu searchsorted ke batas
+# tanggal kelompok umur, lalu dijumlah per pihak dengan bincount, tanpa loop per
+# tagihan berapa pun jumlahnya.
+#
+# Seperti snapshot lain, objek BukuPembantu tidak pernah diubah setelah
+# diterbitkan: penulis (BukuBersama) membuat objek baru lewat dengan(). Tagihan
+# baru belum punya id; id-nya diberikan SQLite saat ditulis (Penyimpanan.simpan).
+
+KOLOM_TAGIHAN = ['id', 'jenis', 'pihak', 'referensi', 'tanggal', 'jatuh_tempo', 'jumlah', 'dibayar']
+JENIS_TAGIHAN = ['Piutang', 'Utang']
+
+PIHAK_UMUM = 'Umum'
+TERMIN_HARI = 30
+
+# Kelompok umur menurut jumlah hari lewat jatuh tempo; batas atas 0-30, 31-60, 61-90
+KELOMPOK_UMUR = ['Belum Jatuh Tempo', '0-30 Hari', '31-60 Hari', '61-90 Hari', '> 90 Hari']
+BATAS_UMUR = [30, 60, 90]
+
+
+def tagihan_kosong():
+    return pd.DataFrame(columns=KOLOM_TAGIHAN)
+
+
+def _waktu(kolom):
+    # Kolom tanggal -> datetime64[ns]; kolom yang sudah datetime dipakai apa adanya
+    if kolom.dtype == 'datetime64[ns]':
+        return kolom.to_numpy()
+    return pd.to_datetime(kolom).to_numpy(dtype='datetime64[ns]')
+
+
+def _siapkan(tagihan):
+    tagihan = tagihan[KOLOM_TAGIHAN]
+    if (tagihan.dtypes[['id', 'jumlah', 'dibayar']] != 'int64').any():
+        tagihan = tagihan.astype({'id': 'int64', 'jumlah': 'int64', 'dibayar': 'int64'})
+    return tagihan.assign(tanggal=_waktu(tagihan['tanggal']), jatuh_tempo=_waktu(tagihan['jatuh_tempo']))
+
+
+def total_kredit(isi):
+    # Bagian kredit satu pesanan; isi: keranjang (list dict) atau DataFrame daftar pembelian
+    baris = isi.to_dict('records') if isinstance(isi, pd.DataFrame) else isi
+    return sum(b['qty'] * b['harga'] for b in baris if b['metode_bayar'] == 'Kredit')
+
+
+def tagihan_baru(jenis, pihak, referensi, tanggal, jumlah, termin=TERMIN_HARI):
+    # Satu baris tagihan tanpa id (dict KOLOM_TAGIHAN[1:]) untuk Penyimpanan.simpan()
+    tanggal = pd.Timestamp(tanggal).date()
+    return {
+        'jenis': jenis, 'pihak': str(pihak or '').strip() or PIHAK_UMUM,
+        'referensi': referensi, 'tanggal': tanggal, 'jatuh_tempo': tanggal + timedelta(days=termin),
+        'jumlah': int(round(jumlah)), 'dibayar': 0,
+    }
+
+
+def tagihan_impor(transaksi, termin=TERMIN_HARI):
+    # Tagihan dari baris kredit hasil impor (dict kolom -> array): satu tagihan per
+    # transaksi_id, baris tanpa transaksi_id masing-masing satu tagihan
+    df = pd.DataFrame({k: transaksi[k] for k in ('transaksi_id', 'tanggal', 'jenis', 'metode_bayar', 'total')})
+    df = df[df['metode_bayar'] == 'Kredit']
+    if df.empty:
+        return tagihan_kosong()
+    kunci = df['transaksi_id'].where(df['transaksi_id'] != '', pd.Series(np.arange(len(df)), index=df.index).astype(str) + '#')
+    df = df.assign(kunci=kunci).groupby(['jenis', 'kunci'], sort=False).agg(
+        transaksi_id=('transaksi_id', 'first'), tanggal=('tanggal', 'min'), jumlah=('total', 'sum')).reset_index()
+    tanggal = pd.to_datetime(df['tanggal']).dt.normalize()
+    return pd.DataFrame({
+        'jenis': np.where(df['jenis'] == 'Penjualan', 'Piutang', 'Utang'),
+        'pihak': PIHAK_UMUM,
+        'referensi': df['transaksi_id'].where(df['transaksi_id'] != '', 'Impor'),
+        'tanggal': tanggal.dt.date,
+        'jatuh_tempo': (tanggal + pd.Timedelta(days=termin)).dt.date,
+        'jumlah': df['jumlah'].round().astype('int64'),
+        'dibayar': 0,
+    })
+
+
+class BukuPembantu:
+    def __init__(self, tagihan=None):
+        # tagihan: tagihan belum lunas (KOLOM_TAGIHAN)
+        tagihan = _siapkan(tagihan if tagihan is not None else tagihan_kosong())
+        if not tagihan['jatuh_tempo'].is_monotonic_increasing:
+            tagihan = tagihan.sort_values('jatuh_tempo', kind='stable')
+        self.tagihan = tagihan.set_index('id')
+
+    @classmethod
+    def dari_db(cls, db):
+        return cls(db.muat_tagihan())
+
+    def __len__(self):
+        return len(self.tagihan)
+
+    def cari(self, id_tagihan):
+        # Tagihan terbuka dengan id itu (Series), None kalau tidak ada/sudah lunas
+        if id_tagihan not in self.tagihan.index:
+            return None
+        return self.tagihan.loc[id_tagihan]
+
+    def _jenis(self, jenis, pihak=None):
+        tagihan = self.tagihan[self.tagihan['jenis'] == jenis]
+        if pihak:
+            tagihan = tagihan[tagihan['pihak'] == pihak]
+        return tagihan
+
+    def terbuka(self, jenis, pihak=None):
+        # Tagihan belum lunas urut jatuh tempo, dengan kolom sisa
+        tagihan = self._jenis(jenis, pihak)
+        return tagihan.reset_index().assign(
+            tanggal=tagihan['tanggal'].dt.date.to_numpy(),
+            jatuh_tempo=tagihan['jatuh_tempo'].dt.date.to_numpy(),
+            sisa=(tagihan['jumlah'] - tagihan['dibayar']).to_numpy(),
+        )
+
+    def daftar_pihak(self, jenis):
+        return sorted(self._jenis(jenis)['pihak'].unique().tolist())
+
+    def total(self, jenis):
+        tagihan = self._jenis(jenis)
+        return int((tagihan['jumlah'] - tagihan['dibayar']).sum())
+
+    # --- UMUR PIUTANG/UTANG ---
+    def umur(self, jenis, per_tanggal=None):
+        # Sisa tagihan per pihak (baris) & kelompok umur (kolom), plus kolom Total
+        tagihan = self._jenis(jenis)
+        per_tanggal = np.datetime64(pd.Timestamp(per_tanggal or date.today()).normalize().to_datetime64(), 'ns')
+        jatuh_tempo = tagihan['jatuh_tempo'].to_numpy()
+        # Tagihan dengan jatuh tempo sebelum batas[i] sudah lewat lebih dari BATAS_UMUR[-1-i] hari;
+        # batas terakhir memisahkan yang belum jatuh tempo (jatuh tempo setelah per_tanggal)
+        hari = np.array([-b for b in reversed(BATAS_UMUR)] + [1], dtype='timedelta64[D]')
+        posisi = np.searchsorted(jatuh_tempo, per_tanggal + hari, side='left')
+        # urutan tagihan terurut: > 90, 61-90, 31-60, 0-30, belum jatuh tempo
+        jumlah_per_kelompok = np.diff(np.concatenate([[0], posisi, [len(jatuh_tempo)]]))
+        kelompok = np.repeat(np.arange(len(KELOMPOK_UMUR) - 1, -1, -1), jumlah_per_kelompok)
+        kode_pihak, pihak = pd.factorize(tagihan['pihak'], sort=True)
+        sisa = (tagihan['jumlah'] - tagihan['dibayar']).to_numpy()
+        total = np.bincount(
+            kode_pihak * len(KELOMPOK_UMUR) + kelompok, weights=sisa, minlength=len(pihak) * len(KELOMPOK_UMUR)
+        ).reshape(len(pihak), len(KELOMPOK_UMUR))
+        hasil = pd.DataFrame(total.astype('int64'), index=pd.Index(pihak, name='pihak'), columns=KELOMPOK_UMUR)
+        hasil['Total'] = hasil.sum(axis=1)
+        return hasil
+
+    # --- PERUBAHAN (hanya di thread penulis) ---
+    def dengan(self, baru=None, bayar=None, id_baru=None):
+        # Objek baru dengan tambahan tagihan `baru` (list dict / DataFrame tanpa id,
+        # id-nya `id_baru` dari Penyimpanan.simpan) dan pembayaran `bayar` ({id: jumlah});
+        # tagihan yang lunas dikeluarkan
+        tagihan = self.tagihan
+        if bayar:
+            tagihan = tagihan.copy()
+            id_bayar = list(bayar)
+            tagihan.loc[id_bayar, 'dibayar'] += np.array([bayar[i] for i in id_bayar], dtype='int64')
+            tagihan = tagihan[tagihan['dibayar'] < tagihan['jumlah']]
+        tagihan = tagihan.reset_index()
+        if baru is not None and len(baru):
+            baru = _siapkan(pd.DataFrame(baru).assign(id=id_baru))
+            tagihan = pd.concat([tagihan, baru], ignore_index=True) if len(tagihan) else baru
+        return BukuPembantu(tagihan)
@@ -0,0 +1,58 @@
+import uuid
+from datetime import date
+
+import pandas as pd
+
+# --- DATA AWAL ---
+# Data ini hanya dipakai untuk mengisi database yang baru dibuat
+
+def data_awal():
+    transaksi = [
+        {'transaksi_id': str(uuid.uuid4()), 'tanggal': date(2025, 7, 28), 'jenis': 'Penjualan', 'metode_bayar': 'Tunai', 'item': 'kue bawang rasa original', 'qty': 10, 'harga': 15000, 'total': 150000, 'catatan': ''},
+        {'transaksi_id': str(uuid.uuid4()), 'tanggal': date(2025, 7, 28), 'jenis': 'Penjualan', 'metode_bayar': 'Kredit', 'item': 'keripik kenikir', 'qty': 5, 'harga': 15000, 'total': 75000, 'catatan': ''},
+        {'transaksi_id': str(uuid.uuid4()), 'tanggal': date(2025, 7, 29), 'jenis': 'Pembelian', 'metode_bayar': 'Tunai', 'item': 'Tepung Terigu', 'qty': 50, 'harga': 10000, 'total': 500000, 'catatan': ''},
+    ]
+    jurnal = [
+        {'tanggal': date(2025, 7, 28), 'keterangan': 'Penjualan', 'debit': 150000, 'kredit': 0, 'akun': 'Kas', 'kredit_akun': ''},
+        {'tanggal': date(2025, 7, 28), 'keterangan': 'Penjualan', 'debit': 0, 'kredit': 150000, 'akun': '', 'kredit_akun': 'Penjualan'},
+        {'tanggal': date(2025, 7, 28), 'keterangan': 'Penjualan Kredit', 'debit': 75000, 'kredit': 0, 'akun': 'Piutang Usaha', 'kredit_akun': ''},
+        {'tanggal': date(2025, 7, 28), 'keterangan': 'Penjualan Kredit', 'debit': 0, 'kredit': 75000, 'akun': '', 'kredit_akun': 'Penjualan'},
+        {'tanggal': date(2025, 7, 29), 'keterangan': 'Pembelian Tepung Terigu', 'debit': 500000, 'kredit': 0, 'akun': 'Bahan Baku', 'kredit_akun': ''},
+        {'tanggal': date(2025, 7, 29), 'keterangan': 'Pembelian Tepung Terigu', 'debit': 0, 'kredit': 500000, 'akun': '', 'kredit_akun': 'Kas'},
+    ]
+    inventaris = pd.DataFrame([
+        {'item': 'Tepung Terigu', 'qty': 50, 'satuan': 'kg', 'min_stok': 10, 'status': 'Cukup'},
+        {'item': 'Gula', 'qty': 20, 'satuan': 'kg', 'min_stok': 5, 'status': 'Cukup'},
+        {'item': 'Minyak Goreng', 'qty': 10, 'satuan': 'liter', 'min_stok': 20, 'status': 'Perlu Restock'},
+    ])
+    harga_jual = {
+        "kue bawang rasa original": 15000,
+        "kue bawang rasa kelor": 15000,
+        "kue bawang rasa jagung": 15000,
+        "kue bawang rasa buah naga": 15000,
+        "keripik kenikir": 15000
+    }
+    return transaksi, jurnal, inventaris, harga_jual
+
+
+# Resep awal: 1 kue bawang butuh 0.1 kg Tepung Terigu, 1 keripik kenikir butuh 0.05 kg Gula
+def resep_awal():
+    return pd.DataFrame([
+        {'produk': 'kue bawang rasa original', 'bahan': 'Tepung Terigu', 'qty': 0.1},
+        {'produk': 'kue bawang rasa kelor', 'bahan': 'Tepung Terigu', 'qty': 0.1},
+        {'produk': 'kue bawang rasa jagung', 'bahan': 'Tepung Terigu', 'qty': 0.1},
+        {'produk': 'kue bawang rasa buah naga', 'bahan': 'Tepung Terigu', 'qty': 0.1},
+        {'produk': 'keripik kenikir', 'bahan': 'Gula', 'qty': 0.05},
+    ])
+
+
+def isi_data_awal(db):
+    # Mengisi database yang baru dibuat/dimigrasi (lihat Penyimpanan.versi_awal)
+    if db.versi_awal == 0:
+        transaksi, jurnal, inventaris, harga_jual = data_awal()
+        # Database lama sudah punya riwayat transaksi, contoh transaksi tidak perlu ditambahkan
+        if db.muat_transaksi().empty:
+            db.simpan(transaksi=transaksi, jurnal=jurnal)
+        db.simpan(inventaris=inventaris, harga_jual=harga_jual)
+    if db.versi_awal < 2:
+        db.simpan(resep=resep_awal())
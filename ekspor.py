@@ -0,0 +1,360 @@
+import argparse
+import re
+import sys
+import zipfile
+from datetime import date, timedelta
+from xml.sax.saxutils import escape
+
+import pandas as pd
+
+from akuntansi import hitung_laba_rugi, hitung_neraca, neraca_saldo_periode
+from invoice import teks_invoice
+from periode import PeriodeBuku, akhir_periode, awal_periode, periode_berikut, periode_dari
+
+# --- EKSPOR JURNAL, RIWAYAT TRANSAKSI, LAPORAN BULANAN & INVOICE ---
+# Semua ekspor membaca data per potongan UKURAN_POTONGAN baris
+# (Penyimpanan.potongan_jurnal/potongan_transaksi) dan langsung menulis setiap
+# potongan ke file keluaran, jadi memori yang dipakai tetap sebesar satu potongan
+# berapa pun tahun data yang diekspor. Keluaran boleh file biasa, file sementara
+# (download_button di jamfix.py) atau stdout (CLI).
+#
+# XLSX dan PDF ditulis langsung tanpa pustaka tambahan: XLSX adalah zip berisi
+# XML yang lembar kerjanya ditulis baris demi baris ke dalam zip, PDF berisi teks
+# Courier yang setiap halamannya ditulis begitu penuh. Hanya posisi objek PDF
+# yang disimpan sampai akhir (untuk tabel xref).
+#
+#   python ekspor.py jurnal --format xlsx --dari 2025-01-01 --sampai 2025-12-31 -o jurnal_2025.xlsx
+#   python ekspor.py transaksi --jenis Penjualan > penjualan.csv
+#   python ekspor.py laporan --format xlsx -o laporan_bulanan.xlsx
+#   python ekspor.py invoice --dari 2025-06-01 --sampai 2025-06-30 -o invoice_juni.pdf
+
+UKURAN_POTONGAN = 5000
+
+FORMAT_EKSPOR = ['csv', 'xlsx']
+MIME = {
+    'csv': 'text/csv',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'pdf': 'application/pdf',
+}
+
+KOLOM_LAPORAN_BULANAN = ['periode', 'pendapatan', 'beban', 'laba', 'kas', 'piutang', 'bahan_baku', 'utang']
+
+
+def laporan_bulanan(periode_buku, db, dari=None, sampai=None):
+    # Satu baris per bulan: laba-rugi bulan itu & saldo neraca di akhir bulan.
+    # Saldo akhir = saldo awal + mutasi bulan itu, jadi setiap bulan cukup satu
+    # PeriodeBuku.mutasi (bulan yang sudah ditutup tanpa memindai jurnal).
+    pertama = db.periode_pertama()
+    if pertama is None:
+        return
+    sampai = sampai or date.today()
+    periode = max(pertama, periode_dari(dari)) if dari else pertama
+    akun_neraca = ['kas', 'piutang', 'bahan_baku', 'utang']
+    if dari:
+        awal = neraca_saldo_periode(periode_buku, db, dari - timedelta(days=1))
+        posisi = {k: awal[k] for k in akun_neraca}
+    else:
+        posisi = dict.fromkeys(akun_neraca, 0)
+    while periode <= periode_dari(sampai):
+        awal = max(awal_periode(periode), dari) if dari else awal_periode(periode)
+        akhir = min(akhir_periode(periode), sampai)
+        saldo, total_jenis = periode_buku.mutasi(db, awal, akhir)
+        laba_rugi = hitung_laba_rugi(total_jenis, saldo)
+        mutasi = hitung_neraca(saldo, laba_rugi['laba'])
+        posisi = {k: posisi[k] + mutasi[k] for k in akun_neraca}
+        yield pd.DataFrame([{'periode': periode, **laba_rugi, **posisi}], columns=KOLOM_LAPORAN_BULANAN)
+        periode = periode_berikut(periode)
+
+
+# --- CSV ---
+def tulis_csv(potongan, keluar, kolom):
+    # BOM supaya Excel membaca UTF-8; header ditulis walaupun tidak ada baris
+    keluar.write('\ufeff'.encode('utf-8'))
+    keluar.write(pd.DataFrame(columns=kolom).to_csv(index=False).encode('utf-8'))
+    for df in potongan:
+        keluar.write(df[kolom].to_csv(index=False, header=False).encode('utf-8'))
+
+
+# --- XLSX ---
+BARIS_MAKS_XLSX = 1048576
+_KARAKTER_ILEGAL_XML = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '{lembar}</Types>'
+)
+_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+# Gaya sel: 0 biasa, 1 tanggal (yyyy-mm-dd), 2 header tebal
+_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<numFmts count="1"><numFmt numFmtId="164" formatCode="yyyy-mm-dd"/></numFmts>'
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font><font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="3"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+_AWAL_LEMBAR = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<sheetViews><sheetView workbookViewId="0"><pane ySplit="1" topLeftCell="A2" activePane="bottomLeft" state="frozen"/></sheetView></sheetViews>'
+    '<sheetData>'
+)
+_AKHIR_LEMBAR = '</sheetData></worksheet>'
+
+
+def _teks_xml(kolom):
+    teks = kolom.astype(object).where(kolom.notna(), '').astype(str)
+    teks = teks.str.replace(_KARAKTER_ILEGAL_XML, '', regex=True)
+    return teks.str.replace('&', '&amp;').str.replace('<', '&lt;').str.replace('>', '&gt;')
+
+
+def _sel_xlsx(kolom):
+    # Satu kolom potongan -> Series XML <c> per baris. Atribut r (alamat sel) tidak
+    # ditulis; sel & baris dibaca berurutan.
+    if pd.api.types.is_numeric_dtype(kolom) and not pd.api.types.is_bool_dtype(kolom):
+        return ('<c><v>' + kolom.astype(str) + '</v></c>').where(kolom.notna(), '<c/>')
+    contoh = kolom.dropna()
+    if len(contoh) and isinstance(contoh.iloc[0], date):
+        hari = (pd.to_datetime(kolom) - pd.Timestamp('1899-12-30')).dt.days
+        return ('<c s="1"><v>' + hari.astype('Int64').astype(str) + '</v></c>').where(kolom.notna(), '<c/>')
+    return '<c t="inlineStr"><is><t xml:space="preserve">' + _teks_xml(kolom) + '</t></is></c>'
+
+
+def _baris_xlsx(df):
+    baris = pd.Series('<row>', index=df.index)
+    for nama in df.columns:
+        baris = baris + _sel_xlsx(df[nama])
+    return (baris + '</row>').tolist()
+
+
+def tulis_xlsx(lembar, keluar):
+    # lembar: [(nama lembar, kolom, potongan)]. Lembar yang melebihi batas baris
+    # Excel dilanjutkan di lembar berikutnya (nama (2), (3), ...).
+    header = {}
+    nama_lembar = []
+    with zipfile.ZipFile(keluar, 'w', zipfile.ZIP_DEFLATED) as zf:
+        def buka(nama, kolom):
+            nama_lembar.append(nama)
+            f = zf.open(f'xl/worksheets/sheet{len(nama_lembar)}.xml', 'w', force_zip64=True)
+            f.write(_AWAL_LEMBAR.encode('utf-8'))
+            if kolom not in header:
+                header[kolom] = '<row>' + ''.join(
+                    f'<c s="2" t="inlineStr"><is><t>{escape(k)}</t></is></c>' for k in kolom) + '</row>'
+            f.write(header[kolom].encode('utf-8'))
+            return f
+
+        for nama, kolom, potongan in lembar:
+            kolom = tuple(kolom)
+            f = buka(nama, kolom)
+            bagian, terisi = 1, 1
+            for df in potongan:
+                baris = _baris_xlsx(df[list(kolom)])
+                while baris:
+                    if terisi == BARIS_MAKS_XLSX:
+                        f.write(_AKHIR_LEMBAR.encode('utf-8'))
+                        f.close()
+                        bagian += 1
+                        f = buka(f'{nama} ({bagian})', kolom)
+                        terisi = 1
+                    muat = baris[:BARIS_MAKS_XLSX - terisi]
+                    f.write(''.join(muat).encode('utf-8'))
+                    terisi += len(muat)
+                    baris = baris[len(muat):]
+            f.write(_AKHIR_LEMBAR.encode('utf-8'))
+            f.close()
+
+        daftar = ''.join(
+            f'<sheet name="{escape(nama[:31], {chr(34): "&quot;"})}" sheetId="{i}" r:id="rId{i}"/>'
+            for i, nama in enumerate(nama_lembar, start=1))
+        relasi = ''.join(
+            f'<Relationship Id="rId{i}" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet{i}.xml"/>'
+            for i in range(1, len(nama_lembar) + 1))
+        override = ''.join(
+            f'<Override PartName="/xl/worksheets/sheet{i}.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            for i in range(1, len(nama_lembar) + 1))
+        zf.writestr('xl/styles.xml', _STYLES)
+        zf.writestr('xl/workbook.xml', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            f'<sheets>{daftar}</sheets></workbook>'))
+        zf.writestr('xl/_rels/workbook.xml.rels', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            f'{relasi}<Relationship Id="rId{len(nama_lembar) + 1}" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+            '</Relationships>'))
+        zf.writestr('_rels/.rels', _RELS)
+        zf.writestr('[Content_Types].xml', _CONTENT_TYPES.format(lembar=override))
+
+
+def tulis_tabel(potongan, kolom, format, keluar, nama_lembar='Data'):
+    if format == 'xlsx':
+        tulis_xlsx([(nama_lembar, kolom, potongan)], keluar)
+    else:
+        tulis_csv(potongan, keluar, kolom)
+
+
+# --- PDF ---
+class PDFTeks:
+    # PDF teks sederhana (Courier 10pt, A4). Setiap halaman ditulis ke `keluar`
+    # begitu penuh; di memori hanya halaman yang sedang diisi & posisi objek.
+    LEBAR, TINGGI, MARGIN = 595, 842, 40
+    UKURAN_HURUF, JARAK_BARIS = 10, 12
+    KARAKTER_PER_BARIS = (LEBAR - 2 * MARGIN) * 10 // (6 * UKURAN_HURUF)
+    BARIS_PER_HALAMAN = (TINGGI - 2 * MARGIN) // JARAK_BARIS
+
+    def __init__(self, keluar):
+        self._keluar = keluar
+        self._posisi = 0
+        # objek 1 katalog, 2 daftar halaman (ditulis terakhir), 3 huruf
+        self._offset = {}
+        self._halaman = []
+        self._baris = []
+        self._tulis(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+        self._objek(1, b'<< /Type /Catalog /Pages 2 0 R >>')
+        self._objek(3, b'<< /Type /Font /Subtype /Type1 /BaseFont /Courier /Encoding /WinAnsiEncoding >>')
+        self._nomor = 3
+
+    def _tulis(self, data):
+        self._keluar.write(data)
+        self._posisi += len(data)
+
+    def _objek(self, nomor, isi):
+        self._offset[nomor] = self._posisi
+        self._tulis(b'%d 0 obj\n' % nomor + isi + b'\nendobj\n')
+
+    def baris(self, teks=''):
+        teks = str(teks)
+        potong = [teks[i:i + self.KARAKTER_PER_BARIS] for i in range(0, len(teks), self.KARAKTER_PER_BARIS)] or ['']
+        for bagian in potong:
+            if len(self._baris) == self.BARIS_PER_HALAMAN:
+                self.halaman_baru()
+            self._baris.append(bagian)
+
+    def teks(self, teks):
+        for baris in teks.split('\n'):
+            self.baris(baris)
+
+    def halaman_baru(self):
+        if not self._baris:
+            return
+        isi = [b'BT /F1 %d Tf %d TL %d %d Td' % (self.UKURAN_HURUF, self.JARAK_BARIS, self.MARGIN, self.TINGGI - self.MARGIN - self.UKURAN_HURUF)]
+        for baris in self._baris:
+            teks = baris.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+            isi.append(b'(' + teks.encode('cp1252', errors='replace') + b") '")
+        isi.append(b'ET')
+        stream = b'\n'.join(isi)
+        konten, halaman = self._nomor + 1, self._nomor + 2
+        self._nomor = halaman
+        self._objek(konten, b'<< /Length %d >>\nstream\n' % len(stream) + stream + b'\nendstream')
+        self._objek(halaman, (
+            b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] /Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>'
+            % (self.LEBAR, self.TINGGI, konten)))
+        self._halaman.append(halaman)
+        self._baris = []
+
+    def tutup(self):
+        self.halaman_baru()
+        if not self._halaman:
+            self.baris('(tidak ada data)')
+            self.halaman_baru()
+        kids = b' '.join(b'%d 0 R' % h for h in self._halaman)
+        self._objek(2, b'<< /Type /Pages /Kids [' + kids + b'] /Count %d >>' % len(self._halaman))
+        xref = self._posisi
+        jumlah = self._nomor + 1
+        self._tulis(b'xref\n0 %d\n0000000000 65535 f \n' % jumlah)
+        self._tulis(b''.join(b'%010d 00000 n \n' % self._offset[i] for i in range(1, jumlah)))
+        self._tulis(b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (jumlah, xref))
+
+
+def _invoice_per_transaksi(potongan):
+    # Baris transaksi berurutan dengan transaksi_id yang sama digabung menjadi satu
+    # invoice, juga kalau terpotong di batas dua potongan; baris tanpa id dilewati
+    # -> (transaksi_id, [(tanggal, item, qty, harga, total, metode_bayar)]) untuk teks_invoice
+    id_sekarang, baris = None, []
+    for df in potongan:
+        kolom = ['transaksi_id', 'tanggal', 'item', 'qty', 'harga', 'total', 'metode_bayar']
+        for transaksi_id, *isi in zip(*(df[k].tolist() for k in kolom)):
+            if not transaksi_id:
+                continue
+            if transaksi_id != id_sekarang and baris:
+                yield id_sekarang, baris
+                baris = []
+            id_sekarang = transaksi_id
+            baris.append(isi)
+    if baris:
+        yield id_sekarang, baris
+
+
+def tulis_invoice_pdf(potongan, keluar):
+    # potongan: baris transaksi penjualan (Penyimpanan.potongan_transaksi); satu invoice per halaman
+    pdf = PDFTeks(keluar)
+    jumlah = 0
+    for transaksi_id, baris in _invoice_per_transaksi(potongan):
+        pdf.teks(teks_invoice(transaksi_id, baris).strip('\n'))
+        pdf.halaman_baru()
+        jumlah += 1
+    pdf.tutup()
+    return jumlah
+
+
+def main(argv=None):
+    from penyimpanan import DB_PATH, KOLOM_JURNAL, KOLOM_TRANSAKSI, Penyimpanan
+
+    parser = argparse.ArgumentParser(description="Ekspor jurnal, riwayat transaksi, laporan bulanan atau invoice tanpa membuka aplikasi")
+    parser.add_argument('data', choices=['jurnal', 'transaksi', 'laporan', 'invoice'])
+    parser.add_argument('--format', choices=FORMAT_EKSPOR, default='csv', help="format jurnal/transaksi/laporan (invoice selalu PDF)")
+    parser.add_argument('--dari', type=date.fromisoformat, help="tanggal awal (YYYY-MM-DD)")
+    parser.add_argument('--sampai', type=date.fromisoformat, help="tanggal akhir (YYYY-MM-DD)")
+    parser.add_argument('--akun', help="jurnal: hanya baris dengan akun ini")
+    parser.add_argument('--jenis', choices=['Penjualan', 'Pembelian'], help="transaksi: hanya jenis ini")
+    parser.add_argument('--item', help="transaksi: hanya item ini")
+    parser.add_argument('--kata', help="cari di keterangan (jurnal) atau ID/catatan (transaksi)")
+    parser.add_argument('--db', default=DB_PATH, help=f"file database SQLite (default: {DB_PATH})")
+    parser.add_argument('--ukuran', type=int, default=UKURAN_POTONGAN, help="jumlah baris per potongan")
+    parser.add_argument('-o', '--output', help="file keluaran (default: stdout)")
+    args = parser.parse_args(argv)
+
+    db = Penyimpanan(args.db)
+    keluar = open(args.output, 'wb') if args.output else sys.stdout.buffer
+    try:
+        if args.data == 'jurnal':
+            potongan = db.potongan_jurnal(args.ukuran, args.dari, args.sampai, args.akun, args.kata)
+            tulis_tabel(potongan, KOLOM_JURNAL, args.format, keluar, 'Jurnal Umum')
+        elif args.data == 'transaksi':
+            potongan = db.potongan_transaksi(args.ukuran, args.dari, args.sampai, args.jenis, args.item, args.kata)
+            tulis_tabel(potongan, KOLOM_TRANSAKSI, args.format, keluar, 'Riwayat Transaksi')
+        elif args.data == 'laporan':
+            potongan = laporan_bulanan(PeriodeBuku.dari_db(db), db, args.dari, args.sampai)
+            tulis_tabel(potongan, KOLOM_LAPORAN_BULANAN, args.format, keluar, 'Laporan Bulanan')
+        else:
+            potongan = db.potongan_transaksi(args.ukuran, args.dari, args.sampai, 'Penjualan', args.item, args.kata)
+            jumlah = tulis_invoice_pdf(potongan, keluar)
+            print(f"{jumlah:,} invoice", file=sys.stderr)
+    finally:
+        if args.output:
+            keluar.close()
+        else:
+            keluar.flush()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,320 @@
+import argparse
+import os
+import sys
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from skema import SKEMA_JURNAL
+
+# --- IMPOR DATA LAMA (CSV / PARQUET) ---
+# File dibaca per potongan (chunk) supaya memori tetap kecil walaupun berisi
+# jutaan baris. Setiap potongan divalidasi, lalu baris transaksi dan pasangan
+# jurnalnya dibuat sekaligus (vektor) dengan aturan yang sama seperti kasir:
+#   Penjualan Tunai  : Kas           / Penjualan   (satu pasang per transaksi_id)
+#   Penjualan Kredit : Piutang Usaha / Penjualan
+#   Pembelian Tunai  : Bahan Baku    / Kas         (satu pasang per baris)
+#   Pembelian Kredit : Bahan Baku    / Utang Usaha
+#
+# Baris dengan transaksi_id yang sama tetapi terbelah di batas potongan dipindah
+# ke potongan berikutnya, jadi tetap menjadi satu tagihan & satu pasang jurnal.
+#
+# Kolom wajib: tanggal, jenis (Penjualan/Pembelian), item, qty.
+# Kolom opsional: harga, total, metode_bayar (default Tunai), transaksi_id,
+# satuan, catatan. Harga penjualan yang kosong diambil dari harga_jual, atau dari
+# riwayat harga katalog (harga yang berlaku pada tanggal baris) bila katalog diberikan.
+
+UKURAN_CHUNK = 50_000
+KOLOM_WAJIB = ['tanggal', 'jenis', 'item', 'qty']
+
+
+class RingkasanImpor:
+    def __init__(self):
+        self.jumlah_baris = 0
+        self.jumlah_valid = 0
+        self.jumlah_jurnal = 0
+        # contoh baris yang ditolak (dibatasi supaya tidak menumpuk di memori)
+        self.contoh_ditolak = []
+        self.alasan_ditolak = {}
+        # qty per produk terjual & per bahan dibeli, untuk memperbarui stok bila diminta
+        self.qty_penjualan = pd.Series(dtype=float)
+        self.qty_pembelian = pd.Series(dtype=float)
+
+    @property
+    def jumlah_ditolak(self):
+        return self.jumlah_baris - self.jumlah_valid
+
+    def catat_ditolak(self, df, alasan, batas=20):
+        for a, n in alasan.value_counts().items():
+            self.alasan_ditolak[a] = self.alasan_ditolak.get(a, 0) + int(n)
+        sisa = batas - len(self.contoh_ditolak)
+        if sisa > 0:
+            contoh = df.head(sisa).assign(alasan=alasan.head(sisa).to_numpy())
+            self.contoh_ditolak.extend(contoh.to_dict('records'))
+
+    def ke_dict(self):
+        return {
+            'jumlah_baris': self.jumlah_baris,
+            'jumlah_valid': self.jumlah_valid,
+            'jumlah_ditolak': self.jumlah_ditolak,
+            'jumlah_jurnal': self.jumlah_jurnal,
+            'alasan_ditolak': self.alasan_ditolak,
+        }
+
+
+def baca_bertahap(sumber, ukuran_chunk=UKURAN_CHUNK, format=None):
+    # sumber: path atau file-like (mis. hasil st.file_uploader)
+    if format is None:
+        nama = sumber if isinstance(sumber, str) else getattr(sumber, 'name', '')
+        format = 'parquet' if str(nama).lower().endswith(('.parquet', '.pq')) else 'csv'
+    if format == 'parquet':
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise RuntimeError("Impor Parquet membutuhkan paket pyarrow") from e
+        for batch in pq.ParquetFile(sumber).iter_batches(batch_size=ukuran_chunk):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(sumber, chunksize=ukuran_chunk, dtype={'transaksi_id': str, 'catatan': str})
+
+
+def _teks(df, kolom, default=''):
+    if kolom not in df.columns:
+        return pd.Series(default, index=df.index, dtype=object)
+    return df[kolom].astype(object).where(df[kolom].notna(), default).astype(str).str.strip()
+
+
+def _tanggal(kolom):
+    # Format ISO (2025-01-06, 2025-01-06 13:45) diparse dengan format tetap: cepat dan
+    # tanpa peringatan "Could not infer format". Sisa yang tidak kosong (mis. 06/01/2025)
+    # dicoba per elemen dengan format='mixed', hari di depan seperti penulisan tanggal
+    # di sini. Teks berbentuk ISO yang gagal (mis. 2025-13-01) tidak dicoba ulang.
+    # Yang tetap gagal menjadi NaT dan ditolak sebagai 'tanggal tidak valid'.
+    if pd.api.types.is_datetime64_any_dtype(kolom):
+        return kolom.dt.normalize()
+    tanggal = pd.to_datetime(kolom, format='ISO8601', errors='coerce')
+    teks = kolom.astype(str).str.strip()
+    sisa = tanggal.isna() & kolom.notna() & (teks != '') & ~teks.str.match(r'\d{4}-')
+    if sisa.any():
+        tanggal[sisa] = pd.to_datetime(kolom[sisa], format='mixed', dayfirst=True, errors='coerce')
+    return tanggal.dt.normalize()
+
+
+def _id_transaksi(df):
+    # Kolom transaksi_id sebelum nama kolom dirapikan oleh siapkan_chunk
+    nama = {str(c).strip().lower(): c for c in df.columns}
+    return _teks(df, nama.get('transaksi_id', 'transaksi_id'))
+
+
+def _satukan_transaksi(potongan):
+    # Potongan ditahan satu langkah: baris yang transaksi_id-nya muncul lagi di
+    # potongan berikutnya ikut dipindah ke sana sebelum potongan ini diproses
+    tertunda = None
+    for df in potongan:
+        if tertunda is not None:
+            id_baru = _id_transaksi(df)
+            id_lama = _id_transaksi(tertunda)
+            lanjut = (id_lama != '') & id_lama.isin(set(id_baru[id_baru != '']))
+            if lanjut.any():
+                df = pd.concat([tertunda[lanjut], df], ignore_index=True)
+                tertunda = tertunda[~lanjut]
+            if len(tertunda):
+                yield tertunda
+        tertunda = df
+    if tertunda is not None and len(tertunda):
+        yield tertunda
+
+
+def _format_qty(qty):
+    # Sama seperti f'{qty}' di kasir untuk angka bulat: 50.0 -> '50'
+    return pd.Series(qty).map('{:g}'.format).to_numpy(dtype=object)
+
+
+def _pasangan_jurnal(tanggal, keterangan, jumlah, akun_debit, akun_kredit):
+    # Baris debit dan kredit disusun berselang-seling, sama seperti update_jurnal
+    m = len(jumlah)
+    jurnal = {
+        'tanggal': np.empty(2 * m, dtype='datetime64[ns]'),
+        'keterangan': np.empty(2 * m, dtype=object),
+        'debit': np.zeros(2 * m, dtype=np.int64),
+        'kredit': np.zeros(2 * m, dtype=np.int64),
+        'akun': np.full(2 * m, '', dtype=object),
+        'kredit_akun': np.full(2 * m, '', dtype=object),
+    }
+    for k, v in (('tanggal', tanggal), ('keterangan', keterangan)):
+        jurnal[k][0::2] = v
+        jurnal[k][1::2] = v
+    jurnal['debit'][0::2] = jumlah
+    jurnal['kredit'][1::2] = jumlah
+    jurnal['akun'][0::2] = akun_debit
+    jurnal['kredit_akun'][1::2] = akun_kredit
+    return jurnal
+
+
+def siapkan_chunk(df, harga_jual, satuan_bahan, katalog=None):
+    # Mengembalikan (kolom transaksi, kolom jurnal, DataFrame baris ditolak, alasan)
+    df = df.rename(columns=lambda c: str(c).strip().lower()).reset_index(drop=True)
+    hilang = [k for k in KOLOM_WAJIB if k not in df.columns]
+    if hilang:
+        raise ValueError(f"Kolom wajib tidak ada: {', '.join(hilang)}")
+
+    tanggal = _tanggal(df['tanggal'])
+    jenis = _teks(df, 'jenis').str.capitalize()
+    metode = _teks(df, 'metode_bayar', 'Tunai').str.capitalize().replace('', 'Tunai')
+    item = _teks(df, 'item')
+    qty = pd.to_numeric(df['qty'], errors='coerce')
+    harga = pd.to_numeric(df['harga'], errors='coerce') if 'harga' in df.columns else pd.Series(np.nan, index=df.index)
+    jual = jenis == 'Penjualan'
+    beli = jenis == 'Pembelian'
+    harga_default = katalog.harga_pada_kolom(item, tanggal).set_axis(df.index) if katalog is not None else item.map(harga_jual)
+    harga = harga.fillna(harga_default.where(jual))
+    total = pd.to_numeric(df['total'], errors='coerce') if 'total' in df.columns else pd.Series(np.nan, index=df.index)
+    total = total.fillna(qty * harga)
+
+    alasan = pd.Series(np.select(
+        [
+            tanggal.isna(),
+            ~(jual | beli),
+            ~metode.isin(['Tunai', 'Kredit']),
+            jual & ~item.isin(list(harga_jual)),
+            beli & ~item.isin(list(satuan_bahan)),
+            qty.isna() | (qty <= 0),
+            harga.isna() | (harga < 0),
+        ],
+        [
+            'tanggal tidak valid',
+            'jenis harus Penjualan atau Pembelian',
+            'metode_bayar harus Tunai atau Kredit',
+            'produk tidak ada di daftar harga jual',
+            'bahan tidak ada di inventaris',
+            'qty harus lebih dari 0',
+            'harga tidak valid',
+        ],
+        default='',
+    ), index=df.index)
+    valid = alasan == ''
+
+    # Penjualan tanpa transaksi_id dianggap satu transaksi per baris
+    transaksi_id = _teks(df, 'transaksi_id').mask(beli, '')
+    tanpa_id = jual & valid & (transaksi_id == '')
+    if tanpa_id.any():
+        transaksi_id[tanpa_id] = [str(uuid.uuid4()) for _ in range(int(tanpa_id.sum()))]
+
+    transaksi = {
+        'transaksi_id': transaksi_id[valid].to_numpy(),
+        'tanggal': tanggal[valid].to_numpy(),
+        'jenis': jenis[valid].to_numpy(),
+        'metode_bayar': metode[valid].to_numpy(),
+        'item': item[valid].to_numpy(),
+        'qty': qty[valid].to_numpy(dtype=float),
+        'harga': np.rint(harga[valid].to_numpy(dtype=float)).astype(np.int64),
+        'total': np.rint(total[valid].to_numpy(dtype=float)).astype(np.int64),
+        'catatan': _teks(df, 'catatan')[valid].to_numpy(),
+    }
+
+    # Jurnal penjualan: satu pasang per (transaksi_id, metode_bayar)
+    jual_valid = (jual & valid).to_numpy()[valid.to_numpy()]
+    grup = pd.DataFrame({
+        'transaksi_id': transaksi['transaksi_id'][jual_valid],
+        'metode_bayar': transaksi['metode_bayar'][jual_valid],
+        'tanggal': transaksi['tanggal'][jual_valid],
+        'total': transaksi['total'][jual_valid],
+    }).groupby(['transaksi_id', 'metode_bayar'], sort=False).agg(tanggal=('tanggal', 'first'), total=('total', 'sum')).reset_index()
+    grup = grup[grup['total'] > 0]
+    tunai = (grup['metode_bayar'] == 'Tunai').to_numpy()
+    jurnal_jual = _pasangan_jurnal(
+        grup['tanggal'].to_numpy(),
+        ('Penjualan ' + grup['metode_bayar'] + ' ID ' + grup['transaksi_id']).to_numpy(dtype=object),
+        grup['total'].to_numpy(),
+        np.where(tunai, 'Kas', 'Piutang Usaha').astype(object),
+        'Penjualan',
+    )
+
+    # Jurnal pembelian: satu pasang per baris
+    beli_valid = ~jual_valid
+    satuan = _teks(df, 'satuan')[valid].to_numpy()[beli_valid]
+    item_beli = transaksi['item'][beli_valid]
+    satuan = np.where(satuan == '', pd.Series(item_beli, dtype=object).map(satuan_bahan).fillna('').to_numpy(dtype=object), satuan)
+    tunai_beli = transaksi['metode_bayar'][beli_valid] == 'Tunai'
+    keterangan = (
+        np.where(tunai_beli, 'Pembelian ', 'Pembelian Kredit ').astype(object)
+        + _format_qty(transaksi['qty'][beli_valid]) + ' ' + satuan + ' ' + item_beli
+    )
+    jurnal_beli = _pasangan_jurnal(
+        transaksi['tanggal'][beli_valid],
+        keterangan,
+        transaksi['total'][beli_valid],
+        'Bahan Baku',
+        np.where(tunai_beli, 'Kas', 'Utang Usaha').astype(object),
+    )
+    jurnal = {k: np.concatenate([jurnal_jual[k], jurnal_beli[k]]) for k in SKEMA_JURNAL}
+
+    ditolak = ~valid
+    return transaksi, jurnal, df[ditolak], alasan[ditolak]
+
+
+def impor(sumber, harga_jual, satuan_bahan, tulis, ukuran_chunk=UKURAN_CHUNK, format=None, progres=None, katalog=None):
+    # tulis(kolom_transaksi, kolom_jurnal) dipanggil sekali per potongan valid;
+    # progres(ringkasan) dipanggil setelah setiap potongan (mis. untuk progress bar)
+    ringkasan = RingkasanImpor()
+    for df in _satukan_transaksi(baca_bertahap(sumber, ukuran_chunk, format)):
+        transaksi, jurnal, ditolak, alasan = siapkan_chunk(df, harga_jual, satuan_bahan, katalog)
+        ringkasan.jumlah_baris += len(df)
+        ringkasan.jumlah_valid += len(transaksi['item'])
+        ringkasan.jumlah_jurnal += len(jurnal['debit'])
+        if len(ditolak):
+            ringkasan.catat_ditolak(ditolak, alasan)
+        if len(transaksi['item']):
+            tulis(transaksi, jurnal)
+            per_item = pd.DataFrame({'jenis': transaksi['jenis'], 'item': transaksi['item'], 'qty': transaksi['qty']})
+            per_item = per_item.groupby(['jenis', 'item'], sort=False)['qty'].sum()
+            if 'Penjualan' in per_item.index:
+                ringkasan.qty_penjualan = ringkasan.qty_penjualan.add(per_item['Penjualan'], fill_value=0)
+            if 'Pembelian' in per_item.index:
+                ringkasan.qty_pembelian = ringkasan.qty_pembelian.add(per_item['Pembelian'], fill_value=0)
+        if progres is not None:
+            progres(ringkasan)
+    return ringkasan
+
+
+def main(argv=None):
+    from buku_bersama import BukuBersama
+    from data_awal import isi_data_awal
+    from penyimpanan import DB_PATH, Penyimpanan
+
+    parser = argparse.ArgumentParser(description="Impor riwayat penjualan/pembelian dari CSV atau Parquet ke database")
+    parser.add_argument('file', help="file .csv atau .parquet")
+    parser.add_argument('--db', default=DB_PATH, help=f"file database SQLite (default: {DB_PATH})")
+    parser.add_argument('--chunk', type=int, default=UKURAN_CHUNK, help="jumlah baris per potongan")
+    parser.add_argument('--perbarui-stok', action='store_true', help="stok & lot bahan baku ikut diperbarui")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.file):
+        parser.error(f"file tidak ditemukan: {args.file}")
+    db = Penyimpanan(args.db)
+    # harga jual & satuan bahan dibutuhkan untuk validasi, jadi isi dulu bila database baru
+    isi_data_awal(db)
+    # Setiap potongan diposting lewat penulis buku besar yang sama dengan impor di
+    # aplikasi (BukuBersama.posting_kolom): bulan yang sudah ditutup dibuka kembali,
+    # baris kredit menjadi tagihan, dan penjualan dibebani HPP FIFO
+    bersama = BukuBersama(db)
+    snapshot = bersama.snapshot()
+    satuan_bahan = dict(zip(snapshot.inventaris['item'], snapshot.inventaris['satuan']))
+
+    def progres(ringkasan):
+        print(f"{ringkasan.jumlah_baris:,} baris dibaca, {ringkasan.jumlah_valid:,} diimpor", file=sys.stderr)
+
+    def tulis(transaksi, jurnal):
+        bersama.posting_kolom(transaksi, jurnal, args.perbarui_stok)
+
+    ringkasan = impor(args.file, snapshot.katalog.harga_jual, satuan_bahan, tulis, args.chunk,
+                      progres=progres, katalog=snapshot.katalog)
+    # Impor bertanggal lama membuka kembali bulan yang sudah ditutup; tutup lagi sekaligus
+    bersama.tutup_periode()
+    print(pd.Series(ringkasan.ke_dict()).to_string())
+    return 0 if ringkasan.jumlah_valid else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
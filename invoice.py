@@ -0,0 +1,76 @@
+from html import escape
+
+# --- INVOICE ---
+# Teks (untuk diunduh) dan HTML (untuk ditampilkan) dibuat sekaligus dalam satu
+# kali jalan atas baris-baris transaksi. Hasilnya di-cache per transaksi_id di
+# jamfix.py karena isi invoice tidak berubah setelah diposting. Ekspor invoice
+# massal (ekspor.py) hanya memakai teks_invoice atas baris biasa tanpa DataFrame.
+
+GARIS_TEBAL = "=" * 40
+GARIS_TIPIS = "-" * 40
+
+
+def _baris_teks(item, qty, harga, total, metode_bayar):
+    return f"  - {item} ({qty:g} pcs x Rp{harga:,.0f}) | Rp{total:,.0f} ({metode_bayar})"
+
+
+def _susun_teks(transaksi_id, tanggal, metode, baris_teks, total_invoice):
+    return "\n".join([
+        "",
+        "Invoice Aneka Snack",
+        GARIS_TEBAL,
+        f"ID Transaksi: {transaksi_id}",
+        f"Tanggal: {tanggal}",
+        f"Metode Pembayaran: {metode}",
+        GARIS_TIPIS,
+        "Items:",
+        *baris_teks,
+        "",
+        GARIS_TIPIS,
+        f"Total: Rp{total_invoice:,.0f}",
+        GARIS_TEBAL,
+        "",
+    ])
+
+
+def teks_invoice(transaksi_id, baris):
+    # baris: [(tanggal, item, qty, harga, total, metode_bayar)] satu transaksi
+    tanggal = f"{baris[0][0]:%Y-%m-%d}"
+    metode = ', '.join(dict.fromkeys(str(b[5]) for b in baris))
+    baris_teks = [_baris_teks(*b[1:]) for b in baris]
+    return _susun_teks(transaksi_id, tanggal, metode, baris_teks, sum(b[4] for b in baris))
+
+
+def buat_invoice(transaksi_id, invoice_df):
+    tanggal = f"{invoice_df['tanggal'].iloc[0]:%Y-%m-%d}"
+    metode = ', '.join(dict.fromkeys(invoice_df['metode_bayar'].astype(str)))
+
+    baris_teks = []
+    baris_html = []
+    total_invoice = 0
+    # Harga satuan diambil dari baris transaksi, yaitu harga yang berlaku saat transaksi
+    # dicatat, bukan harga katalog saat ini
+    for item, qty, harga, total, metode_bayar in zip(
+        invoice_df['item'], invoice_df['qty'], invoice_df['harga'], invoice_df['total'], invoice_df['metode_bayar']
+    ):
+        total_invoice += total
+        baris_teks.append(_baris_teks(item, qty, harga, total, metode_bayar))
+        baris_html.append(
+            f'<li class="invoice-item"><span>{escape(str(item))} ({qty:g} pcs x Rp{harga:,.0f})</span>'
+            f'<span>Rp{total:,.0f} ({escape(str(metode_bayar))})</span></li>'
+        )
+
+    invoice_text = _susun_teks(transaksi_id, tanggal, metode, baris_teks, total_invoice)
+    invoice_html = (
+        '<div class="invoice">'
+        '<div class="invoice-header">'
+        '<h2>Invoice Aneka Snack</h2>'
+        f'<p>ID Transaksi: {escape(transaksi_id)}</p>'
+        f'<p>Tanggal: {tanggal}</p>'
+        f'<p>Metode Pembayaran: {escape(metode)}</p>'
+        '</div>'
+        f'<div><strong>Items:</strong><ul>{"".join(baris_html)}</ul></div>'
+        f'<div class="invoice-total">Total: Rp{total_invoice:,.0f}</div>'
+        '</div>'
+    )
+    return invoice_text, invoice_html
@@ -1,44 +1,67 @@
 import streamlit as st
 import pandas as pd
-from datetime import datetime, date
-import plotly.express as px
-import plotly.graph_objects as go
-import json
-import uuid
-
-# --- START: DATA DUMMY (MENGGANTIKAN GOOGLE SHEETS) ---
-# Data ini hanya untuk demo dan akan hilang setiap kali aplikasi di-refresh
-if "transaksi" not in st.session_state:
-    st.session_state.transaksi = pd.DataFrame([
-        {'transaksi_id': str(uuid.uuid4()), 'tanggal': date(2025, 7, 28), 'jenis': 'Penjualan', 'metode_bayar': 'Tunai', 'item': 'kue bawang rasa original', 'qty': 10, 'harga': 15000, 'total': 150000, 'catatan': ''},
-        {'transaksi_id': str(uuid.uuid4()), 'tanggal': date(2025, 7, 28), 'jenis': 'Penjualan', 'metode_bayar': 'Kredit', 'item': 'keripik kenikir', 'qty': 5, 'harga': 15000, 'total': 75000, 'catatan': ''},
-        {'transaksi_id': str(uuid.uuid4()), 'tanggal': date(2025, 7, 29), 'jenis': 'Pembelian', 'metode_bayar': 'Tunai', 'item': 'Tepung Terigu', 'qty': 50, 'harga': 10000, 'total': 500000, 'catatan': ''},
-    ])
-    st.session_state.jurnal = pd.DataFrame([
-        {'tanggal': date(2025, 7, 28), 'keterangan': 'Penjualan', 'debit': 150000, 'kredit': 0, 'akun': 'Kas', 'kredit_akun': ''},
-        {'tanggal': date(2025, 7, 28), 'keterangan': 'Penjualan', 'debit': 0, 'kredit': 150000, 'akun': '', 'kredit_akun': 'Penjualan'},
-        {'tanggal': date(2025, 7, 28), 'keterangan': 'Penjualan Kredit', 'debit': 75000, 'kredit': 0, 'akun': 'Piutang Usaha', 'kredit_akun': ''},
-        {'tanggal': date(2025, 7, 28), 'keterangan': 'Penjualan Kredit', 'debit': 0, 'kredit': 75000, 'akun': '', 'kredit_akun': 'Penjualan'},
-        {'tanggal': date(2025, 7, 29), 'keterangan': 'Pembelian Tepung Terigu', 'debit': 500000, 'kredit': 0, 'akun': 'Bahan Baku', 'kredit_akun': ''},
-        {'tanggal': date(2025, 7, 29), 'keterangan': 'Pembelian Tepung Terigu', 'debit': 0, 'kredit': 500000, 'akun': '', 'kredit_akun': 'Kas'},
-    ])
-    st.session_state.inventaris = pd.DataFrame([
-        {'item': 'Tepung Terigu', 'qty': 50, 'satuan': 'kg', 'min_stok': 10, 'status': 'Cukup'},
-        {'item': 'Gula', 'qty': 20, 'satuan': 'kg', 'min_stok': 5, 'status': 'Cukup'},
-        {'item': 'Minyak Goreng', 'qty': 10, 'satuan': 'liter', 'min_stok': 20, 'status': 'Perlu Restock'},
-    ])
-    st.session_state.harga_jual = {
-        "kue bawang rasa original": 15000,
-        "kue bawang rasa kelor": 15000,
-        "kue bawang rasa jagung": 15000,
-        "kue bawang rasa buah naga": 15000,
-        "keripik kenikir": 15000
-    }
-    st.session_state.daftar_pembelian = pd.DataFrame(columns=['item', 'qty', 'satuan', 'harga', 'metode_bayar'])
+from datetime import date
+import io
+import sqlite3
+import tempfile
+
+import akuntansi
+import ekspor
+from buku_pembantu import JENIS_TAGIHAN
+from prakiraan import HARI_RIWAYAT, JENDELA_HARI, TARGET_CAKUPAN_HARI, WAKTU_TUNGGU_HARI
+from resep import bersihkan_resep
+from impor import impor
+from laporan_latar import LaporanGagal
+from penyimpanan import KOLOM_JURNAL, KOLOM_TRANSAKSI
+from sumber_daya import (
+    get_buku_bersama, get_penyimpanan, get_pool_laporan, get_profil, css_aplikasi, render_invoice, render_invoice_arsip,
+    ringkasan_halaman, isi_halaman,
+)
+
+# Profil kinerja: setiap bagian script ditandai dengan profil.tandai(), fungsi
+# posting dibungkus @profil.fungsi. Tanpa biaya berarti selama profil tidak aktif.
+profil = get_profil()
+profil.mulai_rerun()
+
+# Buku besar, inventaris, harga jual, dan resep dipakai bersama semua sesi. Sesi
+# hanya menyimpan referensi ke snapshot terakhir (tanpa salinan data) yang diambil
+# di awal setiap rerun dan setelah setiap perubahan; isinya tidak boleh diubah langsung.
+bersama = get_buku_bersama()
+
+def segarkan_snapshot():
+    snapshot = bersama.snapshot()
+    st.session_state.buku = snapshot.buku
+    st.session_state.inventaris = snapshot.inventaris
+    st.session_state.katalog = snapshot.katalog
+    st.session_state.harga_jual = snapshot.harga_jual
+    st.session_state.resep = snapshot.resep
+    st.session_state.matriks_resep = snapshot.matriks_resep
+    st.session_state.periode = snapshot.periode
+    st.session_state.pembantu = snapshot.pembantu
+    st.session_state.restock = snapshot.restock
+    st.session_state.peringatan = snapshot.peringatan
+
+segarkan_snapshot()
+if "cart" not in st.session_state:
+    st.session_state.daftar_pembelian = akuntansi.daftar_pembelian_kosong()
     st.session_state.cart = []
     st.session_state.last_invoice_id = None
     st.session_state.is_editor_mode = False
-# --- END: DATA DUMMY ---
+profil.tandai("muat sesi")
+
+# Peringatan stok diterbitkan penulis bersama saat posting; setiap sesi menampilkan
+# peringatan yang belum pernah dilihatnya (sesi baru mulai dari peringatan terakhir)
+if "peringatan_dilihat" not in st.session_state:
+    st.session_state.peringatan_dilihat = st.session_state.peringatan[-1]['nomor'] if st.session_state.peringatan else 0
+
+def tampilkan_peringatan():
+    for peringatan in st.session_state.peringatan:
+        if peringatan['nomor'] > st.session_state.peringatan_dilihat:
+            st.toast(f"⚠️ {peringatan['item']} perlu restock: sisa {peringatan['qty']:,.2f} {peringatan['satuan']}, "
+                     f"saran beli {peringatan['saran_beli']:,.0f} {peringatan['satuan']}")
+    if st.session_state.peringatan:
+        st.session_state.peringatan_dilihat = st.session_state.peringatan[-1]['nomor']
+
 
 # --- KONFIGURASI APLIKASI & CSS KUSTOM ---
 st.set_page_config(
@@ -48,163 +71,176 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-st.markdown("""
-<style>
-    body {
-        font-family: 'Noto Sans', sans-serif;
-        font-size: 1.2em;
-    }
-    h1, h2, h3, h4 {
-        font-family: 'Merriweather', serif;
-        color: #005a9c;
-    }
-    .stButton>button {
-        width: 100%;
-        background-color: #4CAF50;
-        color: white;
-        font-size: 1.2em;
-        padding: 10px;
-        border-radius: 8px;
-    }
-    .stTextInput>div>div>input, .stSelectbox>div>div>div, .stNumberInput>div>div>input {
-        font-size: 1.2em;
-        padding: 0.5rem;
-    }
-    .stMetric>div>div {
-        font-size: 1.5em;
-    }
-    .st-emotion-cache-1px5q9x {
-        padding: 2rem 1rem;
-    }
-    .st-emotion-cache-10o4965 {
-        font-size: 1.5em;
-    }
-    .invoice {
-        border: 2px solid #ddd;
-        padding: 20px;
-        border-radius: 10px;
-        background-color: #f9f9f9;
-        margin-top: 20px;
-        color: #333;
-    }
-    .invoice-header {
-        text-align: center;
-        border-bottom: 2px dashed #005a9c;
-        padding-bottom: 10px;
-        margin-bottom: 20px;
-    }
-    .invoice-header h2 {
-        color: #005a9c;
-    }
-    .invoice-item {
-        display: flex;
-        justify-content: space-between;
-        margin-bottom: 5px;
-        border-bottom: 1px dotted #ccc;
-        padding-bottom: 5px;
-    }
-    .invoice-total {
-        font-size: 1.5em;
-        font-weight: bold;
-        text-align: right;
-        margin-top: 20px;
-        border-top: 2px dashed #005a9c;
-        padding-top: 10px;
-        color: #d9534f;
-    }
-    .status-ok {
-        background-color: #d4edda;
-        color: #155724;
-        padding: 5px 10px;
-        border-radius: 5px;
-        text-align: center;
-        font-weight: bold;
-    }
-    .status-warning {
-        background-color: #fff3cd;
-        color: #856404;
-        padding: 5px 10px;
-        border-radius: 5px;
-        text-align: center;
-        font-weight: bold;
-    }
-    .st-emotion-cache-12t9t08 {
-        text-align: center;
-    }
-</style>
-""", unsafe_allow_html=True)
+st.markdown(css_aplikasi(), unsafe_allow_html=True)
+tampilkan_peringatan()
+profil.tandai("konfigurasi & css")
 
 # --- FUNGSI UTAMA ---
-def simpan_semua_data():
+# Menjalankan satu perintah di penulis buku besar bersama (database ditulis dalam
+# satu transaksi, lalu buku besar di memori), kemudian memakai snapshot terbarunya.
+# Mengembalikan (berhasil, hasil perintah).
+@profil.fungsi
+def simpan_bersama(perintah, *args):
+    try:
+        hasil = perintah(*args)
+    except sqlite3.Error as e:
+        st.error(f"❌ Data gagal disimpan: {e}")
+        return False, None
+    segarkan_snapshot()
     st.success("✅ Data berhasil disimpan.")
+    tampilkan_peringatan()
+    return True, hasil
+
+def tampilkan_invoice(transaksi_id, key=None):
+    buku = st.session_state.buku
+    # id yang belum ada di snapshot ini tidak ikut di-cache sebagai "tidak ditemukan";
+    # transaksi lama (bulan yang sudah diarsipkan) dicari di database
+    if buku.baris_transaksi(transaksi_id) is not None:
+        hasil = render_invoice(buku.id, transaksi_id, buku)
+    else:
+        hasil = render_invoice_arsip(buku.id, buku.versi, transaksi_id)
+    if hasil is None:
+        st.warning(f"Invoice dengan ID {transaksi_id} tidak ditemukan.")
+        return
+    invoice_text, invoice_html = hasil
+    st.markdown(invoice_html, unsafe_allow_html=True)
+    st.download_button(
+        label="📥 Download Invoice",
+        data=invoice_text,
+        file_name=f"invoice_{transaksi_id}.txt",
+        mime="text/plain",
+        key=key
+    )
+
+# File ekspor baru dibuat saat tombol unduh diklik (di thread terpisah Streamlit),
+# ditulis per potongan ke file sementara di disk lalu dikirim dari sana. Streamlit
+# hanya menerima file mentah (FileIO), jadi buffer tulisnya dilepas sebelum dikirim.
+def tombol_ekspor(label, nama_file, format, tulis, key):
+    def buat_file():
+        berkas = tempfile.TemporaryFile(buffering=0)
+        f = io.BufferedWriter(berkas)
+        tulis(f)
+        f.flush()
+        f.detach()
+        berkas.seek(0)
+        return berkas
+    st.download_button(label, buat_file, file_name=f"{nama_file}.{format}", mime=ekspor.MIME[format], key=key)
+
+def ekspor_tabel(nama_file, potongan, kolom, nama_lembar, key):
+    # potongan: fungsi tanpa argumen yang mengembalikan iterator potongan DataFrame
+    col_ekspor1, col_ekspor2 = st.columns([1, 3])
+    with col_ekspor1:
+        format = st.selectbox("Format", ekspor.FORMAT_EKSPOR, key=f"{key}_format", label_visibility="collapsed")
+    with col_ekspor2:
+        tombol_ekspor(
+            f"📥 Ekspor {format.upper()}", nama_file, format,
+            lambda f: ekspor.tulis_tabel(potongan(), kolom, format, f, nama_lembar), key=key,
+        )
+
+# Laporan berat dihitung di pool latar belakang (laporan_latar.py). Selama versi
+# terbarunya belum selesai, hasil terakhir yang sudah jadi ditampilkan (None kalau
+# belum pernah ada) dan halaman dijalankan ulang otomatis begitu selesai. Laporan
+# yang gagal tidak dihitung ulang sampai ada posting baru; error-nya ditampilkan.
+pool_laporan = get_pool_laporan()
+laporan_menunggu = []
+
+def ambil_laporan(nama, parameter, fungsi, *args):
+    buku = st.session_state.buku
+    try:
+        hasil, menunggu = pool_laporan.minta(nama, parameter, (buku.id, buku.versi), fungsi, *args)
+    except LaporanGagal as e:
+        st.error(f"❌ Laporan gagal dihitung: {e}")
+        return None
+    if menunggu is not None:
+        laporan_menunggu.append(menunggu)
+        if hasil is None:
+            st.info("⏳ Laporan sedang dihitung di latar belakang...")
+        else:
+            st.caption("⏳ Menampilkan hasil terakhir; data terbaru sedang dihitung...")
+    return hasil
+
+# Jurnal & riwayat transaksi ditampilkan per halaman (lihat ringkasan_halaman/isi_halaman)
+UKURAN_HALAMAN = [50, 100, 500]
+# Katalog di Pengaturan Harga diedit per halaman
+PRODUK_PER_HALAMAN = 25
+# Daftar tagihan terbuka di Piutang & Utang (urut jatuh tempo)
+BATAS_TAGIHAN_TAMPIL = 500
+
+def ukuran_data():
+    # Jumlah baris & memori tabel utama, dicatat profil di akhir setiap rerun
+    buku = st.session_state.buku
+    inventaris = st.session_state.inventaris
+    return {
+        'transaksi': (len(buku.transaksi), buku.ukuran_memori['transaksi']),
+        'jurnal': (len(buku.jurnal), buku.ukuran_memori['jurnal']),
+        'inventaris': (len(inventaris), inventaris.memory_usage(index=False).sum()),
+    }
 
-# FIX: Logika jurnal diperbaiki
-def update_jurnal(tanggal, keterangan, debit, kredit, akun_debit, akun_kredit):
-    new_entry_debit = {'tanggal': tanggal, 'keterangan': keterangan, 'debit': debit, 'kredit': 0, 'akun': akun_debit, 'kredit_akun': ''}
-    new_entry_kredit = {'tanggal': tanggal, 'keterangan': keterangan, 'debit': 0, 'kredit': kredit, 'akun': '', 'kredit_akun': akun_kredit}
-    st.session_state.jurnal = pd.concat([st.session_state.jurnal, pd.DataFrame([new_entry_debit, new_entry_kredit])], ignore_index=True)
+def tampilkan_halaman(tabel, filter, key):
+    buku = st.session_state.buku
+    ringkasan = ringkasan_halaman(tabel, buku.id, buku.versi, filter)
+    jumlah_baris = ringkasan['jumlah_baris']
+    col_halaman1, col_halaman2 = st.columns(2)
+    with col_halaman1:
+        ukuran = st.selectbox("Baris per halaman", UKURAN_HALAMAN, key=f"{key}_ukuran")
+    jumlah_halaman = max(1, -(-jumlah_baris // ukuran))
+    with col_halaman2:
+        halaman = st.number_input(f"Halaman (dari {jumlah_halaman})", min_value=1, step=1, key=f"{key}_halaman")
+    halaman = min(int(halaman), jumlah_halaman)
+    offset = (halaman - 1) * ukuran
+    st.dataframe(isi_halaman(tabel, buku.id, buku.versi, filter, ukuran, offset), use_container_width=True)
+    st.caption(f"Baris {min(offset + 1, jumlah_baris):,}–{min(offset + ukuran, jumlah_baris):,} dari {jumlah_baris:,}")
+    return ringkasan
+
+# Impor riwayat lama per potongan: tiap potongan ditulis ke database lalu langsung
+# ditambahkan ke buku besar, jadi file besar tidak pernah dimuat utuh ke memori
+@profil.fungsi
+def impor_data_lama(file, perbarui_stok):
+    inventaris = st.session_state.inventaris
+    satuan_bahan = dict(zip(inventaris['item'], inventaris['satuan']))
+    progress = st.progress(0.0, text="Membaca file...")
+    ukuran = getattr(file, 'size', 0) or 1
+
+    def tulis(transaksi, jurnal):
+        # stok & lot HPP diperbarui dalam transaksi SQLite yang sama dengan potongannya
+        bersama.posting_kolom(transaksi, jurnal, perbarui_stok)
+
+    def progres(ringkasan):
+        posisi = file.tell() if hasattr(file, 'tell') else ukuran
+        progress.progress(min(posisi / ukuran, 1.0), text=f"{ringkasan.jumlah_baris:,} baris dibaca, {ringkasan.jumlah_valid:,} diimpor")
+
+    try:
+        ringkasan = impor(file, st.session_state.harga_jual, satuan_bahan, tulis, progres=progres, katalog=st.session_state.katalog)
+    except (sqlite3.Error, ValueError, RuntimeError) as e:
+        st.error(f"❌ Impor gagal: {e}")
+        return None
+    finally:
+        segarkan_snapshot()
+    progress.progress(1.0, text="Impor selesai")
+
+    # Impor bertanggal lama membuka kembali bulan yang sudah ditutup; tutup lagi sekaligus
+    simpan_bersama(bersama.tutup_periode)
+    return ringkasan
 
 # FIX: Logika transaksi diubah agar mendukung metode pembayaran per item
-def tambah_transaksi_penjualan(tanggal, cart_items):
-    transaksi_id = str(uuid.uuid4())
-
-    for item_data in cart_items:
-        item = item_data['item']
-        qty = item_data['qty']
-        harga = item_data['harga']
-        metode_bayar = item_data['metode_bayar']
-        total = qty * harga
-
-        new_transaksi = {'transaksi_id': transaksi_id, 'tanggal': tanggal, 'jenis': 'Penjualan', 'metode_bayar': metode_bayar, 'item': item, 'qty': qty, 'harga': harga, 'total': total, 'catatan': ''}
-        st.session_state.transaksi = pd.concat([st.session_state.transaksi, pd.DataFrame([new_transaksi])], ignore_index=True)
-
-        # UPDATE: mengurangi stok bahan baku, tidak langsung produk jadi
-        # Asumsi 1 kue bawang butuh 0.1 kg Tepung Terigu
-        if 'kue bawang' in item:
-            st.session_state.inventaris.loc[st.session_state.inventaris['item'] == 'Tepung Terigu', 'qty'] -= qty * 0.1
-        if 'keripik kenikir' in item:
-            st.session_state.inventaris.loc[st.session_state.inventaris['item'] == 'Gula', 'qty'] -= qty * 0.05
-    
-    # Logika Jurnal
-    total_tunai = sum(item['qty'] * item['harga'] for item in cart_items if item['metode_bayar'] == 'Tunai')
-    total_kredit = sum(item['qty'] * item['harga'] for item in cart_items if item['metode_bayar'] == 'Kredit')
-    
-    if total_tunai > 0:
-        update_jurnal(tanggal, f'Penjualan Tunai ID {transaksi_id}', total_tunai, total_tunai, 'Kas', 'Penjualan')
-    if total_kredit > 0:
-        update_jurnal(tanggal, f'Penjualan Kredit ID {transaksi_id}', total_kredit, total_kredit, 'Piutang Usaha', 'Penjualan')
-
-    simpan_semua_data()
+@profil.fungsi
+def tambah_transaksi_penjualan(tanggal, cart_items, pelanggan):
+    # Jurnal & pengurangan stok bahan baku dikerjakan penulis bersama dalam satu transaksi;
+    # kalau gagal, keranjang tetap utuh
+    berhasil, transaksi_id = simpan_bersama(bersama.penjualan, tanggal, cart_items, pelanggan)
+    if not berhasil:
+        return
     st.session_state.cart = []
     st.balloons()
     st.session_state.last_invoice_id = transaksi_id
     st.success("Transaksi Penjualan berhasil dicatat!")
 
-def tambah_transaksi_pembelian():
-    for index, row in st.session_state.daftar_pembelian.iterrows():
-        item = row['item']
-        qty = row['qty']
-        harga = row['harga']
-        satuan = row['satuan']
-        metode_bayar_pembelian = row['metode_bayar']
-        total_harga = qty * harga
-
-        new_transaksi = {'transaksi_id': '', 'tanggal': date.today(), 'jenis': 'Pembelian', 'metode_bayar': metode_bayar_pembelian, 'item': item, 'qty': qty, 'harga': harga, 'total': total_harga, 'catatan': ''}
-        st.session_state.transaksi = pd.concat([st.session_state.transaksi, pd.DataFrame([new_transaksi])], ignore_index=True)
-        
-        if metode_bayar_pembelian == 'Tunai':
-            update_jurnal(date.today(), f'Pembelian {qty} {satuan} {item}', total_harga, total_harga, 'Bahan Baku', 'Kas')
-        elif metode_bayar_pembelian == 'Kredit':
-            update_jurnal(date.today(), f'Pembelian Kredit {qty} {satuan} {item}', total_harga, total_harga, 'Bahan Baku', 'Utang Usaha')
-
-        if item in st.session_state.inventaris['item'].values:
-            st.session_state.inventaris.loc[st.session_state.inventaris['item'] == item, 'qty'] += qty
-        else:
-            new_item = {'item': item, 'qty': qty, 'satuan': satuan, 'min_stok': 10, 'status': 'Cukup'}
-            st.session_state.inventaris = pd.concat([st.session_state.inventaris, pd.DataFrame([new_item])], ignore_index=True)
-
-    st.session_state.daftar_pembelian = pd.DataFrame(columns=['item', 'qty', 'satuan', 'harga', 'metode_bayar'])
-    simpan_semua_data()
+@profil.fungsi
+def tambah_transaksi_pembelian(pemasok):
+    berhasil, _ = simpan_bersama(bersama.pembelian, date.today(), st.session_state.daftar_pembelian, pemasok)
+    if not berhasil:
+        return
+    st.session_state.daftar_pembelian = akuntansi.daftar_pembelian_kosong()
     st.balloons()
     st.success("Pembelian berhasil dicatat!")
 
@@ -236,11 +272,8 @@ if st.session_state.is_editor_mode:
         col_reset1, col_reset2 = st.columns(2)
         with col_reset1:
             if st.button("Ya, Hapus Data"):
-                st.session_state.transaksi = pd.DataFrame(columns=st.session_state.transaksi.columns)
-                st.session_state.jurnal = pd.DataFrame(columns=st.session_state.jurnal.columns)
-                st.session_state.inventaris = pd.DataFrame(columns=st.session_state.inventaris.columns)
-                st.session_state.harga_jual = {}
-                st.session_state.daftar_pembelian = pd.DataFrame(columns=['item', 'qty', 'satuan', 'harga', 'metode_bayar'])
+                bersama.reset()
+                st.session_state.daftar_pembelian = akuntansi.daftar_pembelian_kosong()
                 st.session_state.cart = []
                 st.success("Semua data berhasil dihapus.")
                 st.session_state.reset_confirm = False
@@ -251,18 +284,36 @@ if st.session_state.is_editor_mode:
                 st.info("Penghapusan data dibatalkan.")
                 st.rerun()
 
+    with st.sidebar.expander("⏱️ Profil Kinerja"):
+        profil.aktif = st.checkbox("Aktifkan profil", value=profil.aktif, key="profil_aktif")
+        profil.rekam_cprofile = st.checkbox("Rekam cProfile", value=profil.rekam_cprofile, key="profil_cprofile", disabled=not profil.aktif)
+        if profil.riwayat:
+            terakhir = profil.riwayat[-1]
+            st.caption(f"Rerun terakhir: {terakhir['menu']} ({terakhir['total_ms']:,.1f} ms), {len(profil.riwayat)} rerun tercatat")
+            st.dataframe(pd.DataFrame(profil.ringkasan()), hide_index=True, use_container_width=True)
+            st.dataframe(pd.DataFrame(terakhir['data']).T, use_container_width=True)
+            st.download_button("📥 Unduh JSON", profil.ke_json(), file_name="profil.json", mime="application/json", key="unduh_profil_json")
+            data_prof = profil.ke_prof()
+            if data_prof is not None:
+                st.download_button("📥 Unduh cProfile (.prof)", data_prof, file_name="profil.prof", mime="application/octet-stream", key="unduh_profil_prof")
+            if st.button("Reset Profil"):
+                profil.reset()
+                st.rerun()
+        elif profil.aktif:
+            st.caption("Belum ada rerun yang tercatat.")
+profil.tandai("sidebar")
+
 
 # --- MENU DASHBOARD ---
 if menu == "Dashboard":
     st.header("📊 Dashboard Keuangan")
     st.markdown("Ringkasan cepat performa bisnis Anda.")
     
-    df_penjualan = st.session_state.transaksi[st.session_state.transaksi['jenis'] == 'Penjualan']
-    df_biaya_pembelian = st.session_state.transaksi[st.session_state.transaksi['jenis'] == 'Pembelian']
-    
-    total_penjualan = df_penjualan['total'].sum()
-    total_biaya = df_biaya_pembelian['total'].sum()
-    laba_bersih = total_penjualan - total_biaya
+    buku = st.session_state.buku
+    laporan = akuntansi.laba_rugi(buku)
+    total_penjualan = laporan['pendapatan']
+    total_biaya = laporan['beban']
+    laba_bersih = laporan['laba']
     
     col_dash1, col_dash2, col_dash3 = st.columns(3)
     with col_dash1:
@@ -274,19 +325,16 @@ if menu == "Dashboard":
         
     st.markdown("---")
     
+    fig_tren, fig_pie = ambil_laporan('grafik_dashboard', (), akuntansi.grafik_dashboard, buku.rekap) or (None, None)
+
     st.write("### Tren Penjualan Bulanan")
-    if not df_penjualan.empty:
-        df_penjualan['bulan'] = df_penjualan['tanggal'].apply(lambda x: x.strftime('%Y-%m'))
-        df_tren_penjualan = df_penjualan.groupby('bulan')['total'].sum().reset_index()
-        fig_tren = px.bar(df_tren_penjualan, x='bulan', y='total', title='Tren Penjualan dari Waktu ke Waktu')
+    if fig_tren is not None:
         st.plotly_chart(fig_tren, use_container_width=True)
     else:
         st.info("Tidak ada data penjualan untuk ditampilkan.")
     
     st.write("### Penjualan Berdasarkan Produk")
-    if not df_penjualan.empty:
-        df_penjualan_per_produk = df_penjualan.groupby('item')['qty'].sum().reset_index()
-        fig_pie = px.pie(df_penjualan_per_produk, values='qty', names='item', title='Distribusi Penjualan Produk')
+    if fig_pie is not None:
         st.plotly_chart(fig_pie, use_container_width=True)
     else:
         st.info("Tidak ada data penjualan untuk ditampilkan.")
@@ -300,13 +348,16 @@ elif menu == "Catat Transaksi":
 
     with col1:
         st.subheader("Produk & Daftar Jual")
-        item_pos = st.selectbox("Pilih Produk", list(st.session_state.harga_jual.keys()))
+        # Pencarian lewat katalog (awalan nama/kode/barcode, lalu fuzzy); hasil scan
+        # barcode yang cocok persis langsung terpilih
+        cari_pos = st.text_input("Cari Produk (nama, kode, atau barcode)", key="cari_produk")
+        item_pos = st.selectbox("Pilih Produk", st.session_state.katalog.cari(cari_pos))
         qty_pos = st.number_input("Jumlah (pcs)", min_value=1, step=1)
         
         harga_pos = st.session_state.harga_jual.get(item_pos, 0)
         st.info(f"Harga per item: Rp{harga_pos:,.0f}")
         
-        if st.button("➕ Tambah Produk"):
+        if st.button("➕ Tambah Produk", disabled=item_pos is None):
             st.session_state.cart.append({'item': item_pos, 'qty': qty_pos, 'harga': harga_pos, 'metode_bayar': 'Tunai'})
     
     with col2:
@@ -323,7 +374,8 @@ elif menu == "Catat Transaksi":
                         required=True
                     )
                 },
-                use_container_width=True
+                use_container_width=True,
+                key="editor_keranjang"
             )
             st.session_state.cart = edited_df_cart.to_dict('records')
 
@@ -331,73 +383,46 @@ elif menu == "Catat Transaksi":
             df_cart['total'] = df_cart['qty'] * df_cart['harga']
             
             st.markdown(f"### **Total Belanja: Rp{df_cart['total'].sum():,.0f}**")
+
+            # Bagian kredit dicatat sebagai piutang atas nama pelanggan ini
+            pelanggan = ""
+            if (df_cart['metode_bayar'] == 'Kredit').any():
+                pelanggan = st.text_input("Nama Pelanggan (Kredit)", key="pelanggan_kredit").strip()
             
             if st.button("Bayar & Simpan Transaksi"):
-                tambah_transaksi_penjualan(date.today(), st.session_state.cart)
+                tambah_transaksi_penjualan(date.today(), st.session_state.cart, pelanggan)
     
     if st.session_state.last_invoice_id:
         st.markdown("---")
         st.header("🧾 Invoice Terakhir")
-        invoice_df = st.session_state.transaksi[st.session_state.transaksi['transaksi_id'] == st.session_state.last_invoice_id]
-        if not invoice_df.empty:
-            total_invoice = invoice_df['total'].sum()
-            invoice_text = f"""
-Invoice Aneka Snack
-========================================
-ID Transaksi: {st.session_state.last_invoice_id}
-Tanggal: {invoice_df['tanggal'].iloc[0]}
-Metode Pembayaran: {', '.join(invoice_df['metode_bayar'].unique())}
-----------------------------------------
-Items:
-"""
-            for _, row in invoice_df.iterrows():
-                invoice_text += f"  - {row['item']} ({row['qty']} pcs) | Rp{row['total']:,.0f} ({row['metode_bayar']})\n"
-            
-            invoice_text += f"""
-----------------------------------------
-Total: Rp{total_invoice:,.0f}
-========================================
-"""
-            st.markdown(f"""
-            <div class="invoice">
-                <div class="invoice-header">
-                    <h2>Invoice Aneka Snack</h2>
-                    <p>ID Transaksi: {st.session_state.last_invoice_id}</p>
-                    <p>Tanggal: {invoice_df['tanggal'].iloc[0]}</p>
-                    <p>Metode Pembayaran: {', '.join(invoice_df['metode_bayar'].unique())}</p>
-                </div>
-                <div>
-                    <strong>Items:</strong>
-                    <ul>
-            """, unsafe_allow_html=True)
-            for _, row in invoice_df.iterrows():
-                st.markdown(f"""
-                <li class="invoice-item">
-                    <span>{row['item']} ({row['qty']} pcs)</span>
-                    <span>Rp{row['total']:,.0f} ({row['metode_bayar']})</span>
-                </li>
-                """, unsafe_allow_html=True)
-            st.markdown(f"""
-                    </ul>
-                </div>
-                <div class="invoice-total">
-                    Total: Rp{total_invoice:,.0f}
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            st.download_button(
-                label="📥 Download Invoice",
-                data=invoice_text,
-                file_name=f"invoice_{st.session_state.last_invoice_id}.txt",
-                mime="text/plain"
-            )
+        tampilkan_invoice(st.session_state.last_invoice_id)
 
         if st.button("Selesaikan Transaksi Baru"):
             st.session_state.last_invoice_id = None
             st.rerun()
 
-    tab_pembelian = st.tabs(["Catat Pembelian Bahan Baku"])
+    with st.expander("🔎 Cetak Ulang Invoice"):
+        id_cetak_ulang = st.text_input("ID Transaksi").strip()
+        if id_cetak_ulang:
+            tampilkan_invoice(id_cetak_ulang, key="download_cetak_ulang")
+        st.markdown("---")
+        st.write("Semua invoice penjualan dalam rentang tanggal (satu invoice per halaman PDF):")
+        col_invoice1, col_invoice2 = st.columns(2)
+        with col_invoice1:
+            invoice_dari = st.date_input("Dari Tanggal", value=date.today().replace(day=1), key="invoice_dari")
+        with col_invoice2:
+            invoice_sampai = st.date_input("Sampai Tanggal", value=date.today(), key="invoice_sampai")
+        db = get_penyimpanan()
+        tombol_ekspor(
+            "📥 Unduh Invoice (PDF)", f"invoice_{invoice_dari}_{invoice_sampai}", 'pdf',
+            lambda f: ekspor.tulis_invoice_pdf(db.potongan_transaksi(ekspor.UKURAN_POTONGAN, invoice_dari, invoice_sampai, 'Penjualan'), f),
+            key="unduh_invoice_pdf",
+        )
+
+    daftar_tab = ["Catat Pembelian Bahan Baku"]
+    if st.session_state.is_editor_mode:
+        daftar_tab.append("Impor Data Lama")
+    tab_pembelian = st.tabs(daftar_tab)
     with tab_pembelian[0]:
         st.subheader("🛒 Catat Pembelian Bahan Baku")
         with st.form("form_pembelian"):
@@ -442,21 +467,64 @@ Total: Rp{total_invoice:,.0f}
             st.dataframe(st.session_state.daftar_pembelian, use_container_width=True)
             total_pembelian = (st.session_state.daftar_pembelian['qty'] * st.session_state.daftar_pembelian['harga']).sum()
             st.info(f"**Total Pembelian: Rp{total_pembelian:,.0f}**")
+
+            pemasok = ""
+            if (st.session_state.daftar_pembelian['metode_bayar'] == 'Kredit').any():
+                pemasok = st.text_input("Nama Pemasok (Kredit)", key="pemasok_kredit").strip()
             
             if st.button("Selesai & Simpan Pembelian"):
-                tambah_transaksi_pembelian()
+                tambah_transaksi_pembelian(pemasok)
+
+    if st.session_state.is_editor_mode:
+        with tab_pembelian[1]:
+            st.subheader("📂 Impor Riwayat Penjualan & Pembelian")
+            st.caption(
+                "Kolom wajib: tanggal, jenis (Penjualan/Pembelian), item, qty. "
+                "Kolom opsional: transaksi_id, metode_bayar, harga, total, catatan. "
+                "Harga penjualan yang kosong diambil dari daftar harga jual."
+            )
+            file_impor = st.file_uploader("File CSV atau Parquet", type=['csv', 'parquet'])
+            perbarui_stok = st.checkbox("Perbarui stok bahan baku sesuai data yang diimpor", value=False)
+            if file_impor is not None and st.button("Mulai Impor"):
+                ringkasan = impor_data_lama(file_impor, perbarui_stok)
+                if ringkasan is not None:
+                    st.success(f"✅ {ringkasan.jumlah_valid:,} dari {ringkasan.jumlah_baris:,} baris berhasil diimpor.")
+                    if ringkasan.alasan_ditolak:
+                        st.warning("Sebagian baris ditolak:")
+                        st.json(ringkasan.alasan_ditolak)
+                        st.dataframe(pd.DataFrame(ringkasan.contoh_ditolak), use_container_width=True)
 
 # --- MENU INVENTARIS ---
 elif menu == "Inventaris":
     st.header("📦 Inventaris Produk & Bahan Baku")
     st.markdown("### Status Stok")
     
-    st.session_state.inventaris['status'] = st.session_state.inventaris.apply(
-        lambda row: 'Perlu Restock' if row['qty'] <= row['min_stok'] else 'Cukup', axis=1
-    )
-    
+    # Kolom status dihitung ulang oleh penulis bersama setiap kali stok berubah
     st.dataframe(st.session_state.inventaris, use_container_width=True)
 
+    st.markdown("### Prakiraan Restock")
+    st.caption(
+        f"Laju pemakaian dari penjualan {HARI_RIWAYAT} hari terakhir (rata-rata terbesar dari jendela "
+        f"{' & '.join(map(str, JENDELA_HARI))} hari). Saran beli mencukupi {WAKTU_TUNGGU_HARI} hari waktu tunggu "
+        f"+ {TARGET_CAKUPAN_HARI} hari di atas stok minimum."
+    )
+    restock = st.session_state.restock.sort_values('cakupan_hari', kind='stable')
+    perlu_restock = restock[restock['status'] == 'Perlu Restock']
+    if not perlu_restock.empty:
+        st.warning("Perlu restock: " + ", ".join(
+            f"{baris.item} (beli {baris.saran_beli:,.0f} {baris.satuan})" for baris in perlu_restock.itertuples()))
+    st.dataframe(
+        restock,
+        column_config={
+            "laju_harian": st.column_config.NumberColumn("Pemakaian/Hari", format="%.2f"),
+            "cakupan_hari": st.column_config.NumberColumn("Cakupan (hari)", format="%.1f"),
+            "habis_tanggal": st.column_config.DateColumn("Perkiraan Habis"),
+            "saran_beli": st.column_config.NumberColumn("Saran Beli", format="%.0f"),
+        },
+        use_container_width=True,
+        hide_index=True,
+    )
+
     st.markdown("---")
     if st.session_state.is_editor_mode:
         st.write("### Tambah/Edit Stok Inventaris")
@@ -466,14 +534,10 @@ elif menu == "Inventaris":
             satuan_inv = st.text_input("Satuan", "kg")
             min_stok_inv = st.number_input("Stok Minimum", min_value=0, step=1, value=10)
             if st.form_submit_button("Update Inventaris"):
-                if item_inv in st.session_state.inventaris['item'].values:
-                    st.session_state.inventaris.loc[st.session_state.inventaris['item'] == item_inv, ['qty', 'satuan', 'min_stok']] = [qty_inv, satuan_inv, min_stok_inv]
-                else:
-                    new_item = {'item': item_inv, 'qty': qty_inv, 'satuan': satuan_inv, 'min_stok': min_stok_inv, 'status': 'Cukup'}
-                    st.session_state.inventaris = pd.concat([st.session_state.inventaris, pd.DataFrame([new_item])], ignore_index=True)
-                simpan_semua_data()
-                st.success("Inventaris berhasil diupdate!")
-                st.rerun()
+                berhasil, _ = simpan_bersama(bersama.simpan_item_inventaris, item_inv, qty_inv, satuan_inv, min_stok_inv)
+                if berhasil:
+                    st.success("Inventaris berhasil diupdate!")
+                    st.rerun()
     else:
         st.info("Anda harus masuk ke Mode Editor untuk mengubah inventaris.")
 
@@ -481,55 +545,173 @@ elif menu == "Inventaris":
 elif menu == "Laporan Keuangan":
     st.header("📚 Laporan Keuangan Detail")
     
-    tab_laba_rugi, tab_neraca, tab_jurnal_detail = st.tabs(["Laporan Laba-Rugi", "Neraca Saldo", "Jurnal Umum"])
+    tab_laba_rugi, tab_neraca, tab_piutang_utang, tab_jurnal_detail, tab_riwayat = st.tabs(
+        ["Laporan Laba-Rugi", "Neraca Saldo", "Piutang & Utang", "Jurnal Umum", "Riwayat Transaksi"])
     
     with tab_laba_rugi:
         st.subheader("Laporan Laba-Rugi")
-        
-        pendapatan_penjualan = st.session_state.transaksi[st.session_state.transaksi['jenis'] == 'Penjualan']['total'].sum()
-        beban_pokok_penjualan = st.session_state.transaksi[st.session_state.transaksi['jenis'] == 'Pembelian']['total'].sum()
-        laba_kotor = pendapatan_penjualan - beban_pokok_penjualan
-        
-        st.write(f"**Pendapatan Penjualan**: Rp{pendapatan_penjualan:,.0f}")
-        st.write(f"**Beban Pokok Penjualan**: Rp{beban_pokok_penjualan:,.0f}")
+        col_periode1, col_periode2 = st.columns(2)
+        with col_periode1:
+            laba_rugi_dari = st.date_input("Dari Tanggal", value=None, key="laba_rugi_dari")
+        with col_periode2:
+            laba_rugi_sampai = st.date_input("Sampai Tanggal", value=None, key="laba_rugi_sampai")
+
+        buku = st.session_state.buku
+        if laba_rugi_dari is None and laba_rugi_sampai is None:
+            laporan = akuntansi.laba_rugi(buku)
+        else:
+            laporan = ambil_laporan(
+                'laba_rugi', (laba_rugi_dari, laba_rugi_sampai), akuntansi.laba_rugi_periode,
+                st.session_state.periode, get_penyimpanan(), laba_rugi_dari, laba_rugi_sampai,
+            )
+        if laporan is not None:
+            pendapatan_penjualan = laporan['pendapatan']
+            beban_pokok_penjualan = laporan['beban']
+            laba_kotor = laporan['laba']
+
+            st.write(f"**Pendapatan Penjualan**: Rp{pendapatan_penjualan:,.0f}")
+            st.write(f"**Beban Pokok Penjualan**: Rp{beban_pokok_penjualan:,.0f}")
+            st.markdown("---")
+            st.write(f"**Laba Bersih**: Rp{laba_kotor:,.0f}")
+
         st.markdown("---")
-        st.write(f"**Laba Bersih**: Rp{laba_kotor:,.0f}")
+        st.write("Laporan bulanan (laba-rugi per bulan & saldo neraca akhir bulan) untuk rentang tanggal di atas:")
+        periode_buku, db = st.session_state.periode, get_penyimpanan()
+        ekspor_tabel(
+            "laporan_bulanan",
+            lambda: ekspor.laporan_bulanan(periode_buku, db, laba_rugi_dari, laba_rugi_sampai),
+            ekspor.KOLOM_LAPORAN_BULANAN, "Laporan Bulanan", key="ekspor_laporan",
+        )
         
     with tab_neraca:
         st.subheader("Neraca Saldo")
-        
-        saldo_kas = st.session_state.jurnal[st.session_state.jurnal['akun'] == 'Kas']['debit'].sum() - st.session_state.jurnal[st.session_state.jurnal['kredit_akun'] == 'Kas']['kredit'].sum()
-        saldo_piutang = st.session_state.jurnal[st.session_state.jurnal['akun'] == 'Piutang Usaha']['debit'].sum()
-        saldo_bahan_baku = st.session_state.jurnal[st.session_state.jurnal['akun'] == 'Bahan Baku']['debit'].sum()
-        saldo_utang = st.session_state.jurnal[st.session_state.jurnal['kredit_akun'] == 'Utang Usaha']['kredit'].sum()
-        
-        total_aset = saldo_kas + saldo_piutang + saldo_bahan_baku
-        total_kewajiban_ekuitas = saldo_utang + laba_kotor
-        
-        st.markdown(f"""
-        ### **Aset: Rp{total_aset:,.0f}**
-        <p>Kas: Rp{saldo_kas:,.0f}</p>
-        <p>Piutang Usaha: Rp{saldo_piutang:,.0f}</p>
-        <p>Bahan Baku (Inventaris): Rp{saldo_bahan_baku:,.0f}</p>
-        
-        <br>
-        
-        ### **Kewajiban & Ekuitas: Rp{total_kewajiban_ekuitas:,.0f}**
-        <p>Utang Usaha: Rp{saldo_utang:,.0f}</p>
-        <p>Ekuitas (Laba): Rp{laba_kotor:,.0f}</p>
-        """, unsafe_allow_html=True)
-        
-        st.markdown("---")
-        if total_aset == total_kewajiban_ekuitas:
-            st.success("✅ Neraca Saldo Seimbang!")
+        neraca_per = st.date_input("Per Tanggal", value=None, key="neraca_per")
+
+        buku = st.session_state.buku
+        if neraca_per is None:
+            neraca = akuntansi.neraca_saldo(buku)
         else:
-            st.error("❌ Neraca Saldo Belum Seimbang. Ada ketidaksesuaian data.")
+            neraca = ambil_laporan(
+                'neraca_saldo', (neraca_per,), akuntansi.neraca_saldo_periode,
+                st.session_state.periode, get_penyimpanan(), neraca_per,
+            )
+        if neraca is not None:
+            saldo_kas = neraca['kas']
+            saldo_piutang = neraca['piutang']
+            saldo_bahan_baku = neraca['bahan_baku']
+            saldo_utang = neraca['utang']
+
+            total_aset = neraca['total_aset']
+            total_kewajiban_ekuitas = neraca['total_kewajiban_ekuitas']
+
+            st.markdown(f"""
+            ### **Aset: Rp{total_aset:,.0f}**
+            <p>Kas: Rp{saldo_kas:,.0f}</p>
+            <p>Piutang Usaha: Rp{saldo_piutang:,.0f}</p>
+            <p>Bahan Baku (Inventaris): Rp{saldo_bahan_baku:,.0f}</p>
+
+            <br>
+
+            ### **Kewajiban & Ekuitas: Rp{total_kewajiban_ekuitas:,.0f}**
+            <p>Utang Usaha: Rp{saldo_utang:,.0f}</p>
+            <p>Ekuitas (Laba): Rp{neraca['laba']:,.0f}</p>
+            """, unsafe_allow_html=True)
+
+            st.markdown("---")
+            if total_aset == total_kewajiban_ekuitas:
+                st.success("✅ Neraca Saldo Seimbang!")
+            else:
+                st.error("❌ Neraca Saldo Belum Seimbang. Ada ketidaksesuaian data.")
+
+        ditutup_sampai = st.session_state.periode.ditutup_sampai
+        st.caption(f"Buku ditutup s.d. periode {ditutup_sampai}" if ditutup_sampai else "Belum ada periode yang ditutup.")
+
+        if st.session_state.is_editor_mode:
+            if st.button("🔒 Tutup Buku s.d. Bulan Lalu"):
+                berhasil, ditutup_sampai = simpan_bersama(bersama.tutup_periode)
+                if berhasil:
+                    st.info(f"Buku ditutup s.d. periode {ditutup_sampai or '-'}.")
+            if st.button("🔄 Hitung Ulang Saldo dari Jurnal"):
+                selisih = bersama.hitung_ulang_saldo()
+                segarkan_snapshot()
+                if selisih:
+                    st.warning(f"Saldo diperbaiki untuk akun: {', '.join(a or '(kosong)' for a in selisih)}")
+                else:
+                    st.success("✅ Saldo akun cocok dengan perhitungan ulang jurnal.")
+                st.dataframe(st.session_state.buku.saldo.tabel(), use_container_width=True)
+
+    with tab_piutang_utang:
+        st.subheader("Buku Pembantu Piutang & Utang")
+        pembantu = st.session_state.pembantu
+        col_pembantu1, col_pembantu2 = st.columns(2)
+        with col_pembantu1:
+            jenis_tagihan = st.radio("Jenis", JENIS_TAGIHAN, horizontal=True, key="jenis_tagihan")
+        with col_pembantu2:
+            umur_per = st.date_input("Umur Per Tanggal", value=date.today(), key="umur_per")
+
+        akun_kontrol = akuntansi.AKUN_PENJUALAN['Kredit'] if jenis_tagihan == 'Piutang' else akuntansi.AKUN_PEMBELIAN['Kredit']
+        saldo_kontrol = st.session_state.buku.saldo.saldo(akun_kontrol)
+        if jenis_tagihan == 'Utang':
+            saldo_kontrol = -saldo_kontrol
+        st.info(f"**Total {jenis_tagihan} Belum Lunas: Rp{pembantu.total(jenis_tagihan):,.0f}** (saldo akun {akun_kontrol}: Rp{saldo_kontrol:,.0f})")
+
+        st.markdown(f"**Umur {jenis_tagihan} per Pihak**")
+        umur = pembantu.umur(jenis_tagihan, umur_per)
+        if len(umur):
+            umur.loc['Total'] = umur.sum()
+        st.dataframe(umur.style.format("Rp{:,.0f}"), use_container_width=True)
+
+        pihak_tagihan = st.selectbox("Pihak", ["Semua"] + pembantu.daftar_pihak(jenis_tagihan), key="pihak_tagihan")
+        terbuka = pembantu.terbuka(jenis_tagihan, None if pihak_tagihan == "Semua" else pihak_tagihan)
+        if len(terbuka) > BATAS_TAGIHAN_TAMPIL:
+            st.caption(f"Menampilkan {BATAS_TAGIHAN_TAMPIL:,} dari {len(terbuka):,} tagihan dengan jatuh tempo paling awal.")
+        st.dataframe(terbuka.head(BATAS_TAGIHAN_TAMPIL), use_container_width=True, hide_index=True)
+
+        with st.form("form_pelunasan"):
+            st.markdown(f"**Catat Pelunasan {jenis_tagihan}**")
+            col_lunas1, col_lunas2, col_lunas3 = st.columns(3)
+            with col_lunas1:
+                id_tagihan = st.number_input("ID Tagihan", min_value=1, step=1, value=int(terbuka['id'].iloc[0]) if len(terbuka) else 1)
+            with col_lunas2:
+                jumlah_pelunasan = st.number_input("Jumlah Dibayar", min_value=0, step=1000)
+            with col_lunas3:
+                tanggal_pelunasan = st.date_input("Tanggal Bayar", value=date.today())
+            if st.form_submit_button("💰 Simpan Pelunasan"):
+                try:
+                    berhasil, sisa_tagihan = simpan_bersama(bersama.pelunasan, tanggal_pelunasan, int(id_tagihan), jumlah_pelunasan)
+                except ValueError as e:
+                    st.error(f"❌ {e}")
+                else:
+                    if berhasil:
+                        st.info(f"Sisa tagihan #{int(id_tagihan)}: Rp{sisa_tagihan:,.0f}" if sisa_tagihan else f"Tagihan #{int(id_tagihan)} lunas.")
 
     with tab_jurnal_detail:
         st.subheader("Jurnal Umum Detail")
-        st.dataframe(st.session_state.jurnal, use_container_width=True)
-        total_debit = st.session_state.jurnal['debit'].sum()
-        total_kredit = st.session_state.jurnal['kredit'].sum()
+        col_filter1, col_filter2, col_filter3, col_filter4 = st.columns(4)
+        with col_filter1:
+            jurnal_dari = st.date_input("Dari Tanggal", value=None, key="jurnal_dari")
+        with col_filter2:
+            jurnal_sampai = st.date_input("Sampai Tanggal", value=None, key="jurnal_sampai")
+        with col_filter3:
+            jurnal_akun = st.selectbox("Akun", ["Semua"] + st.session_state.buku.saldo.daftar_akun(), key="jurnal_akun")
+        with col_filter4:
+            jurnal_kata = st.text_input("Cari Keterangan", key="jurnal_kata").strip()
+        filter_jurnal = {
+            'dari': jurnal_dari,
+            'sampai': jurnal_sampai,
+            'akun': None if jurnal_akun == "Semua" else jurnal_akun,
+            'kata': jurnal_kata or None,
+        }
+        ringkasan_jurnal = tampilkan_halaman('jurnal', filter_jurnal, key="halaman_jurnal")
+        db = get_penyimpanan()
+        ekspor_tabel(
+            "jurnal_umum", lambda: db.potongan_jurnal(ekspor.UKURAN_POTONGAN, **filter_jurnal),
+            KOLOM_JURNAL, "Jurnal Umum", key="ekspor_jurnal",
+        )
+        if any(v is not None for v in filter_jurnal.values()):
+            st.write(f"Total sesuai filter — Debit: Rp{ringkasan_jurnal['total_debit']:,.0f}, Kredit: Rp{ringkasan_jurnal['total_kredit']:,.0f}")
+        total_debit = st.session_state.buku.saldo.total_debit()
+        total_kredit = st.session_state.buku.saldo.total_kredit()
         st.markdown("---")
         col_jurnal1, col_jurnal2 = st.columns(2)
         with col_jurnal1:
@@ -540,21 +722,105 @@ elif menu == "Laporan Keuangan":
             st.success("✅ Jurnal Seimbang!")
         else:
             st.error("❌ Jurnal Tidak Seimbang. Silakan periksa kembali data.")
+
+    with tab_riwayat:
+        st.subheader("Riwayat Transaksi")
+        col_filter1, col_filter2, col_filter3, col_filter4, col_filter5 = st.columns(5)
+        with col_filter1:
+            riwayat_dari = st.date_input("Dari Tanggal", value=None, key="riwayat_dari")
+        with col_filter2:
+            riwayat_sampai = st.date_input("Sampai Tanggal", value=None, key="riwayat_sampai")
+        with col_filter3:
+            riwayat_jenis = st.selectbox("Jenis", ["Semua", "Penjualan", "Pembelian"], key="riwayat_jenis")
+        with col_filter4:
+            daftar_item = sorted(set(st.session_state.harga_jual) | set(st.session_state.inventaris['item']))
+            riwayat_item = st.selectbox("Item", ["Semua"] + daftar_item, key="riwayat_item")
+        with col_filter5:
+            riwayat_kata = st.text_input("Cari ID/Catatan", key="riwayat_kata").strip()
+        filter_riwayat = {
+            'dari': riwayat_dari,
+            'sampai': riwayat_sampai,
+            'jenis': None if riwayat_jenis == "Semua" else riwayat_jenis,
+            'item': None if riwayat_item == "Semua" else riwayat_item,
+            'kata': riwayat_kata or None,
+        }
+        ringkasan_riwayat = tampilkan_halaman('transaksi', filter_riwayat, key="halaman_riwayat")
+        db = get_penyimpanan()
+        ekspor_tabel(
+            "riwayat_transaksi", lambda: db.potongan_transaksi(ekspor.UKURAN_POTONGAN, **filter_riwayat),
+            KOLOM_TRANSAKSI, "Riwayat Transaksi", key="ekspor_riwayat",
+        )
+        col_riwayat1, col_riwayat2 = st.columns(2)
+        with col_riwayat1:
+            st.info(f"**Total Qty: {ringkasan_riwayat['total_qty']:,.0f}**")
+        with col_riwayat2:
+            st.info(f"**Total Nilai: Rp{ringkasan_riwayat['total']:,.0f}**")
         
 # --- MENU PENGATURAN HARGA ---
 elif menu == "Pengaturan Harga":
     st.header("⚙️ Pengaturan Harga Produk")
     if st.session_state.is_editor_mode:
-        st.write("Anda bisa mengubah harga jual produk di sini.")
-        if st.session_state.harga_jual:
-            for item, harga in st.session_state.harga_jual.items():
-                st.session_state.harga_jual[item] = st.number_input(f"Harga Jual {item}", value=harga, min_value=0)
-        else:
+        st.write("Anda bisa mengubah harga jual, kode, dan barcode produk di sini, atau menambah produk baru di baris paling bawah. Harga baru berlaku mulai hari ini; harga lama tetap tersimpan di riwayat.")
+        katalog = st.session_state.katalog
+        col_katalog1, col_katalog2 = st.columns([2, 1])
+        with col_katalog1:
+            cari_harga = st.text_input("Cari Produk", key="cari_katalog")
+        produk_cocok = katalog.saring(cari_harga)
+        jumlah_halaman = max(1, -(-len(produk_cocok) // PRODUK_PER_HALAMAN))
+        with col_katalog2:
+            halaman_katalog = st.number_input(f"Halaman (dari {jumlah_halaman})", min_value=1, step=1, key="halaman_katalog")
+        offset = (min(int(halaman_katalog), jumlah_halaman) - 1) * PRODUK_PER_HALAMAN
+        halaman_produk = produk_cocok.iloc[offset:offset + PRODUK_PER_HALAMAN].reset_index(drop=True)
+        if produk_cocok.empty:
             st.warning("Tidak ada data harga jual yang ditemukan.")
 
+        edited_katalog = st.data_editor(
+            halaman_produk,
+            num_rows="add",
+            column_config={
+                "item": st.column_config.TextColumn("Produk", required=True),
+                "kode": st.column_config.TextColumn("Kode / SKU"),
+                "barcode": st.column_config.TextColumn("Barcode"),
+                "harga": st.column_config.NumberColumn("Harga Jual", min_value=0, step=500, format="%d", required=True),
+            },
+            use_container_width=True,
+            key=f"editor_katalog_{cari_harga}_{offset}",
+        )
+        st.caption(f"{len(produk_cocok):,} produk cocok dari {len(katalog):,}")
+
         if st.button("Simpan Perubahan Harga"):
-            simpan_semua_data()
-            st.success("Harga berhasil diupdate!")
+            try:
+                perubahan = katalog.perubahan(edited_katalog, halaman_produk['item'].tolist())
+            except ValueError as e:
+                st.error(f"❌ {e}")
+            else:
+                berhasil, _ = simpan_bersama(bersama.ubah_katalog, perubahan)
+                if berhasil:
+                    st.success("Harga berhasil diupdate!")
+
+        with st.expander("📜 Riwayat Harga"):
+            item_riwayat = st.selectbox("Produk", halaman_produk['item'].tolist(), key="riwayat_harga_produk")
+            if item_riwayat is not None:
+                st.dataframe(st.session_state.katalog.riwayat_harga(item_riwayat), use_container_width=True)
+
+        st.markdown("---")
+        st.subheader("🧾 Resep Produk")
+        st.write("Jumlah bahan baku yang terpakai untuk setiap 1 pcs produk. Stok bahan berkurang otomatis saat produk terjual.")
+        edited_resep = st.data_editor(
+            st.session_state.resep,
+            num_rows="dynamic",
+            column_config={
+                "produk": st.column_config.SelectboxColumn("Produk", options=list(st.session_state.harga_jual.keys()), required=True),
+                "bahan": st.column_config.SelectboxColumn("Bahan Baku", options=st.session_state.inventaris['item'].tolist(), required=True),
+                "qty": st.column_config.NumberColumn("Qty per pcs", min_value=0.0, format="%.3f", required=True),
+            },
+            use_container_width=True,
+            key="editor_resep",
+        )
+        if st.button("Simpan Resep"):
+            berhasil, _ = simpan_bersama(bersama.ubah_resep, bersihkan_resep(edited_resep))
+            if berhasil:
+                st.success("Resep berhasil diupdate!")
     else:
         st.info("Anda harus masuk ke Mode Editor untuk mengubah harga jual.")
 
@@ -592,3 +858,16 @@ elif menu == "Kontak":
                 <p style="font-size:24px;">💼 LinkedIn Page</p>
             </a>
         """, unsafe_allow_html=True)
+
+# Selama ada laporan yang masih dihitung, fragmen kecil ini memeriksa setiap
+# setengah detik dan menjalankan ulang halaman begitu semuanya selesai
+if laporan_menunggu:
+    @st.fragment(run_every=0.5)
+    def tunggu_laporan():
+        if all(future.done() for future in laporan_menunggu):
+            st.rerun()
+
+    tunggu_laporan()
+
+profil.tandai(f"menu {menu}")
+profil.selesai_rerun(menu, ukuran_data)
@@ -0,0 +1,189 @@
+import argparse
+import json
+import sqlite3
+import sys
+import time
+from datetime import date
+
+import pandas as pd
+
+from akuntansi import AKUN_PENJUALAN, KOLOM_DAFTAR_PEMBELIAN
+from buku_pembantu import PIHAK_UMUM
+
+# --- KASIR TANPA UI (API & CLI) ---
+# Posting penjualan & pembelian dari program lain (pesanan marketplace/reseller)
+# tanpa Streamlit. Pesanan divalidasi terhadap snapshot katalog & inventaris,
+# lalu satu batch dikirim sekaligus ke penulis buku besar bersama
+# (BukuBersama.posting_pesanan): satu transaksi SQLite untuk ribuan keranjang,
+# dengan jurnal dan perubahan stok yang sama persis dengan tombol kasir di UI.
+#
+# Satu pesanan = satu objek JSON (satu baris JSON Lines):
+#   {"tanggal": "2025-06-01", "items": [{"item": "Jus Jambu", "qty": 2}, {"kode": "8991234567890", "qty": 1, "metode_bayar": "Kredit"}]}
+#   {"jenis": "Pembelian", "pihak": "Toko Sumber Rejeki", "items": [{"item": "Gula", "qty": 5, "harga": 14000, "metode_bayar": "Kredit"}]}
+# jenis default Penjualan, tanggal default hari ini, metode_bayar default Tunai
+# (boleh diisi per pesanan atau per item), pihak (pelanggan/pemasok untuk
+# piutang/utang bagian kredit) default Umum. Produk boleh ditulis dengan nama atau
+# kode/barcode; harga penjualan default dari katalog, yaitu harga yang berlaku
+# pada tanggal pesanan. Satuan pembelian default dari inventaris (wajib untuk
+# bahan baru).
+#
+#   python kasir.py < pesanan.jsonl > hasil.jsonl
+#
+# Setiap baris input menghasilkan satu baris output, berurutan:
+#   {"baris": 1, "jenis": "Penjualan", "transaksi_id": "...", "total": 30000}
+#   {"baris": 2, "error": "produk tidak ada di daftar harga jual: Es Jambu"}
+# Pesanan yang ditolak tidak menggagalkan pesanan lain (kode keluar 1 kalau ada
+# yang ditolak atau gagal disimpan). Boleh dijalankan selagi aplikasi Streamlit
+# memakai database yang sama: aplikasi memuat ulang datanya setelah kasir.py
+# menulis (lihat BukuBersama), dan sebaliknya.
+
+UKURAN_BATCH = 1000
+METODE_BAYAR = list(AKUN_PENJUALAN)
+
+
+def _angka(nilai, nama, boleh_nol=False):
+    try:
+        angka = float(nilai)
+    except (TypeError, ValueError):
+        raise ValueError(f"{nama} tidak valid: {nilai!r}") from None
+    if boleh_nol and not angka >= 0:
+        raise ValueError(f"{nama} tidak valid: {nilai!r}")
+    if not boleh_nol and not angka > 0:
+        raise ValueError(f"{nama} harus lebih dari 0")
+    # angka bulat tetap int seperti input number_input di UI
+    return int(angka) if angka.is_integer() else angka
+
+
+def _tanggal(nilai):
+    if nilai is None or nilai == '':
+        return date.today()
+    try:
+        return pd.Timestamp(nilai).date()
+    except (TypeError, ValueError):
+        raise ValueError(f"tanggal tidak valid: {nilai!r}") from None
+
+
+def _metode(nilai):
+    metode = str(nilai or 'Tunai').strip().capitalize()
+    if metode not in METODE_BAYAR:
+        raise ValueError(f"metode_bayar harus Tunai atau Kredit: {nilai!r}")
+    return metode
+
+
+def siapkan_pesanan(pesanan, katalog, satuan_bahan):
+    # Satu pesanan (dict JSON) -> (jenis, tanggal, isi, pihak, total) untuk posting_pesanan;
+    # ValueError berisi alasan kalau pesanan ditolak
+    if not isinstance(pesanan, dict):
+        raise ValueError("pesanan harus berupa objek JSON")
+    jenis = str(pesanan.get('jenis') or 'Penjualan').strip().capitalize()
+    if jenis not in ('Penjualan', 'Pembelian'):
+        raise ValueError("jenis harus Penjualan atau Pembelian")
+    tanggal = _tanggal(pesanan.get('tanggal'))
+    pihak = str(pesanan.get('pihak') or '').strip() or PIHAK_UMUM
+    items = pesanan.get('items')
+    if not isinstance(items, list) or not items or not all(isinstance(baris, dict) for baris in items):
+        raise ValueError("items harus berupa daftar item yang tidak kosong")
+
+    isi = []
+    for baris in items:
+        item = str(baris.get('item') or baris.get('kode') or '').strip()
+        metode = _metode(baris.get('metode_bayar') or pesanan.get('metode_bayar'))
+        qty = _angka(baris.get('qty'), 'qty')
+        if jenis == 'Penjualan':
+            produk = katalog.cari_produk(item)
+            if produk is None:
+                raise ValueError(f"produk tidak ada di daftar harga jual: {item}")
+            item = produk
+            harga = _angka(baris['harga'], 'harga', boleh_nol=True) if baris.get('harga') is not None else katalog.harga_pada(item, tanggal)
+            isi.append({'item': item, 'qty': qty, 'harga': harga, 'metode_bayar': metode})
+        else:
+            satuan = str(baris.get('satuan') or satuan_bahan.get(item) or '').strip()
+            if not item or not satuan:
+                raise ValueError(f"bahan tidak ada di inventaris (bahan baru wajib punya satuan): {item}")
+            harga = _angka(baris.get('harga'), 'harga', boleh_nol=True)
+            isi.append({'item': item, 'qty': qty, 'satuan': satuan, 'harga': harga, 'metode_bayar': metode})
+
+    total = sum(baris['qty'] * baris['harga'] for baris in isi)
+    if jenis == 'Pembelian':
+        isi = pd.DataFrame(isi, columns=KOLOM_DAFTAR_PEMBELIAN)
+    return jenis, tanggal, isi, pihak, total
+
+
+def posting(bersama, daftar_pesanan):
+    # Memvalidasi lalu memposting banyak pesanan dalam satu panggilan. Mengembalikan
+    # satu hasil per pesanan (urutan sama): {'jenis', 'transaksi_id', 'total'} atau
+    # {'error'}. Error database (sqlite3.Error) diteruskan ke pemanggil; tidak ada
+    # pesanan batch itu yang tersimpan.
+    snapshot = bersama.snapshot()
+    satuan_bahan = dict(zip(snapshot.inventaris['item'], snapshot.inventaris['satuan']))
+    hasil, siap, posisi = [], [], []
+    for pesanan in daftar_pesanan:
+        try:
+            jenis, tanggal, isi, pihak, total = siapkan_pesanan(pesanan, snapshot.katalog, satuan_bahan)
+        except ValueError as e:
+            hasil.append({'error': str(e)})
+            continue
+        hasil.append({'jenis': jenis, 'transaksi_id': None, 'total': total})
+        siap.append((jenis, tanggal, isi, pihak))
+        posisi.append(len(hasil) - 1)
+    if siap:
+        for i, transaksi_id in zip(posisi, bersama.posting_pesanan(siap)):
+            hasil[i]['transaksi_id'] = transaksi_id
+    return hasil
+
+
+def _baca_batch(baris_input, ukuran):
+    # Baris JSON Lines -> potongan [(nomor baris, pesanan atau error)], baris kosong dilewati
+    batch = []
+    for nomor, teks in enumerate(baris_input, start=1):
+        if not teks.strip():
+            continue
+        try:
+            batch.append((nomor, json.loads(teks)))
+        except json.JSONDecodeError as e:
+            batch.append((nomor, ValueError(f"JSON tidak valid: {e.msg}")))
+        if len(batch) >= ukuran:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def main(argv=None):
+    from buku_bersama import BukuBersama
+    from data_awal import isi_data_awal
+    from penyimpanan import DB_PATH, Penyimpanan
+
+    parser = argparse.ArgumentParser(description="Posting penjualan/pembelian dari JSON Lines (stdin) tanpa membuka aplikasi")
+    parser.add_argument('--db', default=DB_PATH, help=f"file database SQLite (default: {DB_PATH})")
+    parser.add_argument('--batch', type=int, default=UKURAN_BATCH, help="jumlah pesanan per transaksi database")
+    args = parser.parse_args(argv)
+
+    db = Penyimpanan(args.db)
+    isi_data_awal(db)
+    bersama = BukuBersama(db)
+
+    jumlah, jumlah_ok, gagal_db = 0, 0, False
+    mulai = time.perf_counter()
+    for batch in _baca_batch(sys.stdin, args.batch):
+        pesanan = [p for _, p in batch if not isinstance(p, ValueError)]
+        try:
+            hasil = iter(posting(bersama, pesanan))
+        except sqlite3.Error as e:
+            gagal_db = True
+            hasil = iter([{'error': f"data gagal disimpan: {e}"}] * len(pesanan))
+        for nomor, p in batch:
+            keluaran = {'error': str(p)} if isinstance(p, ValueError) else next(hasil)
+            jumlah_ok += 'error' not in keluaran
+            print(json.dumps({'baris': nomor, **keluaran}))
+        jumlah += len(batch)
+
+    detik = time.perf_counter() - mulai
+    print(f"{jumlah:,} pesanan, {jumlah_ok:,} tersimpan, {jumlah - jumlah_ok:,} ditolak "
+          f"({detik:.2f} detik, {jumlah_ok / detik if detik else 0:,.0f} pesanan/detik)", file=sys.stderr)
+    # Input kosong bukan kegagalan; kode keluar 1 kalau ada pesanan yang ditolak/gagal disimpan
+    return 1 if gagal_db or jumlah_ok < jumlah else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
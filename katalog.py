@@ -0,0 +1,246 @@
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from datetime import date, datetime
+from difflib import SequenceMatcher, get_close_matches
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+# --- KATALOG PRODUK & RIWAYAT HARGA ---
+# Produk jual (nama, kode/SKU, barcode, harga berlaku) beserta riwayat harga
+# bertanggal. Setiap kali katalog berubah disusun ulang menjadi list terurut,
+# jadi pencarian di kasir (nama atau awalan nama/kode/barcode) cukup bisect,
+# O(log n) berapa pun jumlah SKU-nya. Pencarian di tengah nama dan fuzzy (salah
+# ketik) hanya dijalankan kalau hasil awalan belum cukup. Keduanya memakai indeks
+# per kata (jumlah kata unik jauh lebih kecil dari jumlah SKU): di tengah nama
+# lewat bisect pada akhiran setiap kata, fuzzy lewat kemiripan kata lalu
+# kandidatnya diurutkan menurut kemiripan nama lengkap.
+#
+# Perubahan harga tidak menimpa riwayat: setiap harga baru dicatat di
+# riwayat_harga dengan tanggal mulai berlaku, sehingga harga pada tanggal
+# transaksi lama (impor, pesanan mundur tanggal, invoice) juga dicari lewat bisect.
+# Harga yang tersimpan di baris transaksi tetap yang dipakai untuk jurnal.
+
+KOLOM_KATALOG = ['item', 'kode', 'barcode', 'harga']
+KOLOM_RIWAYAT_HARGA = ['item', 'berlaku', 'harga']
+
+BATAS_CARI = 50
+
+
+def _kunci(teks):
+    return str(teks).strip().casefold()
+
+
+def _awalan(indeks, kunci):
+    # indeks: list (kunci, item) terurut; item yang kuncinya diawali `kunci`
+    i = bisect_left(indeks, (kunci,))
+    while i < len(indeks) and indeks[i][0].startswith(kunci):
+        yield indeks[i][1]
+        i += 1
+
+
+def katalog_kosong():
+    return pd.DataFrame(columns=KOLOM_KATALOG)
+
+
+class Katalog:
+    def __init__(self, produk=None, riwayat=None):
+        produk = produk if produk is not None else katalog_kosong()
+        riwayat = riwayat if riwayat is not None else pd.DataFrame(columns=KOLOM_RIWAYAT_HARGA)
+        self.produk = produk[KOLOM_KATALOG].reset_index(drop=True)
+        # harga berlaku per produk (urutan katalog), dipakai seperti dict harga_jual lama
+        self.harga_jual = dict(zip(self.produk['item'].tolist(), self.produk['harga'].tolist()))
+        self._nama = sorted((_kunci(item), item) for item in self.produk['item'])
+        self._kode = sorted(
+            (_kunci(kode), item)
+            for kolom in ('kode', 'barcode')
+            for kode, item in zip(self.produk[kolom], self.produk['item'])
+            if kode
+        )
+        # kata -> produk yang namanya memuat kata itu (untuk pencarian fuzzy)
+        self._kata = {}
+        for kunci, item in self._nama:
+            for kata in set(kunci.split()):
+                self._kata.setdefault(kata, []).append(item)
+        # item -> ([tanggal berlaku terurut], [harga])
+        riwayat = riwayat.assign(berlaku=pd.to_datetime(riwayat['berlaku']))
+        self.riwayat = riwayat.sort_values(['item', 'berlaku'], kind='stable').reset_index(drop=True)
+        self._riwayat = {}
+        for item, berlaku, harga in zip(self.riwayat['item'].tolist(), self.riwayat['berlaku'].dt.date.tolist(), self.riwayat['harga'].tolist()):
+            daftar = self._riwayat.setdefault(item, ([], []))
+            daftar[0].append(berlaku)
+            daftar[1].append(harga)
+
+    @classmethod
+    def dari_db(cls, db):
+        return cls(*db.muat_katalog())
+
+    def __len__(self):
+        return len(self.produk)
+
+    # --- CARI ---
+    def dengan_kode(self, kode):
+        # Produk dengan kode/SKU atau barcode persis `kode`, None kalau tidak ada
+        kunci = _kunci(kode)
+        i = bisect_left(self._kode, (kunci,))
+        if i < len(self._kode) and self._kode[i][0] == kunci:
+            return self._kode[i][1]
+        return None
+
+    def cari_produk(self, teks):
+        # Nama produk persis atau kode/barcode persis -> nama produk, None kalau tidak ada
+        if teks in self.harga_jual:
+            return teks
+        return self.dengan_kode(teks)
+
+    def cari(self, teks, batas=BATAS_CARI):
+        # Urutan hasil: kode/barcode persis, awalan nama, awalan kode/barcode,
+        # nama mengandung teks, lalu nama yang mirip (salah ketik). `batas` hanya
+        # membatasi hasil pencarian; tanpa teks semua produk dikembalikan (urutan katalog)
+        kunci = _kunci(teks or '')
+        if not kunci:
+            return self.produk['item'].tolist()
+        hasil = dict.fromkeys(item for item in [self.dengan_kode(kunci)] if item is not None)
+        for sumber in (_awalan(self._nama, kunci), _awalan(self._kode, kunci)):
+            for item in sumber:
+                if len(hasil) >= batas:
+                    return list(hasil)
+                hasil.setdefault(item)
+        if len(hasil) < batas:
+            for item in self._mengandung(kunci):
+                hasil.setdefault(item)
+                if len(hasil) >= batas:
+                    return list(hasil)
+        if len(hasil) < batas:
+            for item in self._mirip(kunci, batas - len(hasil)):
+                hasil.setdefault(item)
+        return list(hasil)
+
+    @cached_property
+    def _akhiran(self):
+        # (akhiran, kata) terurut untuk semua akhiran setiap kata unik: teks yang ada
+        # di tengah kata adalah awalan salah satu akhirannya. Disusun saat pertama kali
+        # dicari di tengah nama, bukan setiap kali katalog berubah.
+        return sorted((kata[i:], kata) for kata in self._kata for i in range(len(kata)))
+
+    def _mengandung(self, kunci):
+        # Produk yang namanya mengandung `kunci`. Kata pertama pencarian pasti ada di
+        # dalam salah satu kata nama produk, jadi kandidat diambil dari indeks akhiran
+        # (bisect) lalu dicocokkan dengan nama lengkapnya; nama lain tidak dibaca.
+        pertama = kunci.split()[0]
+        dilihat = set()
+        for kata in _awalan(self._akhiran, pertama):
+            if kata in dilihat:
+                continue
+            dilihat.add(kata)
+            for item in self._kata[kata]:
+                if kunci in _kunci(item):
+                    yield item
+
+    def _mirip(self, kunci, batas):
+        # Produk yang kata-katanya mirip kata pencarian. Kata yang jarang (mis. rasa
+        # tertentu) berbobot lebih besar dari kata umum (mis. "rasa"); hanya kandidat
+        # teratas yang dibandingkan dengan nama lengkapnya.
+        kandidat = Counter()
+        for kata in kunci.split():
+            for mirip in get_close_matches(kata, list(self._kata), n=5, cutoff=0.75):
+                bobot = 1 / len(self._kata[mirip])
+                for item in self._kata[mirip]:
+                    kandidat[item] += bobot
+        teratas = [item for item, _ in kandidat.most_common(4 * batas)]
+        skor = {item: (round(kandidat[item], 6), SequenceMatcher(None, kunci, _kunci(item)).ratio()) for item in teratas}
+        return sorted(teratas, key=skor.get, reverse=True)[:batas]
+
+    def saring(self, teks):
+        # Baris katalog yang cocok dengan pencarian (semua, tanpa batas); tanpa teks
+        # pencarian urutannya sama dengan urutan katalog
+        if not _kunci(teks or ''):
+            return self.produk
+        urutan = self.cari(teks, batas=len(self.produk))
+        return self.produk.set_index('item').loc[urutan].reset_index()[KOLOM_KATALOG]
+
+    # --- HARGA PER TANGGAL ---
+    def harga_pada(self, item, tanggal):
+        # Harga yang berlaku untuk `item` pada `tanggal`. Tanggal sebelum riwayat
+        # pertama memakai harga pertama yang tercatat.
+        riwayat = self._riwayat.get(item)
+        if riwayat is None:
+            return self.harga_jual.get(item)
+        berlaku, harga = riwayat
+        if isinstance(tanggal, datetime):
+            tanggal = tanggal.date()
+        elif not isinstance(tanggal, date):
+            tanggal = pd.Timestamp(tanggal).date()
+        i = bisect_right(berlaku, tanggal) - 1
+        return harga[max(i, 0)]
+
+    def harga_pada_kolom(self, item, tanggal):
+        # Versi vektor harga_pada untuk impor massal: Series sejajar `item`,
+        # NaN untuk produk yang tidak ada di katalog
+        kiri = pd.DataFrame({
+            'item': pd.Series(item, dtype=object).to_numpy(),
+            'tanggal': pd.to_datetime(pd.Series(tanggal)).to_numpy(dtype='datetime64[ns]'),
+            'posisi': np.arange(len(item)),
+        })
+        kanan = self.riwayat.assign(berlaku=self.riwayat['berlaku'].to_numpy(dtype='datetime64[ns]'))
+        kanan = kanan.sort_values('berlaku', kind='stable')[['item', 'berlaku', 'harga']]
+        ada = kiri['tanggal'].notna() & kiri['item'].isin(self._riwayat)
+        harga = pd.Series(pd.Series(item, dtype=object).map(self.harga_jual).to_numpy(dtype=float))
+        if ada.any():
+            cocok = pd.merge_asof(
+                kiri[ada].sort_values('tanggal', kind='stable'), kanan,
+                left_on='tanggal', right_on='berlaku', by='item', direction='backward',
+            )
+            pertama = {item: h[0] for item, (_, h) in self._riwayat.items()}
+            nilai = cocok['harga'].astype(float).fillna(cocok['item'].map(pertama))
+            harga.iloc[cocok['posisi'].to_numpy()] = nilai.to_numpy(dtype=float)
+        return harga
+
+    def riwayat_harga(self, item):
+        riwayat = self.riwayat[self.riwayat['item'] == item]
+        return riwayat.assign(berlaku=riwayat['berlaku'].dt.date)[['berlaku', 'harga']].iloc[::-1].reset_index(drop=True)
+
+    # --- EDIT ---
+    def perubahan(self, diedit, asli):
+        # diedit: DataFrame hasil data_editor satu halaman (RangeIndex; baris di
+        # luar len(asli) adalah produk baru), asli: nama produk halaman itu.
+        # Mengembalikan baris katalog yang baru/berubah; ValueError kalau tidak valid.
+        diedit = diedit.reindex(columns=KOLOM_KATALOG)
+        baris = []
+        for posisi, (item, kode, barcode, harga) in zip(diedit.index, diedit.itertuples(index=False, name=None)):
+            item = '' if pd.isna(item) else str(item).strip()
+            kode = '' if pd.isna(kode) else str(kode).strip()
+            barcode = '' if pd.isna(barcode) else str(barcode).strip()
+            lama = asli[posisi] if isinstance(posisi, (int, np.integer)) and 0 <= posisi < len(asli) else None
+            if lama is None and not item and not kode and not barcode and pd.isna(harga):
+                continue
+            if not item:
+                raise ValueError("Nama produk tidak boleh kosong")
+            if lama is not None and item != lama:
+                raise ValueError(f"Nama produk tidak bisa diubah: {lama}")
+            if lama is None and item in self.harga_jual:
+                raise ValueError(f"Produk sudah ada: {item}")
+            if pd.isna(harga) or float(harga) < 0:
+                raise ValueError(f"Harga {item} tidak valid")
+            baris.append({'item': item, 'kode': kode, 'barcode': barcode, 'harga': int(round(float(harga)))})
+        if not baris:
+            return katalog_kosong()
+        baru = pd.DataFrame(baris, columns=KOLOM_KATALOG)
+
+        # kode & barcode unik di seluruh katalog (setelah perubahan)
+        gabungan = pd.concat([self.produk[~self.produk['item'].isin(baru['item'])], baru], ignore_index=True)
+        semua_kode = pd.concat([gabungan['kode'], gabungan['barcode']]).astype(str).str.strip().str.casefold()
+        semua_kode = semua_kode[semua_kode != '']
+        ganda = semua_kode[semua_kode.duplicated()]
+        if len(ganda):
+            raise ValueError(f"Kode/barcode dipakai lebih dari satu kali: {ganda.iloc[0]}")
+        if baru['item'].duplicated().any():
+            raise ValueError(f"Produk ditulis dua kali: {baru['item'][baru['item'].duplicated()].iloc[0]}")
+
+        lama = self.produk.set_index('item')
+        berubah = [
+            item not in lama.index or (kode, barcode, harga) != (lama.at[item, 'kode'], lama.at[item, 'barcode'], lama.at[item, 'harga'])
+            for item, kode, barcode, harga in baru.itertuples(index=False, name=None)
+        ]
+        return baru[berubah].reset_index(drop=True)
@@ -0,0 +1,89 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+
+# --- LAPORAN DI LATAR BELAKANG ---
+# Laporan berat (grafik dashboard, laba-rugi & neraca per rentang tanggal, ekspor)
+# dihitung di pool thread, tidak di dalam rerun sesi. Hasil disimpan per laporan &
+# parameter bersama versi buku besar yang dipakai, untuk semua sesi. Selama hasil
+# versi terbaru belum selesai, hasil terakhir yang sudah jadi langsung dipakai, jadi
+# rerun (termasuk checkout di Catat Transaksi) tidak pernah menunggu laporan.
+#
+# Pool thread, bukan proses: laporan membaca snapshot buku besar di memori dan
+# koneksi SQLite bersama, dan sebagian besar waktunya dihabiskan di SQLite/numpy
+# yang melepas GIL.
+#
+# Laporan yang gagal juga disimpan per versi: tidak dihitung ulang sampai buku
+# besar berubah, dan setiap minta() untuk versi itu melempar LaporanGagal.
+
+JUMLAH_PEKERJA = 2
+
+# Laporan yang selesai dalam waktu ini langsung ditampilkan tanpa indikator "menunggu"
+TUNGGU_SINGKAT = 0.15
+
+BATAS_HASIL = 256
+
+
+class LaporanGagal(Exception):
+    # Fungsi laporan melempar error; error aslinya ada di __cause__
+    pass
+
+
+class PoolLaporan:
+    def __init__(self, jumlah_pekerja=JUMLAH_PEKERJA):
+        self._pool = ThreadPoolExecutor(max_workers=jumlah_pekerja, thread_name_prefix='laporan')
+        # RLock: add_done_callback langsung memanggil _selesai kalau future sudah selesai
+        self._lock = threading.RLock()
+        # (nama, parameter, versi) -> Future yang masih berjalan
+        self._berjalan = {}
+        # (nama, parameter) -> (versi, hasil) terakhir yang selesai
+        self._hasil = OrderedDict()
+        # (nama, parameter) -> (versi, exception) terakhir yang gagal
+        self._gagal = OrderedDict()
+
+    def minta(self, nama, parameter, versi, fungsi, *args, tunggu=TUNGGU_SINGKAT):
+        # versi: (id buku besar, versi). Mengembalikan (hasil, future):
+        # - hasil versi ini sudah ada / selesai dalam `tunggu` detik: (hasil, None)
+        # - belum: (hasil terakhir yang sudah jadi atau None, future yang sedang berjalan)
+        # - fungsi gagal untuk versi ini: LaporanGagal (tanpa menghitung ulang)
+        kunci = (nama, parameter)
+        with self._lock:
+            tersimpan = self._hasil.get(kunci)
+            if tersimpan is not None and tersimpan[0] == versi:
+                self._hasil.move_to_end(kunci)
+                return tersimpan[1], None
+            gagal = self._gagal.get(kunci)
+            if gagal is not None and gagal[0] == versi:
+                raise LaporanGagal(f"{nama}: {gagal[1]}") from gagal[1]
+            future = self._berjalan.get((nama, parameter, versi))
+            if future is None:
+                future = self._pool.submit(fungsi, *args)
+                self._berjalan[(nama, parameter, versi)] = future
+                future.add_done_callback(lambda f: self._selesai(kunci, versi, f))
+        wait([future], timeout=tunggu)
+        if not future.done():
+            return (tersimpan[1] if tersimpan is not None else None), future
+        if future.exception() is not None:
+            raise LaporanGagal(f"{nama}: {future.exception()}") from future.exception()
+        return future.result(), None
+
+    def _selesai(self, kunci, versi, future):
+        with self._lock:
+            self._berjalan.pop((*kunci, versi), None)
+            if future.cancelled():
+                return
+            if future.exception() is not None:
+                self._gagal[kunci] = (versi, future.exception())
+                self._gagal.move_to_end(kunci)
+                while len(self._gagal) > BATAS_HASIL:
+                    self._gagal.popitem(last=False)
+                return
+            self._gagal.pop(kunci, None)
+            tersimpan = self._hasil.get(kunci)
+            # hasil versi lama yang selesai belakangan tidak menimpa versi yang lebih baru
+            if tersimpan is not None and tersimpan[0][0] == versi[0] and tersimpan[0][1] > versi[1]:
+                return
+            self._hasil[kunci] = (versi, future.result())
+            self._hasil.move_to_end(kunci)
+            while len(self._hasil) > BATAS_HASIL:
+                self._hasil.popitem(last=False)
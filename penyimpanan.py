@@ -0,0 +1,643 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+# --- PENYIMPANAN SQLITE ---
+# Satu koneksi dipakai bersama oleh semua sesi Streamlit (lihat get_penyimpanan()
+# di jamfix.py), jadi setiap akses ke koneksi dijaga oleh satu lock.
+
+DB_PATH = "kebun_jambu.db"
+
+# Versi skema disimpan di PRAGMA user_version. 0 berarti database baru atau
+# database lama (tabel transaksi/jurnal versi awal) yang belum dimigrasi.
+# Versi 2: tabel resep.
+# Versi 3: indeks untuk filter halaman jurnal & riwayat transaksi.
+# Versi 4: tabel tutup buku bulanan (periode, periode_saldo, periode_total).
+# Versi 5: kode & barcode produk di harga_jual, tabel riwayat_harga.
+# Versi 6: tabel lot_bahan (HPP FIFO) dan pengaturan.
+# Versi 7: buku pembantu piutang & utang (tagihan, pelunasan).
+VERSI_SKEMA = 7
+
+KOLOM_TRANSAKSI = ['transaksi_id', 'tanggal', 'jenis', 'metode_bayar', 'item', 'qty', 'harga', 'total', 'catatan']
+KOLOM_JURNAL = ['tanggal', 'keterangan', 'debit', 'kredit', 'akun', 'kredit_akun']
+KOLOM_INVENTARIS = ['item', 'qty', 'satuan', 'min_stok', 'status']
+KOLOM_RESEP = ['produk', 'bahan', 'qty']
+KOLOM_KATALOG = ['item', 'kode', 'barcode', 'harga']
+KOLOM_TAGIHAN = ['id', 'jenis', 'pihak', 'referensi', 'tanggal', 'jatuh_tempo', 'jumlah', 'dibayar']
+# id lot & tagihan diberikan SQLite saat baris ditulis (bisa ada beberapa proses penulis)
+KOLOM_LOT_BARU = ['bahan', 'tanggal', 'qty', 'sisa', 'harga']
+KOLOM_TAGIHAN_BARU = KOLOM_TAGIHAN[1:]
+
+SKEMA = """
+CREATE TABLE IF NOT EXISTS transaksi (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    transaksi_id TEXT NOT NULL DEFAULT '',
+    tanggal DATE,
+    jenis TEXT,
+    metode_bayar TEXT NOT NULL DEFAULT 'Tunai',
+    item TEXT,
+    qty REAL,
+    harga INTEGER,
+    total INTEGER,
+    catatan TEXT DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS jurnal (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    tanggal DATE,
+    keterangan TEXT,
+    debit INTEGER NOT NULL DEFAULT 0,
+    kredit INTEGER NOT NULL DEFAULT 0,
+    akun TEXT NOT NULL DEFAULT '',
+    kredit_akun TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS inventaris (
+    item TEXT PRIMARY KEY,
+    qty REAL NOT NULL DEFAULT 0,
+    satuan TEXT,
+    min_stok INTEGER NOT NULL DEFAULT 0,
+    status TEXT
+);
+CREATE TABLE IF NOT EXISTS harga_jual (
+    item TEXT PRIMARY KEY,
+    harga INTEGER NOT NULL DEFAULT 0,
+    kode TEXT NOT NULL DEFAULT '',
+    barcode TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS riwayat_harga (
+    item TEXT NOT NULL,
+    berlaku DATE NOT NULL,
+    harga INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (item, berlaku)
+);
+CREATE TABLE IF NOT EXISTS resep (
+    produk TEXT NOT NULL,
+    bahan TEXT NOT NULL,
+    qty REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (produk, bahan)
+);
+CREATE TABLE IF NOT EXISTS periode (
+    periode TEXT PRIMARY KEY,
+    ditutup TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS periode_saldo (
+    periode TEXT NOT NULL,
+    akun TEXT NOT NULL,
+    debit INTEGER NOT NULL DEFAULT 0,
+    kredit INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (periode, akun)
+);
+CREATE TABLE IF NOT EXISTS periode_total (
+    periode TEXT NOT NULL,
+    jenis TEXT NOT NULL,
+    total INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (periode, jenis)
+);
+CREATE TABLE IF NOT EXISTS lot_bahan (
+    id INTEGER PRIMARY KEY,
+    bahan TEXT NOT NULL,
+    tanggal DATE,
+    qty REAL NOT NULL DEFAULT 0,
+    sisa REAL NOT NULL DEFAULT 0,
+    harga REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS pengaturan (
+    kunci TEXT PRIMARY KEY,
+    nilai TEXT
+);
+CREATE TABLE IF NOT EXISTS tagihan (
+    id INTEGER PRIMARY KEY,
+    jenis TEXT NOT NULL,
+    pihak TEXT NOT NULL DEFAULT '',
+    referensi TEXT NOT NULL DEFAULT '',
+    tanggal DATE,
+    jatuh_tempo DATE,
+    jumlah INTEGER NOT NULL DEFAULT 0,
+    dibayar INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS pelunasan (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    tagihan_id INTEGER NOT NULL,
+    tanggal DATE,
+    jumlah INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_tagihan_terbuka ON tagihan(jatuh_tempo) WHERE dibayar < jumlah;
+CREATE INDEX IF NOT EXISTS idx_pelunasan_tagihan ON pelunasan(tagihan_id);
+CREATE INDEX IF NOT EXISTS idx_lot_bahan_bersisa ON lot_bahan(id) WHERE sisa > 0;
+CREATE INDEX IF NOT EXISTS idx_transaksi_transaksi_id ON transaksi(transaksi_id);
+CREATE INDEX IF NOT EXISTS idx_jurnal_tanggal ON jurnal(tanggal);
+CREATE INDEX IF NOT EXISTS idx_jurnal_akun ON jurnal(akun);
+CREATE INDEX IF NOT EXISTS idx_jurnal_kredit_akun ON jurnal(kredit_akun);
+CREATE INDEX IF NOT EXISTS idx_transaksi_tanggal ON transaksi(tanggal);
+"""
+
+
+def _buat_skema(conn):
+    # executescript() melakukan COMMIT otomatis, jadi perintah dijalankan satu per satu
+    for perintah in SKEMA.split(';'):
+        if perintah.strip():
+            conn.execute(perintah)
+
+
+def _kolom_tabel(conn, tabel):
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({tabel})")]
+
+
+def _migrasi_tabel_lama(conn):
+    # Tabel transaksi versi awal belum punya transaksi_id dan metode_bayar.
+    kolom_transaksi = _kolom_tabel(conn, 'transaksi')
+    if kolom_transaksi:
+        if 'transaksi_id' not in kolom_transaksi:
+            conn.execute("ALTER TABLE transaksi ADD COLUMN transaksi_id TEXT NOT NULL DEFAULT ''")
+        if 'metode_bayar' not in kolom_transaksi:
+            conn.execute("ALTER TABLE transaksi ADD COLUMN metode_bayar TEXT NOT NULL DEFAULT 'Tunai'")
+
+    # Jurnal versi awal menyimpan satu baris per pasangan (debit=nama akun,
+    # kredit=nama akun, jumlah). Di aplikasi satu pasangan menjadi dua baris.
+    kolom_jurnal = _kolom_tabel(conn, 'jurnal')
+    if kolom_jurnal and 'akun' not in kolom_jurnal:
+        conn.execute("ALTER TABLE jurnal RENAME TO jurnal_lama")
+        _buat_skema(conn)
+        conn.execute("""
+            INSERT INTO jurnal (tanggal, keterangan, debit, kredit, akun, kredit_akun)
+            SELECT tanggal, keterangan, jumlah, 0, debit, '' FROM jurnal_lama
+            UNION ALL
+            SELECT tanggal, keterangan, 0, jumlah, '', kredit FROM jurnal_lama
+        """)
+        conn.execute("DROP TABLE jurnal_lama")
+
+
+def _migrasi_katalog(conn):
+    # Versi 5: harga_jual lama belum punya kode & barcode; harga yang sudah ada
+    # menjadi baris pertama riwayat harga, berlaku sejak transaksi pertama
+    kolom_harga = _kolom_tabel(conn, 'harga_jual')
+    for kolom in ('kode', 'barcode'):
+        if kolom_harga and kolom not in kolom_harga:
+            conn.execute(f"ALTER TABLE harga_jual ADD COLUMN {kolom} TEXT NOT NULL DEFAULT ''")
+    _buat_skema(conn)
+    _catat_riwayat_harga(conn, conn.execute("SELECT item, harga FROM harga_jual").fetchall(), date.today(), baru=True)
+
+
+def _migrasi_tagihan(conn):
+    # Versi 7: penjualan & pembelian kredit yang sudah ada menjadi tagihan belum
+    # lunas atas nama pihak umum, satu per transaksi_id (pembelian: per baris),
+    # jatuh tempo 30 hari setelah transaksi
+    _buat_skema(conn)
+    conn.execute("""
+        INSERT INTO tagihan (jenis, pihak, referensi, tanggal, jatuh_tempo, jumlah, dibayar)
+        SELECT CASE WHEN jenis = 'Penjualan' THEN 'Piutang' ELSE 'Utang' END, 'Umum',
+               CASE WHEN transaksi_id = '' THEN 'Pembelian ' || item ELSE transaksi_id END,
+               MIN(tanggal), date(MIN(tanggal), '+30 days'), SUM(total), 0
+        FROM transaksi
+        WHERE metode_bayar = 'Kredit' AND jenis IN ('Penjualan', 'Pembelian')
+        GROUP BY jenis, CASE WHEN transaksi_id = '' THEN 'baris ' || id ELSE transaksi_id END
+        ORDER BY MIN(id)
+    """)
+
+
+def _catat_riwayat_harga(conn, harga, berlaku, baru=False):
+    # Harga yang berbeda dari harga_jual saat ini (atau produk baru) dicatat di
+    # riwayat_harga; perubahan kedua di hari yang sama menimpa yang pertama.
+    # Harga pertama suatu produk berlaku sejak transaksi pertama, supaya tetap
+    # terpisah dari perubahan harga di hari yang sama. Harus dijalankan sebelum
+    # harga_jual diperbarui (baru=True: semua dianggap harga pertama).
+    awal = conn.execute("SELECT MIN(tanggal) FROM transaksi").fetchone()[0]
+    berlaku = _ke_sql(berlaku)
+    pertama = min(awal, berlaku) if awal else berlaku
+    if baru:
+        conn.executemany(
+            "INSERT OR IGNORE INTO riwayat_harga (item, berlaku, harga) VALUES (?, ?, ?)",
+            [(item, pertama, _ke_sql(h)) for item, h in harga],
+        )
+        return
+    conn.executemany(
+        "INSERT INTO riwayat_harga (item, berlaku, harga) "
+        "SELECT ?, CASE WHEN EXISTS (SELECT 1 FROM harga_jual WHERE item = ?) THEN ? ELSE ? END, ? "
+        "WHERE NOT EXISTS (SELECT 1 FROM harga_jual WHERE item = ? AND harga = ?) "
+        "ON CONFLICT (item, berlaku) DO UPDATE SET harga = excluded.harga",
+        [(item, item, berlaku, pertama, _ke_sql(h), item, _ke_sql(h)) for item, h in harga],
+    )
+
+
+def _ke_date(df):
+    if not df.empty:
+        df['tanggal'] = pd.to_datetime(df['tanggal']).dt.date
+    return df
+
+
+def _ke_sql(nilai):
+    # sqlite3 tidak bisa mengikat tipe numpy maupun date secara langsung.
+    # Tanggal disimpan tanpa jam (YYYY-MM-DD).
+    if isinstance(nilai, np.datetime64):
+        nilai = pd.Timestamp(nilai)
+    if isinstance(nilai, datetime):
+        nilai = nilai.date()
+    if hasattr(nilai, 'isoformat'):
+        return nilai.isoformat()
+    if hasattr(nilai, 'item'):
+        return nilai.item()
+    return nilai
+
+
+def _kolom_sql(nilai):
+    # Versi per kolom dari _ke_sql untuk array numpy (dipakai impor massal)
+    arr = np.asarray(nilai)
+    if arr.dtype.kind == 'M':
+        return np.datetime_as_string(arr, unit='D').tolist()
+    if arr.dtype == object:
+        # kolom teks hasil impor biasanya str semua, jadi tidak perlu dicek per nilai
+        if pd.api.types.infer_dtype(arr, skipna=False) == 'string':
+            return arr.tolist()
+        return [_ke_sql(v) for v in arr]
+    return arr.tolist()
+
+
+def _baris_sql(kolom, data):
+    # data: list of dict (satu per baris) atau dict kolom -> array
+    if isinstance(data, dict):
+        return list(zip(*(_kolom_sql(data[k]) for k in kolom)))
+    return [tuple(_ke_sql(row[k]) for k in kolom) for row in data]
+
+
+def _kondisi(dari=None, sampai=None, sama=None, cari=None):
+    # Menyusun klausa WHERE + parameter untuk halaman jurnal/transaksi.
+    # sama: {kolom: nilai} (nilai None/'' diabaikan), cari: (teks, [kolom, ...])
+    kondisi, parameter = [], []
+    if dari is not None:
+        kondisi.append("tanggal >= ?")
+        parameter.append(_ke_sql(dari))
+    if sampai is not None:
+        kondisi.append("tanggal <= ?")
+        parameter.append(_ke_sql(sampai))
+    for kolom, nilai in (sama or {}).items():
+        if nilai:
+            kondisi.append(f"{kolom} = ?")
+            parameter.append(nilai)
+    if cari and cari[0]:
+        pola = '%' + cari[0].replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        kondisi.append('(' + ' OR '.join(f"{kolom} LIKE ? ESCAPE '\\'" for kolom in cari[1]) + ')')
+        parameter.extend([pola] * len(cari[1]))
+    where = f"WHERE {' AND '.join(kondisi)}" if kondisi else ''
+    return where, parameter
+
+
+class DataBerubah(sqlite3.OperationalError):
+    # Proses lain sudah menulis ke database setelah data di memori dimuat (lihat
+    # Penyimpanan.simpan(versi=...)); penulisan dibatalkan supaya bisa diulang.
+    # Turunan sqlite3.Error, jadi kalau tetap gagal setelah diulang, pemanggil
+    # (jamfix.simpan_bersama, kasir.py) menampilkannya seperti error database lain
+    pass
+
+
+def _periksa_versi(conn, versi):
+    # Dipanggil di dalam transaksi BEGIN IMMEDIATE: proses lain tidak bisa menulis
+    # lagi sampai COMMIT, jadi data yang dibaca pemanggil pasti masih terbaru
+    if versi is not None and conn.execute("PRAGMA data_version").fetchone()[0] != versi:
+        raise DataBerubah("database sudah diubah proses lain")
+
+
+class Penyimpanan:
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        self.lock = threading.RLock()
+        # isolation_level=None: transaksi diatur sendiri lewat BEGIN/COMMIT
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        # cache 64 MB: indeks transaksi_id (uuid acak) jauh lebih cepat diisi saat impor massal
+        self.conn.execute("PRAGMA cache_size=-65536")
+        # versi_awal: versi skema sebelum dibuka, dipakai untuk mengisi data awal
+        self.versi_awal = VERSI_SKEMA
+        self._siapkan_skema()
+
+    def _siapkan_skema(self):
+        with self.transaksi_db() as conn:
+            versi = conn.execute("PRAGMA user_version").fetchone()[0]
+            self.versi_awal = versi
+            if versi >= VERSI_SKEMA:
+                return
+            if versi == 0:
+                _migrasi_tabel_lama(conn)
+            if versi < 5:
+                _migrasi_katalog(conn)
+            if versi < 7:
+                _migrasi_tagihan(conn)
+            _buat_skema(conn)
+            conn.execute(f"PRAGMA user_version = {VERSI_SKEMA}")
+
+    @contextmanager
+    def transaksi_db(self):
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.conn
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            else:
+                self.conn.execute("COMMIT")
+
+    def versi_data(self):
+        # Berubah setiap kali koneksi lain (mis. kasir.py/impor.py di proses lain)
+        # menulis ke database; tulisan lewat koneksi ini sendiri tidak mengubahnya
+        with self.lock:
+            return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    # --- BACA DATA ---
+    def _baca(self, query):
+        with self.lock:
+            return pd.read_sql_query(query, self.conn)
+
+    def _baca_rentang(self, tabel, kolom, dari=None, sampai=None):
+        where, parameter = _kondisi(dari, sampai)
+        query = f"SELECT {', '.join(kolom)} FROM {tabel} {where} ORDER BY id"
+        with self.lock:
+            return _ke_date(pd.read_sql_query(query, self.conn, params=parameter))
+
+    # sejak: hanya baris mulai tanggal itu (bulan sebelumnya sudah diarsipkan, lihat arsip.py)
+    def muat_transaksi(self, sejak=None, sampai=None):
+        return self._baca_rentang('transaksi', KOLOM_TRANSAKSI, sejak, sampai)
+
+    def muat_jurnal(self, sejak=None, sampai=None):
+        return self._baca_rentang('jurnal', KOLOM_JURNAL, sejak, sampai)
+
+    def transaksi_dengan_id(self, transaksi_id):
+        kolom = ', '.join(KOLOM_TRANSAKSI)
+        with self.lock:
+            df = pd.read_sql_query(f"SELECT {kolom} FROM transaksi WHERE transaksi_id = ? ORDER BY id", self.conn, params=[transaksi_id])
+        return _ke_date(df)
+
+    def muat_inventaris(self):
+        kolom = ', '.join(KOLOM_INVENTARIS)
+        return self._baca(f"SELECT {kolom} FROM inventaris ORDER BY rowid")
+
+    def muat_resep(self):
+        kolom = ', '.join(KOLOM_RESEP)
+        return self._baca(f"SELECT {kolom} FROM resep ORDER BY rowid")
+
+    def muat_harga_jual(self):
+        with self.lock:
+            return dict(self.conn.execute("SELECT item, harga FROM harga_jual ORDER BY rowid").fetchall())
+
+    def muat_lot(self):
+        # (lot bersisa [(id, bahan, sisa, harga)] urut id, harga lot terakhir per bahan)
+        with self.lock:
+            lot = self.conn.execute("SELECT id, bahan, sisa, harga FROM lot_bahan WHERE sisa > 0 ORDER BY id").fetchall()
+            harga_terakhir = dict(self.conn.execute(
+                "SELECT bahan, harga FROM lot_bahan WHERE id IN (SELECT MAX(id) FROM lot_bahan GROUP BY bahan)"
+            ).fetchall())
+        return lot, harga_terakhir
+
+    def baca_pengaturan(self, kunci, default=None):
+        with self.lock:
+            baris = self.conn.execute("SELECT nilai FROM pengaturan WHERE kunci = ?", [kunci]).fetchone()
+        return baris[0] if baris else default
+
+    def penjualan_harian(self, dari, sampai):
+        # Qty penjualan per tanggal & produk dalam rentang (untuk prakiraan restock)
+        with self.lock:
+            return pd.read_sql_query(
+                "SELECT tanggal, item, SUM(qty) AS qty FROM transaksi "
+                "WHERE jenis = 'Penjualan' AND tanggal >= ? AND tanggal <= ? GROUP BY tanggal, item",
+                self.conn, params=[_ke_sql(dari), _ke_sql(sampai)],
+            )
+
+    def muat_tagihan(self):
+        # Tagihan belum lunas urut jatuh tempo
+        with self.lock:
+            return pd.read_sql_query(
+                f"SELECT {', '.join(KOLOM_TAGIHAN)} FROM tagihan WHERE dibayar < jumlah ORDER BY jatuh_tempo, id", self.conn)
+
+    def muat_katalog(self):
+        # (produk: item, kode, barcode, harga; riwayat harga: item, berlaku, harga)
+        with self.lock:
+            produk = pd.read_sql_query(f"SELECT {', '.join(KOLOM_KATALOG)} FROM harga_jual ORDER BY rowid", self.conn)
+            riwayat = pd.read_sql_query("SELECT item, berlaku, harga FROM riwayat_harga ORDER BY item, berlaku", self.conn)
+        return produk, riwayat
+
+    # --- HALAMAN DATA ---
+    # Hanya baris yang tampil di layar yang dibaca (LIMIT/OFFSET lewat indeks),
+    # ditambah satu query agregat untuk jumlah baris & total sesuai filter.
+    def _halaman(self, tabel, kolom, where, parameter, batas, offset):
+        query = f"SELECT {', '.join(kolom)} FROM {tabel} {where} ORDER BY id LIMIT ? OFFSET ?"
+        with self.lock:
+            df = pd.read_sql_query(query, self.conn, params=[*parameter, int(batas), int(offset)])
+        return _ke_date(df)
+
+    def _potongan(self, tabel, kolom, where, parameter, ukuran):
+        # Semua baris sesuai filter per potongan `ukuran` baris (urut id, lanjut dari id
+        # terakhir, bukan OFFSET). Lock hanya dipegang selama satu potongan dibaca, jadi
+        # ekspor besar tidak menahan penulis; baris yang diposting setelah ekspor
+        # dimulai tidak ikut.
+        with self.lock:
+            id_akhir = self.conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {tabel}").fetchone()[0]
+        where = f"{where} AND id > ? AND id <= ?" if where else "WHERE id > ? AND id <= ?"
+        query = f"SELECT id, {', '.join(kolom)} FROM {tabel} {where} ORDER BY id LIMIT ?"
+        id_terakhir = 0
+        while True:
+            with self.lock:
+                df = pd.read_sql_query(query, self.conn, params=[*parameter, id_terakhir, id_akhir, int(ukuran)])
+            if df.empty:
+                return
+            id_terakhir = int(df['id'].iloc[-1])
+            yield _ke_date(df.drop(columns='id'))
+            if len(df) < ukuran:
+                return
+
+    def _filter_jurnal(self, dari, sampai, akun, kata):
+        where, parameter = _kondisi(dari, sampai, cari=(kata, ['keterangan']))
+        if akun:
+            where = f"{where} AND" if where else "WHERE"
+            where += " (akun = ? OR kredit_akun = ?)"
+            parameter += [akun, akun]
+        return where, parameter
+
+    def hitung_jurnal(self, dari=None, sampai=None, akun=None, kata=None):
+        where, parameter = self._filter_jurnal(dari, sampai, akun, kata)
+        with self.lock:
+            jumlah, debit, kredit = self.conn.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(debit), 0), COALESCE(SUM(kredit), 0) FROM jurnal {where}", parameter
+            ).fetchone()
+        return {'jumlah_baris': jumlah, 'total_debit': debit, 'total_kredit': kredit}
+
+    def halaman_jurnal(self, batas, offset=0, dari=None, sampai=None, akun=None, kata=None):
+        where, parameter = self._filter_jurnal(dari, sampai, akun, kata)
+        return self._halaman('jurnal', KOLOM_JURNAL, where, parameter, batas, offset)
+
+    def potongan_jurnal(self, ukuran, dari=None, sampai=None, akun=None, kata=None):
+        where, parameter = self._filter_jurnal(dari, sampai, akun, kata)
+        return self._potongan('jurnal', KOLOM_JURNAL, where, parameter, ukuran)
+
+    def _filter_transaksi(self, dari, sampai, jenis, item, kata):
+        return _kondisi(dari, sampai, {'jenis': jenis, 'item': item}, (kata, ['transaksi_id', 'catatan']))
+
+    def hitung_transaksi(self, dari=None, sampai=None, jenis=None, item=None, kata=None):
+        where, parameter = self._filter_transaksi(dari, sampai, jenis, item, kata)
+        with self.lock:
+            jumlah, qty, total = self.conn.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(qty), 0), COALESCE(SUM(total), 0) FROM transaksi {where}", parameter
+            ).fetchone()
+        return {'jumlah_baris': jumlah, 'total_qty': qty, 'total': total}
+
+    def halaman_transaksi(self, batas, offset=0, dari=None, sampai=None, jenis=None, item=None, kata=None):
+        where, parameter = self._filter_transaksi(dari, sampai, jenis, item, kata)
+        return self._halaman('transaksi', KOLOM_TRANSAKSI, where, parameter, batas, offset)
+
+    def potongan_transaksi(self, ukuran, dari=None, sampai=None, jenis=None, item=None, kata=None):
+        where, parameter = self._filter_transaksi(dari, sampai, jenis, item, kata)
+        return self._potongan('transaksi', KOLOM_TRANSAKSI, where, parameter, ukuran)
+
+    # --- TUTUP BUKU ---
+    # Periode berupa teks 'YYYY-MM'. Mutasi satu bulan dihitung langsung di SQLite
+    # lewat indeks tanggal, jadi hanya baris bulan itu yang dibaca.
+    def mutasi(self, dari=None, sampai=None):
+        # Total debit & kredit per akun dan total per jenis transaksi dalam rentang tanggal
+        where, parameter = _kondisi(dari, sampai)
+        # Tanpa INDEXED BY, rentang satu sisi (mis. tanggal <= ?) membuat SQLite memilih
+        # indeks akun demi GROUP BY lalu memindai seluruh jurnal
+        jurnal = "jurnal INDEXED BY idx_jurnal_tanggal" if where else "jurnal"
+        transaksi = "transaksi INDEXED BY idx_transaksi_tanggal" if where else "transaksi"
+        with self.lock:
+            debit = dict(self.conn.execute(f"SELECT akun, SUM(debit) FROM {jurnal} {where} GROUP BY akun", parameter).fetchall())
+            kredit = dict(self.conn.execute(f"SELECT kredit_akun, SUM(kredit) FROM {jurnal} {where} GROUP BY kredit_akun", parameter).fetchall())
+            total = dict(self.conn.execute(f"SELECT jenis, SUM(total) FROM {transaksi} {where} GROUP BY jenis", parameter).fetchall())
+        return debit, kredit, total
+
+    def periode_pertama(self):
+        # Bulan transaksi/jurnal paling awal, None kalau belum ada data
+        with self.lock:
+            tanggal = self.conn.execute(
+                "SELECT MIN(t) FROM (SELECT MIN(tanggal) AS t FROM transaksi UNION ALL SELECT MIN(tanggal) FROM jurnal)"
+            ).fetchone()[0]
+        return tanggal[:7] if tanggal else None
+
+    def muat_periode(self):
+        with self.lock:
+            periode = [p for (p,) in self.conn.execute("SELECT periode FROM periode ORDER BY periode")]
+            saldo = pd.read_sql_query("SELECT periode, akun, debit, kredit FROM periode_saldo", self.conn)
+            total = pd.read_sql_query("SELECT periode, jenis, total FROM periode_total", self.conn)
+        return periode, saldo, total
+
+    def tutup_periode(self, daftar_periode):
+        # daftar_periode: list of (periode, tanggal awal, tanggal akhir); semua ditutup dalam satu transaksi
+        with self.transaksi_db() as conn:
+            for periode, dari, sampai in daftar_periode:
+                rentang = [_ke_sql(dari), _ke_sql(sampai)]
+                conn.execute("INSERT INTO periode (periode) VALUES (?)", [periode])
+                conn.execute(
+                    """
+                    INSERT INTO periode_saldo (periode, akun, debit, kredit)
+                    SELECT ?, akun, SUM(debit), SUM(kredit) FROM (
+                        SELECT akun, debit, 0 AS kredit FROM jurnal WHERE tanggal BETWEEN ? AND ?
+                        UNION ALL
+                        SELECT kredit_akun, 0, kredit FROM jurnal WHERE tanggal BETWEEN ? AND ?
+                    ) GROUP BY akun
+                    """,
+                    [periode, *rentang, *rentang],
+                )
+                conn.execute(
+                    "INSERT INTO periode_total (periode, jenis, total) "
+                    "SELECT ?, jenis, SUM(total) FROM transaksi WHERE tanggal BETWEEN ? AND ? GROUP BY jenis",
+                    [periode, *rentang],
+                )
+
+    def buka_periode(self, sejak):
+        # Membuka kembali periode `sejak` dan semua periode sesudahnya
+        with self.transaksi_db() as conn:
+            for tabel in ('periode', 'periode_saldo', 'periode_total'):
+                conn.execute(f"DELETE FROM {tabel} WHERE periode >= ?", [sejak])
+
+    # --- TULIS DATA ---
+    def simpan(self, transaksi=(), jurnal=(), inventaris=None, harga_jual=None, resep=None, lot=None, pengaturan=None,
+               tagihan=(), pelunasan=(), stok=None, versi=None):
+        # Semua baris satu checkout/pembelian ditulis dalam satu transaksi SQLite,
+        # termasuk perubahan stok & lot HPP, jadi tidak ada posting setengah jadi.
+        # transaksi/jurnal boleh berupa list of dict atau dict kolom -> array.
+        # inventaris: seluruh isi inventaris (mengganti yang lama, untuk data awal);
+        # stok: baris inventaris yang berubah dengan qty berisi selisihnya, ditambahkan
+        # ke qty di database sehingga perubahan stok dari proses lain tidak tertimpa.
+        # lot: (lot baru [(bahan, tanggal, qty, sisa, harga)], sisa baru [(sisa, id)])
+        # tagihan: tagihan baru (list of dict / DataFrame KOLOM_TAGIHAN_BARU), pelunasan: [(tagihan_id, tanggal, jumlah)]
+        # versi: versi_data() saat data pemanggil dimuat; DataBerubah kalau proses lain
+        # sudah menulis sejak itu (tidak ada yang tersimpan).
+        # Mengembalikan id dari SQLite untuk lot & tagihan baru (urutan sama): {'lot': [...], 'tagihan': [...]}
+        id_baru = {'lot': [], 'tagihan': []}
+        with self.transaksi_db() as conn:
+            _periksa_versi(conn, versi)
+            if len(transaksi):
+                conn.executemany(
+                    f"INSERT INTO transaksi ({', '.join(KOLOM_TRANSAKSI)}) VALUES ({', '.join('?' * len(KOLOM_TRANSAKSI))})",
+                    _baris_sql(KOLOM_TRANSAKSI, transaksi),
+                )
+            if len(jurnal):
+                conn.executemany(
+                    f"INSERT INTO jurnal ({', '.join(KOLOM_JURNAL)}) VALUES ({', '.join('?' * len(KOLOM_JURNAL))})",
+                    _baris_sql(KOLOM_JURNAL, jurnal),
+                )
+            if inventaris is not None:
+                conn.execute("DELETE FROM inventaris")
+                conn.executemany(
+                    f"INSERT INTO inventaris ({', '.join(KOLOM_INVENTARIS)}) VALUES ({', '.join('?' * len(KOLOM_INVENTARIS))})",
+                    [tuple(map(_ke_sql, row)) for row in inventaris[KOLOM_INVENTARIS].itertuples(index=False, name=None)],
+                )
+            if stok is not None and len(stok):
+                conn.executemany(
+                    f"INSERT INTO inventaris ({', '.join(KOLOM_INVENTARIS)}) VALUES ({', '.join('?' * len(KOLOM_INVENTARIS))}) "
+                    "ON CONFLICT (item) DO UPDATE SET qty = qty + excluded.qty, satuan = excluded.satuan, "
+                    "min_stok = excluded.min_stok, status = excluded.status",
+                    [tuple(map(_ke_sql, row)) for row in stok[KOLOM_INVENTARIS].itertuples(index=False, name=None)],
+                )
+            if harga_jual is not None:
+                # Produk tidak dihapus (riwayat harganya tetap dipakai); kode & barcode tidak diubah
+                _catat_riwayat_harga(conn, harga_jual.items(), date.today())
+                conn.executemany(
+                    "INSERT INTO harga_jual (item, harga) VALUES (?, ?) ON CONFLICT (item) DO UPDATE SET harga = excluded.harga",
+                    [(item, _ke_sql(harga)) for item, harga in harga_jual.items()],
+                )
+            if resep is not None:
+                conn.execute("DELETE FROM resep")
+                conn.executemany(
+                    f"INSERT INTO resep ({', '.join(KOLOM_RESEP)}) VALUES ({', '.join('?' * len(KOLOM_RESEP))})",
+                    [tuple(map(_ke_sql, row)) for row in resep[KOLOM_RESEP].itertuples(index=False, name=None)],
+                )
+            if lot is not None:
+                lot_baru, sisa = lot
+                query = f"INSERT INTO lot_bahan ({', '.join(KOLOM_LOT_BARU)}) VALUES ({', '.join('?' * len(KOLOM_LOT_BARU))})"
+                id_baru['lot'] = [conn.execute(query, tuple(map(_ke_sql, row))).lastrowid for row in lot_baru]
+                conn.executemany("UPDATE lot_bahan SET sisa = ? WHERE id = ?", sisa)
+            if len(tagihan):
+                if isinstance(tagihan, pd.DataFrame):
+                    tagihan = {k: tagihan[k].to_numpy() for k in KOLOM_TAGIHAN_BARU}
+                query = f"INSERT INTO tagihan ({', '.join(KOLOM_TAGIHAN_BARU)}) VALUES ({', '.join('?' * len(KOLOM_TAGIHAN_BARU))})"
+                id_baru['tagihan'] = [conn.execute(query, row).lastrowid for row in _baris_sql(KOLOM_TAGIHAN_BARU, tagihan)]
+            if len(pelunasan):
+                baris = [tuple(map(_ke_sql, row)) for row in pelunasan]
+                conn.executemany("INSERT INTO pelunasan (tagihan_id, tanggal, jumlah) VALUES (?, ?, ?)", baris)
+                conn.executemany("UPDATE tagihan SET dibayar = dibayar + ? WHERE id = ?", [(jumlah, i) for i, _, jumlah in baris])
+            for kunci, nilai in (pengaturan or {}).items():
+                conn.execute("INSERT OR REPLACE INTO pengaturan (kunci, nilai) VALUES (?, ?)", [kunci, nilai])
+        return id_baru
+
+    def simpan_katalog(self, produk, berlaku=None, versi=None):
+        # produk: DataFrame KOLOM_KATALOG berisi produk baru/berubah saja; perubahan
+        # harga dicatat di riwayat harga, berlaku mulai `berlaku` (default hari ini)
+        berlaku = berlaku or date.today()
+        baris = [tuple(map(_ke_sql, row)) for row in produk[KOLOM_KATALOG].itertuples(index=False, name=None)]
+        with self.transaksi_db() as conn:
+            _periksa_versi(conn, versi)
+            _catat_riwayat_harga(conn, [(item, harga) for item, _, _, harga in baris], berlaku)
+            conn.executemany(
+                f"INSERT INTO harga_jual ({', '.join(KOLOM_KATALOG)}) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (item) DO UPDATE SET kode = excluded.kode, barcode = excluded.barcode, harga = excluded.harga",
+                baris,
+            )
+
+    def hapus_semua(self):
+        # pengaturan sengaja tidak dihapus: buku yang dikosongkan tidak punya riwayat
+        # sebelum HPP FIFO, jadi tanda hpp_fifo tetap berlaku (riwayat tidak diputar ulang)
+        with self.transaksi_db() as conn:
+            for tabel in ('transaksi', 'jurnal', 'inventaris', 'harga_jual', 'riwayat_harga', 'resep', 'periode', 'periode_saldo', 'periode_total', 'lot_bahan', 'tagihan', 'pelunasan'):
+                conn.execute(f"DELETE FROM {tabel}")
@@ -0,0 +1,122 @@
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from buku_besar import SaldoAkun
+
+# --- TUTUP BUKU BULANAN ---
+# Mutasi setiap bulan yang sudah ditutup (debit/kredit per akun dan total per
+# jenis transaksi) dibekukan di tabel periode_* lalu disimpan di memori sebagai
+# jumlah kumulatif per bulan. Laporan untuk rentang tanggal apa pun dihitung dari
+# selisih dua baris kumulatif (bulan tertutup di dalam rentang) ditambah query
+# SQLite lewat indeks tanggal untuk sisa harinya: potongan bulan di awal/akhir
+# rentang dan periode yang masih berjalan. Laporan akhir tahun jadi sama murahnya
+# dengan laporan akhir bulan, berapa pun tahun yang tercatat.
+#
+# Bulan yang ditutup selalu berurutan tanpa celah mulai dari bulan data pertama.
+# Posting bertanggal di bulan tertutup (mis. impor data lama) membuka kembali
+# bulan itu dan semua bulan sesudahnya.
+
+
+def periode_dari(tanggal):
+    return f"{tanggal.year:04d}-{tanggal.month:02d}"
+
+
+def awal_periode(periode):
+    return date(int(periode[:4]), int(periode[5:7]), 1)
+
+
+def periode_berikut(periode):
+    awal = awal_periode(periode)
+    return periode_dari(date(awal.year + awal.month // 12, awal.month % 12 + 1, 1))
+
+
+def akhir_periode(periode):
+    return awal_periode(periode_berikut(periode)) - timedelta(days=1)
+
+
+def _kumulatif(df, posisi, kolom_kunci, kunci, kolom_nilai):
+    # Baris 0 = nol, baris i+1 = jumlah s.d. periode ke-i (satu kolom per kunci)
+    hasil = np.zeros((len(posisi) + 1, len(kunci)), dtype=np.int64)
+    if len(df):
+        baris = df['periode'].map(posisi).to_numpy(dtype=np.int64) + 1
+        kolom = pd.Index(kunci).get_indexer(df[kolom_kunci])
+        np.add.at(hasil, (baris, kolom), df[kolom_nilai].to_numpy(dtype=np.int64))
+    return np.cumsum(hasil, axis=0)
+
+
+class PeriodeBuku:
+    def __init__(self, periode=(), saldo=None, total=None):
+        self.periode = list(periode)
+        self._awal = [awal_periode(p) for p in self.periode]
+        self._akhir = [akhir_periode(p) for p in self.periode]
+        posisi = {p: i for i, p in enumerate(self.periode)}
+        saldo = saldo if saldo is not None else pd.DataFrame(columns=['periode', 'akun', 'debit', 'kredit'])
+        total = total if total is not None else pd.DataFrame(columns=['periode', 'jenis', 'total'])
+        self.akun = sorted(set(saldo['akun']))
+        self.jenis = sorted(set(total['jenis']))
+        self._debit = _kumulatif(saldo, posisi, 'akun', self.akun, 'debit')
+        self._kredit = _kumulatif(saldo, posisi, 'akun', self.akun, 'kredit')
+        self._total = _kumulatif(total, posisi, 'jenis', self.jenis, 'total')
+
+    @classmethod
+    def dari_db(cls, db):
+        return cls(*db.muat_periode())
+
+    @property
+    def ditutup_sampai(self):
+        return self.periode[-1] if self.periode else None
+
+    # --- TUTUP & BUKA ---
+    # Keduanya menulis ke database lalu mengembalikan PeriodeBuku baru (yang lama tidak diubah)
+    def tutup(self, db, sampai):
+        # Menutup semua bulan penuh yang belum ditutup s.d. periode `sampai`
+        mulai = periode_berikut(self.ditutup_sampai) if self.periode else db.periode_pertama()
+        daftar = []
+        while mulai is not None and mulai <= sampai:
+            daftar.append((mulai, awal_periode(mulai), akhir_periode(mulai)))
+            mulai = periode_berikut(mulai)
+        if not daftar:
+            return self
+        db.tutup_periode(daftar)
+        return PeriodeBuku.dari_db(db)
+
+    def buka(self, db, tanggal):
+        # Dipanggil sebelum posting bertanggal `tanggal` (tanggal paling awal di batch)
+        if not self.periode or tanggal is None:
+            return self
+        periode = periode_dari(pd.Timestamp(tanggal))
+        if periode > self.ditutup_sampai:
+            return self
+        db.buka_periode(periode)
+        return PeriodeBuku.dari_db(db)
+
+    # --- LAPORAN ---
+    def mutasi(self, db, dari=None, sampai=None):
+        # Saldo akun (SaldoAkun) dan total per jenis transaksi untuk tanggal dari..sampai
+        # (None = tanpa batas). Bulan tertutup: i..j-1.
+        i = 0 if dari is None else bisect_left(self._awal, dari)
+        j = len(self.periode) if sampai is None else bisect_right(self._akhir, sampai)
+        debit, kredit, total = defaultdict(int), defaultdict(int), defaultdict(int)
+        if i < j:
+            for akun, d, k in zip(self.akun, self._debit[j] - self._debit[i], self._kredit[j] - self._kredit[i]):
+                debit[akun] += int(d)
+                kredit[akun] += int(k)
+            for jenis, t in zip(self.jenis, self._total[j] - self._total[i]):
+                total[jenis] += int(t)
+            sisa = [(dari, self._awal[i] - timedelta(days=1)), (self._akhir[j - 1] + timedelta(days=1), sampai)]
+        else:
+            sisa = [(dari, sampai)]
+        for awal, akhir in sisa:
+            if awal is not None and akhir is not None and awal > akhir:
+                continue
+            for hasil, tambahan in zip((debit, kredit, total), db.mutasi(awal, akhir)):
+                for kunci, nilai in tambahan.items():
+                    hasil[kunci] += int(nilai or 0)
+        saldo = SaldoAkun()
+        saldo.debit.update(debit)
+        saldo.kredit.update(kredit)
+        return saldo, dict(total)
@@ -0,0 +1,126 @@
+from collections import defaultdict, deque
+
+# --- HARGA POKOK PENJUALAN (FIFO PER LOT BAHAN BAKU) ---
+# Setiap baris pembelian bahan baku menjadi satu lot (qty, harga satuan). Bahan
+# yang terpakai oleh penjualan (lewat resep) diambil dari lot tertua lebih dulu,
+# dan biayanya diposting sebagai jurnal HPP (Harga Pokok Penjualan / Bahan Baku)
+# bersama checkout-nya. Laba-rugi cukup membaca saldo akun HPP tanpa memindai
+# pembelian. Setiap lot masuk sekali dan habis sekali, jadi biaya per posting
+# O(1) diamortisasi berapa pun jumlah lotnya.
+#
+# Lot disimpan di tabel lot_bahan; yang dimuat ke memori hanya lot yang masih
+# bersisa. Perubahan selama satu posting dicatat (mulai() .. selesai()), diambil
+# lewat perubahan() lalu ditulis ke database bersama jurnalnya; kalau penulisan
+# gagal, batalkan() mengembalikan lot di memori seperti semula. Lot baru memakai
+# id sementara (negatif) sampai selesai() menerima id dari SQLite, karena proses
+# lain (kasir.py) bisa menambah lot ke database yang sama.
+#
+# Pemakaian melebihi sisa lot (stok yang tidak tercatat lewat pembelian)
+# dibebankan dengan harga lot terakhir bahan itu, atau 0 kalau belum pernah dibeli.
+# Impor data lama diputar per potongan dengan hpp_riwayat(): pembelian impor menjadi
+# lot (di belakang lot yang sudah ada) dan penjualan impor memakai lot.
+
+SISA_MINIMUM = 1e-9
+
+
+class PersediaanFIFO:
+    def __init__(self, lot=(), harga_terakhir=None):
+        # lot: [(id, bahan, sisa, harga)] urut id
+        self._lot = {}
+        for id_lot, bahan, sisa, harga in lot:
+            self._lot.setdefault(bahan, deque()).append([id_lot, sisa, harga])
+        self._harga_terakhir = dict(harga_terakhir or {})
+        self._log = None
+
+    @classmethod
+    def dari_db(cls, db):
+        return cls(*db.muat_lot())
+
+    def nilai(self):
+        # Sisa qty & nilai lot per bahan: {bahan: (qty, nilai)}
+        return {bahan: (sum(l[1] for l in lot), sum(l[1] * l[2] for l in lot)) for bahan, lot in self._lot.items() if lot}
+
+    # --- PERUBAHAN SATU POSTING ---
+    def mulai(self):
+        self._log = []
+        self._baru = []
+        self._sisa = {}
+
+    def tambah(self, bahan, tanggal, qty, harga):
+        # Lot baru dari satu baris pembelian (harga per satuan bahan)
+        lot = [-1 - len(self._baru), float(qty), float(harga)]
+        self._lot.setdefault(bahan, deque()).append(lot)
+        self._log.append(('tambah', bahan, self._harga_terakhir.get(bahan)))
+        self._harga_terakhir[bahan] = float(harga)
+        self._baru.append((lot, bahan, tanggal, float(qty), float(harga)))
+
+    def pakai(self, bahan, qty):
+        # Mengambil qty bahan dari lot tertua; mengembalikan biayanya (rupiah, float)
+        biaya = 0.0
+        antrean = self._lot.get(bahan)
+        while qty > SISA_MINIMUM and antrean:
+            lot = antrean[0]
+            ambil = min(qty, lot[1])
+            biaya += ambil * lot[2]
+            qty -= ambil
+            self._log.append(('sisa', lot, lot[1]))
+            lot[1] -= ambil
+            self._sisa[lot[0]] = lot[1]
+            if lot[1] <= SISA_MINIMUM:
+                antrean.popleft()
+                self._log.append(('habis', bahan, lot))
+        if qty > SISA_MINIMUM:
+            biaya += qty * self._harga_terakhir.get(bahan, 0.0)
+        return biaya
+
+    def pakai_semua(self, pemakaian):
+        # pemakaian: Series qty per bahan (MatriksResep.pemakaian_bahan)
+        return sum(self.pakai(bahan, qty) for bahan, qty in pemakaian.items() if qty > 0)
+
+    def perubahan(self):
+        # Untuk Penyimpanan.simpan(lot=...): (lot baru, [(sisa, id)] lot lama yang terpakai)
+        baru = [(bahan, tanggal, qty, max(self._sisa.get(lot[0], qty), 0.0), harga) for lot, bahan, tanggal, qty, harga in self._baru]
+        sisa = [(max(s, 0.0), id_lot) for id_lot, s in self._sisa.items() if id_lot > 0]
+        return baru, sisa
+
+    def selesai(self, id_lot=()):
+        # Perubahan sudah tersimpan di database; id_lot: id dari SQLite untuk lot baru (urutan tambah())
+        for (lot, *_), id_baru in zip(self._baru, id_lot):
+            lot[0] = id_baru
+        self._log = None
+
+    def batalkan(self):
+        # Dipanggil kalau posting gagal sebelum perubahan() tersimpan
+        for langkah in reversed(self._log or []):
+            if langkah[0] == 'tambah':
+                _, bahan, harga_lama = langkah
+                self._lot[bahan].pop()
+                if harga_lama is None:
+                    self._harga_terakhir.pop(bahan, None)
+                else:
+                    self._harga_terakhir[bahan] = harga_lama
+            elif langkah[0] == 'sisa':
+                _, lot, sisa = langkah
+                lot[1] = sisa
+            else:
+                _, bahan, lot = langkah
+                self._lot[bahan].appendleft(lot)
+        self._log = None
+
+
+def hpp_riwayat(transaksi, matriks_resep, fifo):
+    # Dipakai sekali untuk database yang sudah berisi transaksi sebelum HPP FIFO, dan
+    # untuk setiap potongan impor: pembelian & penjualan diputar ulang urut tanggal
+    # (lalu urutan baris). Mengembalikan {tanggal: biaya HPP} untuk dijurnal per hari.
+    resep = defaultdict(list)
+    for i, j in zip(*matriks_resep.matriks.nonzero()):
+        resep[matriks_resep.produk[i]].append((matriks_resep.bahan[j], float(matriks_resep.matriks[i, j])))
+    urutan = transaksi.sort_values('tanggal', kind='stable')
+    biaya = defaultdict(float)
+    for tanggal, jenis, item, qty, harga in urutan[['tanggal', 'jenis', 'item', 'qty', 'harga']].itertuples(index=False, name=None):
+        if jenis == 'Pembelian':
+            fifo.tambah(item, tanggal, qty, harga)
+        elif jenis == 'Penjualan':
+            for bahan, per_unit in resep.get(item, ()):
+                biaya[tanggal] += fifo.pakai(bahan, per_unit * qty)
+    return biaya
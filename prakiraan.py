@@ -0,0 +1,121 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+# --- PRAKIRAAN RESTOCK BAHAN BAKU ---
+# Laju pemakaian setiap bahan dihitung dari penjualan harian beberapa minggu
+# terakhir dikali matriks resep: satu matriks hari x bahan untuk semua bahan
+# sekaligus, bukan per item. Rata-rata beberapa jendela (7 & 28 hari) diambil
+# dari jumlah kumulatifnya; yang dipakai adalah yang terbesar, supaya kenaikan
+# penjualan minggu ini langsung terlihat tanpa melupakan pola bulanan.
+#
+# Dari laju itu dihitung cakupan stok (berapa hari lagi stok habis) dan saran
+# jumlah pembelian: cukup untuk waktu tunggu pemasok + target cakupan, di atas
+# stok minimum. Penulis buku besar (BukuBersama) memperbarui matriks pemakaian di
+# setiap posting penjualan, menghitung prakiraan sekali per versi data, dan
+# menerbitkan peringatan untuk bahan yang baru masuk status Perlu Restock.
+
+HARI_RIWAYAT = 28
+JENDELA_HARI = [7, 28]
+
+# Waktu tunggu pembelian ke pemasok & stok yang ingin dimiliki setelah restock (hari)
+WAKTU_TUNGGU_HARI = 3
+TARGET_CAKUPAN_HARI = 14
+# Bahan dengan cakupan di bawah ini ikut Perlu Restock walaupun di atas stok minimum
+BATAS_CAKUPAN_HARI = 7
+
+# Jumlah peringatan terakhir yang disimpan di snapshot
+BATAS_PERINGATAN = 50
+
+KOLOM_PRAKIRAAN = ['item', 'qty', 'satuan', 'min_stok', 'laju_harian', 'cakupan_hari', 'habis_tanggal', 'saran_beli', 'status']
+
+
+class PemakaianHarian:
+    # Pemakaian bahan per hari untuk HARI_RIWAYAT hari yang berakhir di `sampai`
+    # (baris terakhir = hari `sampai`). Tidak diubah setelah diterbitkan.
+    def __init__(self, bahan=(), data=None, sampai=None):
+        self.bahan = pd.Index(bahan)
+        self.sampai = sampai or date.today()
+        self.data = data if data is not None else np.zeros((HARI_RIWAYAT, len(self.bahan)))
+
+    @classmethod
+    def dari_db(cls, db, matriks_resep, sampai=None):
+        sampai = sampai or date.today()
+        awal = sampai - timedelta(days=HARI_RIWAYAT - 1)
+        penjualan = db.penjualan_harian(awal, sampai)
+        qty_produk = np.zeros((HARI_RIWAYAT, len(matriks_resep.produk)))
+        if not penjualan.empty:
+            hari = (pd.to_datetime(penjualan['tanggal']) - pd.Timestamp(awal)).dt.days.to_numpy()
+            posisi = matriks_resep.produk.get_indexer(pd.Index(penjualan['item']))
+            ada = posisi >= 0
+            np.add.at(qty_produk, (hari[ada], posisi[ada]), penjualan['qty'].to_numpy(dtype=float)[ada])
+        return cls(matriks_resep.bahan, qty_produk @ matriks_resep.matriks, sampai)
+
+    def geser(self, sampai):
+        # Jendela yang berakhir di `sampai` (hari yang lewat dibuang, hari baru nol)
+        hari = (sampai - self.sampai).days
+        if hari <= 0:
+            return self
+        data = np.zeros_like(self.data)
+        if hari < HARI_RIWAYAT:
+            data[:HARI_RIWAYAT - hari] = self.data[hari:]
+        return PemakaianHarian(self.bahan, data, sampai)
+
+    def dengan(self, pemakaian):
+        # pemakaian: list (tanggal, Series pemakaian per bahan) dari posting penjualan;
+        # tanggal di luar jendela diabaikan
+        hasil = self.geser(max(self.sampai, date.today()))
+        data = hasil.data.copy()
+        for tanggal, jumlah in pemakaian:
+            baris = HARI_RIWAYAT - 1 - (hasil.sampai - pd.Timestamp(tanggal).date()).days
+            if 0 <= baris < HARI_RIWAYAT:
+                data[baris] += jumlah.reindex(hasil.bahan, fill_value=0).to_numpy(dtype=float)
+        return PemakaianHarian(hasil.bahan, data, hasil.sampai)
+
+    def rata_jendela(self):
+        # Rata-rata pemakaian harian per jendela: array (jendela x bahan), urutan JENDELA_HARI
+        data = self.geser(max(self.sampai, date.today())).data
+        kumulatif = np.cumsum(data[::-1], axis=0)
+        return np.array([kumulatif[n - 1] / n for n in JENDELA_HARI]).reshape(len(JENDELA_HARI), len(self.bahan))
+
+    def laju(self):
+        # Rata-rata per jendela (kolom rata_<n>) & laju yang dipakai (terbesar)
+        rata = self.rata_jendela()
+        hasil = pd.DataFrame(rata.T, index=self.bahan, columns=[f'rata_{n}' for n in JENDELA_HARI])
+        hasil['laju_harian'] = rata.max(axis=0)
+        return hasil
+
+
+def prakiraan_restock(inventaris, pemakaian, per_tanggal=None):
+    # Satu baris per bahan di inventaris (urutan sama), kolom KOLOM_PRAKIRAAN
+    per_tanggal = np.datetime64(per_tanggal or date.today(), 'D')
+    # bahan yang tidak dipakai resep mana pun (posisi -1) mendapat laju 0 di ujung array
+    posisi = pemakaian.bahan.get_indexer(inventaris['item'])
+    laju = np.append(pemakaian.rata_jendela().max(axis=0, initial=0.0), 0.0)[posisi]
+    qty = inventaris['qty'].to_numpy(dtype=float)
+    min_stok = inventaris['min_stok'].to_numpy(dtype=float)
+    cakupan = np.divide(np.maximum(qty, 0), laju, out=np.full(len(qty), np.inf), where=laju > 0)
+    terbatas = np.isfinite(cakupan)
+    habis = np.full(len(qty), np.datetime64('NaT'), dtype='datetime64[D]')
+    habis[terbatas] = per_tanggal + np.floor(cakupan[terbatas]).astype('timedelta64[D]')
+    target = laju * (WAKTU_TUNGGU_HARI + TARGET_CAKUPAN_HARI) + min_stok
+    perlu = (qty <= min_stok) | (cakupan < BATAS_CAKUPAN_HARI)
+    return pd.DataFrame({
+        'item': inventaris['item'].to_numpy(),
+        'qty': qty,
+        'satuan': inventaris['satuan'].to_numpy(),
+        'min_stok': inventaris['min_stok'].to_numpy(),
+        'laju_harian': laju,
+        'cakupan_hari': cakupan,
+        'habis_tanggal': habis,
+        'saran_beli': np.where(perlu, np.ceil(np.maximum(target - qty, 0)), 0),
+        'status': np.where(perlu, 'Perlu Restock', 'Cukup'),
+    }, columns=KOLOM_PRAKIRAAN)
+
+
+def peringatan_baru(lama, baru):
+    # Baris prakiraan `baru` yang Perlu Restock tetapi sebelumnya (di `lama`) belum/tidak ada
+    perlu_lama = set(lama.loc[lama['status'] == 'Perlu Restock', 'item']) if lama is not None else set()
+    perlu = baru[(baru['status'] == 'Perlu Restock') & ~baru['item'].isin(perlu_lama)]
+    return perlu.to_dict('records')
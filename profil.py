@@ -0,0 +1,175 @@
+import cProfile
+import functools
+import json
+import marshal
+import pstats
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+
+import numpy as np
+
+# --- PROFIL KINERJA ---
+# Mencatat waktu setiap rerun: bagian-bagian script (muat sesi, sidebar, menu
+# yang dibuka) lewat tandai(), fungsi posting lewat dekorator fungsi(), serta
+# jumlah baris & memori data. Riwayat disimpan bergulir (deque) untuk seluruh
+# proses dan bisa diekspor sebagai JSON atau file .prof (cProfile).
+#
+# Saat tidak aktif setiap panggilan hanya memeriksa satu atribut, jadi
+# instrumentasi boleh dibiarkan terpasang.
+
+PANJANG_RIWAYAT = 200
+
+_TANPA_UKUR = nullcontext()
+
+
+class _Lokal(threading.local):
+    rerun = None
+
+
+class Profil:
+    def __init__(self, panjang_riwayat=PANJANG_RIWAYAT):
+        self.aktif = False
+        self.rekam_cprofile = False
+        self.riwayat = deque(maxlen=panjang_riwayat)
+        self._lock = threading.Lock()
+        # rerun yang sedang berjalan dicatat per thread (satu thread per rerun sesi)
+        self._lokal = _Lokal()
+        # cProfile hanya dijalankan di satu thread pada satu waktu
+        self._pemilik_cprofile = None
+        self._stats = None
+
+    # --- PENCATATAN ---
+    def mulai_rerun(self):
+        # Rerun sebelumnya di thread ini bisa berhenti di tengah (st.rerun/st.stop)
+        # sebelum sempat memanggil selesai_rerun
+        if self._lokal.rerun is not None:
+            self.selesai_rerun('(terputus)')
+        if not self.aktif:
+            return
+        sekarang = time.perf_counter()
+        rerun = {'mulai': sekarang, 'tanda': sekarang, 'bagian': {}, 'profiler': None}
+        if self.rekam_cprofile and self._ambil_cprofile():
+            rerun['profiler'] = cProfile.Profile()
+            rerun['profiler'].enable()
+        self._lokal.rerun = rerun
+
+    def _ambil_cprofile(self):
+        with self._lock:
+            pemilik = self._pemilik_cprofile
+            if pemilik is not None and pemilik != threading.get_ident():
+                # pemilik lama dilepas kalau thread-nya sudah selesai
+                if any(t.ident == pemilik for t in threading.enumerate()):
+                    return False
+            self._pemilik_cprofile = threading.get_ident()
+            return True
+
+    def tandai(self, nama):
+        # Waktu sejak tanda sebelumnya dicatat sebagai bagian `nama`
+        rerun = self._lokal.rerun
+        if rerun is None:
+            return
+        sekarang = time.perf_counter()
+        rerun['bagian'][nama] = rerun['bagian'].get(nama, 0.0) + (sekarang - rerun['tanda']) * 1000
+        rerun['tanda'] = sekarang
+
+    def ukur(self, nama):
+        # Context manager untuk blok kode; nullcontext bila profil tidak aktif
+        if self._lokal.rerun is None:
+            return _TANPA_UKUR
+        return _Ukur(self, nama)
+
+    def fungsi(self, f):
+        @functools.wraps(f)
+        def bungkus(*args, **kwargs):
+            if self._lokal.rerun is None:
+                return f(*args, **kwargs)
+            with _Ukur(self, f.__name__):
+                return f(*args, **kwargs)
+        return bungkus
+
+    def selesai_rerun(self, menu, ukuran_data=None):
+        # ukuran_data: fungsi yang mengembalikan {nama tabel: (jumlah baris, byte)};
+        # hanya dipanggil kalau rerun ini memang direkam
+        rerun = self._lokal.rerun
+        if rerun is None:
+            return
+        self._lokal.rerun = None
+        profiler = rerun['profiler']
+        if profiler is not None:
+            profiler.disable()
+            with self._lock:
+                if self._stats is None:
+                    self._stats = pstats.Stats(profiler)
+                else:
+                    self._stats.add(profiler)
+                self._pemilik_cprofile = None
+        catatan = {
+            'waktu': time.time(),
+            'menu': menu,
+            'total_ms': round((time.perf_counter() - rerun['mulai']) * 1000, 3),
+            'bagian': {k: round(v, 3) for k, v in rerun['bagian'].items()},
+            'data': {k: {'baris': int(b), 'byte': int(m)} for k, (b, m) in (ukuran_data() if ukuran_data else {}).items()},
+        }
+        with self._lock:
+            self.riwayat.append(catatan)
+
+    def reset(self):
+        with self._lock:
+            self.riwayat.clear()
+            self._stats = None
+
+    # --- RINGKASAN & EKSPOR ---
+    def ringkasan(self):
+        # Statistik per bagian/fungsi di seluruh riwayat: jumlah, rata-rata, p95, maks (ms)
+        with self._lock:
+            riwayat = list(self.riwayat)
+        waktu = {}
+        for catatan in riwayat:
+            waktu.setdefault(f"rerun {catatan['menu']}", []).append(catatan['total_ms'])
+            for nama, ms in catatan['bagian'].items():
+                waktu.setdefault(nama, []).append(ms)
+        baris = []
+        for nama, nilai in waktu.items():
+            arr = np.asarray(nilai)
+            baris.append({
+                'bagian': nama,
+                'jumlah': len(arr),
+                'rata_ms': round(float(arr.mean()), 3),
+                'p95_ms': round(float(np.percentile(arr, 95)), 3),
+                'maks_ms': round(float(arr.max()), 3),
+            })
+        return sorted(baris, key=lambda b: b['rata_ms'], reverse=True)
+
+    def ke_json(self):
+        with self._lock:
+            riwayat = list(self.riwayat)
+        return json.dumps({'riwayat': riwayat, 'ringkasan': self.ringkasan()}, indent=2)
+
+    def ke_prof(self):
+        # Isi file .prof (format pstats.dump_stats), bisa dibuka dengan
+        # `python -m pstats file.prof` atau snakeviz. None kalau belum ada rekaman.
+        with self._lock:
+            if self._stats is None:
+                return None
+            return marshal.dumps(self._stats.stats)
+
+
+class _Ukur:
+    __slots__ = ('profil', 'nama', 'mulai')
+
+    def __init__(self, profil, nama):
+        self.profil = profil
+        self.nama = nama
+
+    def __enter__(self):
+        self.mulai = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        rerun = self.profil._lokal.rerun
+        if rerun is not None:
+            bagian = rerun['bagian']
+            bagian[self.nama] = bagian.get(self.nama, 0.0) + (time.perf_counter() - self.mulai) * 1000
+        return False
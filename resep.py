@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+# --- RESEP / BILL OF MATERIALS ---
+# Resep disimpan sebagai tabel (produk, bahan, qty per unit produk) lalu
+# dikompilasi menjadi matriks pemakaian produk x bahan. Pemakaian bahan untuk
+# satu keranjang (atau ribuan baris impor) dihitung dengan satu perkalian
+# vektor-matriks, dan stok dikurangi sekaligus lewat indeks item inventaris.
+
+KOLOM_RESEP = ['produk', 'bahan', 'qty']
+
+
+def resep_kosong():
+    return pd.DataFrame(columns=KOLOM_RESEP)
+
+
+def bersihkan_resep(resep):
+    # Dipakai setelah resep diedit: buang baris kosong, gabungkan baris ganda
+    resep = resep[KOLOM_RESEP].dropna(subset=['produk', 'bahan'])
+    resep = resep[(resep['produk'].astype(str).str.strip() != '') & (resep['bahan'].astype(str).str.strip() != '')]
+    resep = resep.assign(qty=pd.to_numeric(resep['qty'], errors='coerce').fillna(0))
+    return resep.groupby(['produk', 'bahan'], as_index=False, sort=False)['qty'].sum()
+
+
+class MatriksResep:
+    def __init__(self, resep):
+        resep = bersihkan_resep(resep) if not resep.empty else resep_kosong()
+        self.produk = pd.Index(resep['produk'].unique())
+        self.bahan = pd.Index(resep['bahan'].unique())
+        self.matriks = np.zeros((len(self.produk), len(self.bahan)))
+        if not resep.empty:
+            baris = self.produk.get_indexer(resep['produk'])
+            kolom = self.bahan.get_indexer(resep['bahan'])
+            np.add.at(self.matriks, (baris, kolom), resep['qty'].to_numpy(dtype=float))
+
+    def pemakaian_bahan(self, item, qty):
+        # item, qty: array/list sejajar (satu elemen per baris penjualan).
+        # Hasil: Series jumlah bahan yang terpakai, diindeks nama bahan.
+        posisi = self.produk.get_indexer(pd.Index(item))
+        ada = posisi >= 0
+        jumlah_produk = np.bincount(
+            posisi[ada],
+            weights=np.asarray(qty, dtype=float)[ada],
+            minlength=len(self.produk),
+        )
+        return pd.Series(jumlah_produk @ self.matriks, index=self.bahan)
+
+
+def kurangi_stok(inventaris, pemakaian):
+    # Mengurangi qty inventaris sesuai pemakaian bahan. Bahan yang tidak ada di
+    # inventaris dilewati, sama seperti perilaku sebelumnya.
+    pemakaian = pemakaian[pemakaian != 0]
+    if pemakaian.empty or inventaris.empty:
+        return inventaris
+    posisi = pd.Index(inventaris['item']).get_indexer(pemakaian.index)
+    ada = posisi >= 0
+    qty = inventaris['qty'].to_numpy(dtype=float, copy=True)
+    np.subtract.at(qty, posisi[ada], pemakaian.to_numpy()[ada])
+    inventaris['qty'] = qty
+    return inventaris
@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+
+# --- SKEMA DATA ---
+# Tipe kolom yang dipakai untuk transaksi, jurnal, dan inventaris di memori:
+# uang dalam rupiah bulat (int64), kode akun/metode/jenis sebagai kategori,
+# tanggal sebagai datetime64, dan urutan kolom yang tetap. Skema diterapkan
+# saat tabel dibuat dan setiap kali baris baru ditambahkan.
+
+RUPIAH = 'rupiah'
+ANGKA = 'angka'
+TANGGAL = 'tanggal'
+KATEGORI = 'kategori'
+TEKS = 'teks'
+
+SKEMA_TRANSAKSI = {
+    'transaksi_id': TEKS,
+    'tanggal': TANGGAL,
+    'jenis': KATEGORI,
+    'metode_bayar': KATEGORI,
+    'item': KATEGORI,
+    'qty': ANGKA,
+    'harga': RUPIAH,
+    'total': RUPIAH,
+    'catatan': TEKS,
+}
+
+SKEMA_JURNAL = {
+    'tanggal': TANGGAL,
+    'keterangan': TEKS,
+    'debit': RUPIAH,
+    'kredit': RUPIAH,
+    'akun': KATEGORI,
+    'kredit_akun': KATEGORI,
+}
+
+SKEMA_INVENTARIS = {
+    'item': TEKS,
+    'qty': ANGKA,
+    'satuan': TEKS,
+    'min_stok': ANGKA,
+    'status': TEKS,
+}
+
+DTYPE_ARRAY = {
+    RUPIAH: np.dtype(np.int64),
+    ANGKA: np.dtype(np.float64),
+    TANGGAL: np.dtype('datetime64[ns]'),
+    # kolom kategori disimpan sebagai kode int32, daftar kategorinya terpisah
+    KATEGORI: np.dtype(np.int32),
+    TEKS: np.dtype(object),
+}
+
+
+def _ke_angka(arr):
+    # Nilai kosong (None/NaN/'') menjadi NaN; teks yang bukan angka ditolak
+    # supaya kesalahan input tidak diam-diam tersimpan sebagai 0
+    if arr.dtype.kind in 'Mm':
+        raise ValueError(f"kolom angka berisi tanggal/durasi ({arr.dtype})")
+    hasil = pd.to_numeric(arr, errors='coerce').astype(np.float64)
+    arr = np.asarray(arr, dtype=object)
+    salah = np.isnan(hasil) & ~pd.isna(arr) & (arr != '')
+    if salah.any():
+        raise ValueError(f"nilai bukan angka: {arr[salah][0]!r}")
+    return hasil
+
+
+def ke_array(tipe, nilai):
+    # Mengubah list/array/Series menjadi array numpy sesuai tipe kolom.
+    # Kolom KATEGORI dikembalikan sebagai array teks (dikodekan oleh pemanggil).
+    # Jalur cepat numpy dicoba dulu karena posting keranjang hanya beberapa baris.
+    # Nilai yang tidak bisa diubah ke tipe kolomnya ditolak dengan ValueError.
+    if tipe == RUPIAH:
+        arr = np.asarray(nilai)
+        if arr.dtype.kind in 'iub':
+            return arr.astype(np.int64, copy=False)
+        return np.rint(np.nan_to_num(_ke_angka(arr), nan=0.0)).astype(np.int64)
+    if tipe == ANGKA:
+        arr = np.asarray(nilai)
+        if arr.dtype.kind in 'iufb':
+            return arr.astype(np.float64, copy=False)
+        return _ke_angka(arr)
+    if tipe == TANGGAL:
+        if len(nilai) and np.asarray(nilai).dtype.kind in 'iufb':
+            raise ValueError("kolom tanggal berisi angka")
+        try:
+            return np.asarray(nilai, dtype='datetime64[D]').astype('datetime64[ns]')
+        except (TypeError, ValueError):
+            return pd.DatetimeIndex(pd.to_datetime(np.asarray(nilai))).normalize().to_numpy('datetime64[ns]')
+    arr = np.array(nilai, dtype=object)
+    kosong = pd.isna(arr)
+    if kosong.any():
+        arr[kosong] = ''
+    if tipe == KATEGORI:
+        return arr.astype(str).astype(object)
+    return arr
+
+
+def terapkan_skema(df, skema):
+    # DataFrame dengan urutan kolom & tipe sesuai skema (kolom yang hilang diisi kosong)
+    kolom = {}
+    for nama, tipe in skema.items():
+        nilai = df[nama] if nama in df.columns else [''] * len(df)
+        arr = ke_array(tipe, nilai)
+        kolom[nama] = pd.Categorical(arr) if tipe == KATEGORI else arr
+    return pd.DataFrame(kolom, columns=list(skema), index=pd.RangeIndex(len(df)))
@@ -0,0 +1,96 @@
+import os
+
+import streamlit as st
+
+from buku_bersama import BukuBersama
+from data_awal import isi_data_awal
+from invoice import buat_invoice
+from laporan_latar import PoolLaporan
+from penyimpanan import DB_PATH, Penyimpanan
+from profil import Profil
+
+# --- SUMBER DAYA BERSAMA (CACHE STREAMLIT) ---
+# Fungsi ber-cache didefinisikan di modul ini, bukan di jamfix.py: Streamlit
+# menjalankan ulang jamfix.py setiap klik, sedangkan modul ini hanya diimpor
+# sekali per proses sehingga dekorator cache & isinya tidak dibuat ulang.
+
+FILE_CSS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tampilan.css')
+
+
+# Satu koneksi SQLite (mode WAL) untuk semua sesi
+@st.cache_resource
+def get_penyimpanan():
+    db = Penyimpanan(DB_PATH)
+    isi_data_awal(db)
+    return db
+
+
+# Satu buku besar (beserta inventaris, harga jual, resep) untuk semua sesi.
+# Sesi membaca snapshot terakhir; perubahan lewat antrean penulis tunggal.
+@st.cache_resource
+def get_buku_bersama():
+    return BukuBersama(get_penyimpanan())
+
+
+# Profil kinerja dipakai bersama semua sesi (lihat panel di sidebar mode editor)
+@st.cache_resource
+def get_profil():
+    return Profil()
+
+
+@st.cache_resource
+def css_aplikasi():
+    with open(FILE_CSS, encoding='utf-8') as f:
+        return f"<style>\n{f.read()}</style>"
+
+
+# Grafik dashboard & laporan per rentang tanggal dihitung di pool latar belakang,
+# hasilnya disimpan per versi buku besar (lihat laporan_latar.py)
+@st.cache_resource
+def get_pool_laporan():
+    return PoolLaporan()
+
+
+# Invoice dicari lewat indeks transaksi_id dan hasil render-nya di-cache per id
+@st.cache_data(max_entries=256)
+def render_invoice(buku_id, transaksi_id, _buku):
+    invoice_df = _buku.baris_transaksi(transaksi_id)
+    if invoice_df is None or invoice_df.empty:
+        return None
+    return buat_invoice(transaksi_id, invoice_df)
+
+
+# Transaksi bulan yang sudah diarsipkan tidak ada di buku besar memori; barisnya
+# dicari di SQLite lewat indeks transaksi_id. Cache per versi buku besar (Reset,
+# tutup/buka periode mengganti id atau versi), dan id yang tidak ditemukan tidak
+# ikut di-cache: st.cache_data tidak menyimpan hasil yang berupa exception.
+def render_invoice_arsip(buku_id, versi, transaksi_id):
+    try:
+        return _render_invoice_arsip(buku_id, versi, transaksi_id)
+    except LookupError:
+        return None
+
+
+@st.cache_data(max_entries=256)
+def _render_invoice_arsip(buku_id, versi, transaksi_id):
+    invoice_df = get_penyimpanan().transaksi_dengan_id(transaksi_id)
+    if invoice_df.empty:
+        raise LookupError(transaksi_id)
+    return buat_invoice(transaksi_id, invoice_df)
+
+
+# Jurnal & riwayat transaksi ditampilkan per halaman: hanya baris yang terlihat
+# yang dibaca dari SQLite (lewat indeks), ditambah jumlah baris & total sesuai filter.
+# Hasilnya di-cache per versi buku besar, jadi rerun tanpa posting baru tidak query ulang.
+@st.cache_data(max_entries=64)
+def ringkasan_halaman(tabel, buku_id, versi, filter):
+    db = get_penyimpanan()
+    return db.hitung_jurnal(**filter) if tabel == 'jurnal' else db.hitung_transaksi(**filter)
+
+
+@st.cache_data(max_entries=64)
+def isi_halaman(tabel, buku_id, versi, filter, batas, offset):
+    db = get_penyimpanan()
+    if tabel == 'jurnal':
+        return db.halaman_jurnal(batas, offset, **filter)
+    return db.halaman_transaksi(batas, offset, **filter)
@@ -0,0 +1,18 @@
+import os
+import sys
+
+import pytest
+
+# Modul aplikasi ada di root repo (tanpa paket), jadi root repo ditambahkan ke path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_awal import isi_data_awal  # noqa: E402
+from penyimpanan import Penyimpanan  # noqa: E402
+
+
+@pytest.fixture
+def db(tmp_path):
+    # Database baru berisi data awal (transaksi Juli 2025, inventaris, harga jual, resep)
+    db = Penyimpanan(str(tmp_path / 'buku.db'))
+    isi_data_awal(db)
+    return db
@@ -0,0 +1,54 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from akuntansi import batch_pembelian, batch_penjualan, daftar_pembelian_kosong, tambah_stok_pembelian
+from skema import SKEMA_INVENTARIS, terapkan_skema
+
+TANGGAL = date(2025, 7, 1)
+
+
+def _pasangan(batch):
+    # (keterangan, debit, akun debit, kredit, akun kredit) per pasangan jurnal
+    return [(d['keterangan'], d['debit'], d['akun'], k['kredit'], k['kredit_akun']) for d, k in zip(batch.jurnal[0::2], batch.jurnal[1::2])]
+
+
+def test_penjualan_satu_pasang_jurnal_per_metode():
+    batch = batch_penjualan('T1', TANGGAL, [
+        {'item': 'keripik kenikir', 'qty': 2, 'harga': 15000, 'metode_bayar': 'Tunai'},
+        {'item': 'kue bawang rasa original', 'qty': 1, 'harga': 15000, 'metode_bayar': 'Kredit'},
+        {'item': 'kue bawang rasa original', 'qty': 3, 'harga': 15000, 'metode_bayar': 'Tunai'},
+    ])
+    assert [(t['item'], t['total']) for t in batch.transaksi] == [
+        ('keripik kenikir', 30000), ('kue bawang rasa original', 15000), ('kue bawang rasa original', 45000)]
+    assert {t['transaksi_id'] for t in batch.transaksi} == {'T1'}
+    assert _pasangan(batch) == [
+        ('Penjualan Tunai ID T1', 75000, 'Kas', 75000, 'Penjualan'),
+        ('Penjualan Kredit ID T1', 15000, 'Piutang Usaha', 15000, 'Penjualan'),
+    ]
+
+
+def test_pembelian_satu_pasang_jurnal_per_baris():
+    daftar = daftar_pembelian_kosong()
+    daftar.loc[0] = ['Gula', 2, 'kg', 14000, 'Tunai']
+    daftar.loc[1] = ['Vanili', 1, 'botol', 5000, 'Kredit']
+    batch = batch_pembelian(TANGGAL, daftar)
+    assert [(t['jenis'], t['item'], t['total']) for t in batch.transaksi] == [('Pembelian', 'Gula', 28000), ('Pembelian', 'Vanili', 5000)]
+    assert _pasangan(batch) == [
+        ('Pembelian 2 kg Gula', 28000, 'Bahan Baku', 28000, 'Kas'),
+        ('Pembelian Kredit 1 botol Vanili', 5000, 'Bahan Baku', 5000, 'Utang Usaha'),
+    ]
+
+
+def test_stok_pembelian_menambah_dan_membuat_bahan_baru():
+    inventaris = terapkan_skema(pd.DataFrame([
+        {'item': 'Gula', 'qty': 20, 'satuan': 'kg', 'min_stok': 5, 'status': 'Cukup'},
+    ]), SKEMA_INVENTARIS)
+    daftar = daftar_pembelian_kosong()
+    daftar.loc[0] = ['Gula', 2.5, 'kg', 14000, 'Tunai']
+    daftar.loc[1] = ['Vanili', 1, 'botol', 5000, 'Tunai']
+    inventaris = tambah_stok_pembelian(inventaris, daftar)
+    assert inventaris[['item', 'qty', 'satuan', 'min_stok']].values.tolist() == [
+        ['Gula', pytest.approx(22.5), 'kg', 5.0], ['Vanili', 1.0, 'botol', 10.0]]
+    assert inventaris['qty'].dtype == 'float64'
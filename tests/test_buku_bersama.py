@@ -0,0 +1,67 @@
+import threading
+from datetime import date
+
+import pytest
+
+import akuntansi
+from buku_bersama import BukuBersama
+from penyimpanan import Penyimpanan
+
+KERANJANG = [{'item': 'keripik kenikir', 'qty': 2, 'harga': 15000, 'metode_bayar': 'Tunai'}]
+
+
+def _qty(inventaris, item):
+    return float(inventaris.loc[inventaris['item'] == item, 'qty'].iloc[0])
+
+
+def _jurnal_seimbang(db):
+    debit, kredit = db.conn.execute("SELECT SUM(debit), SUM(kredit) FROM jurnal").fetchone()
+    assert debit == kredit
+
+
+def test_perintah_dikerjakan_berurutan(db):
+    bersama = BukuBersama(db)
+    urutan = []
+    future = [bersama._kirim(urutan.append, i) for i in range(50)]
+    for f in future:
+        f.result()
+    assert urutan == list(range(50))
+
+
+def test_penjualan_bersamaan_dari_banyak_sesi(db):
+    bersama = BukuBersama(db)
+    awal = bersama.snapshot()
+    jumlah_transaksi = db.conn.execute("SELECT COUNT(*) FROM transaksi").fetchone()[0]
+    hasil, mulai = [], threading.Barrier(8)
+
+    def sesi():
+        mulai.wait()
+        for _ in range(5):
+            hasil.append(bersama.penjualan(date.today(), KERANJANG))
+
+    thread = [threading.Thread(target=sesi) for _ in range(8)]
+    for t in thread:
+        t.start()
+    for t in thread:
+        t.join()
+
+    assert len(set(hasil)) == 40
+    assert db.conn.execute("SELECT COUNT(*) FROM transaksi").fetchone()[0] == jumlah_transaksi + 40
+    _jurnal_seimbang(db)
+    akhir = bersama.snapshot()
+    # 40 x 2 keripik x 0,05 kg Gula
+    assert _qty(akhir.inventaris, 'Gula') == pytest.approx(_qty(awal.inventaris, 'Gula') - 4)
+    assert akuntansi.laba_rugi(akhir.buku)['pendapatan'] - akuntansi.laba_rugi(awal.buku)['pendapatan'] == 40 * 30000
+    # snapshot lama tidak ikut berubah
+    assert _qty(awal.inventaris, 'Gula') == 20
+    assert _qty(Penyimpanan(db.path).muat_inventaris(), 'Gula') == pytest.approx(16)
+
+
+def test_perintah_gagal_tidak_menghentikan_penulis(db):
+    bersama = BukuBersama(db)
+    sebelum = bersama.snapshot()
+    with pytest.raises(ZeroDivisionError):
+        bersama._tunggu(lambda: 1 / 0)
+    assert bersama.snapshot() is sebelum
+    bersama.penjualan(date.today(), KERANJANG)
+    assert bersama.snapshot() is not sebelum
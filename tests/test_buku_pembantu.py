@@ -0,0 +1,106 @@
+import io
+from datetime import date, timedelta
+
+import pandas as pd
+import pytest
+
+from buku_bersama import BukuBersama
+from buku_pembantu import KELOMPOK_UMUR, BukuPembantu, tagihan_impor
+from impor import impor
+
+PER_TANGGAL = date(2025, 6, 1)
+
+
+def _pembantu(hari_lewat):
+    # Satu tagihan per jumlah hari lewat jatuh tempo; jumlahnya = urutan * 1000 supaya mudah dikenali
+    return BukuPembantu(pd.DataFrame([
+        {'id': i + 1, 'jenis': 'Piutang', 'pihak': 'Toko A', 'referensi': f'T{i}',
+         'tanggal': PER_TANGGAL - timedelta(days=hari + 30), 'jatuh_tempo': PER_TANGGAL - timedelta(days=hari),
+         'jumlah': (i + 1) * 1000, 'dibayar': 0}
+        for i, hari in enumerate(hari_lewat)
+    ]))
+
+
+@pytest.mark.parametrize('hari, kelompok', [
+    (-1, 'Belum Jatuh Tempo'),
+    (0, '0-30 Hari'),
+    (30, '0-30 Hari'),
+    (31, '31-60 Hari'),
+    (60, '31-60 Hari'),
+    (61, '61-90 Hari'),
+    (90, '61-90 Hari'),
+    (91, '> 90 Hari'),
+])
+def test_batas_kelompok_umur(hari, kelompok):
+    umur = _pembantu([hari]).umur('Piutang', PER_TANGGAL)
+    assert umur.loc['Toko A'].to_dict() == {**dict.fromkeys(KELOMPOK_UMUR, 0), kelompok: 1000, 'Total': 1000}
+
+
+def test_umur_setelah_pembayaran_sebagian():
+    pembantu = _pembantu([-5, 0, 30, 31, 60, 61, 90, 91, 400]).dengan(bayar={2: 500, 9: 9000})
+    umur = pembantu.umur('Piutang', PER_TANGGAL)
+    # tagihan #9 lunas dan keluar; #2 tinggal 1500
+    assert umur.loc['Toko A'].tolist() == [1000, 1500 + 3000, 4000 + 5000, 6000 + 7000, 8000, 35500]
+    assert pembantu.total('Piutang') == 35500
+    assert pembantu.cari(9) is None
+    assert pembantu.umur('Utang', PER_TANGGAL).empty
+
+
+def test_pelunasan_sebagian_lalu_lunas(db):
+    bersama = BukuBersama(db)
+    awal = bersama.snapshot().buku.saldo
+    kas, piutang = awal.saldo('Kas'), awal.saldo('Piutang Usaha')
+    bersama.penjualan(date.today(), [
+        {'item': 'keripik kenikir', 'qty': 4, 'harga': 15000, 'metode_bayar': 'Kredit'},
+        {'item': 'keripik kenikir', 'qty': 1, 'harga': 15000, 'metode_bayar': 'Tunai'},
+    ], pihak='Toko B')
+    (tagihan,) = bersama.snapshot().pembantu.terbuka('Piutang', 'Toko B').to_dict('records')
+    assert (tagihan['jumlah'], tagihan['sisa']) == (60000, 60000)
+    assert tagihan['jatuh_tempo'] == date.today() + timedelta(days=30)
+
+    assert bersama.pelunasan(date.today(), tagihan['id'], 25000) == 35000
+    snapshot = bersama.snapshot()
+    assert snapshot.pembantu.terbuka('Piutang', 'Toko B')['sisa'].tolist() == [35000]
+    assert snapshot.buku.saldo.saldo('Piutang Usaha') - piutang == 35000
+    assert snapshot.buku.saldo.saldo('Kas') - kas == 15000 + 25000
+
+    with pytest.raises(ValueError):
+        bersama.pelunasan(date.today(), tagihan['id'], 35001)
+    assert bersama.pelunasan(date.today(), tagihan['id'], 35000) == 0
+    snapshot = bersama.snapshot()
+    assert snapshot.pembantu.cari(tagihan['id']) is None
+    assert snapshot.buku.saldo.saldo('Piutang Usaha') == piutang
+    with pytest.raises(ValueError):
+        bersama.pelunasan(date.today(), tagihan['id'], 1)
+    assert db.conn.execute("SELECT jumlah, dibayar FROM tagihan WHERE id = ?", [int(tagihan['id'])]).fetchone() == (60000, 60000)
+
+
+def test_tagihan_impor_satu_per_transaksi():
+    tagihan = tagihan_impor({
+        'transaksi_id': ['A1', 'A1', '', '', 'B2'],
+        'tanggal': pd.to_datetime(['2025-01-02', '2025-01-01', '2025-01-03', '2025-01-03', '2025-01-04']).to_numpy(),
+        'jenis': ['Penjualan', 'Penjualan', 'Pembelian', 'Pembelian', 'Penjualan'],
+        'metode_bayar': ['Kredit', 'Kredit', 'Kredit', 'Kredit', 'Tunai'],
+        'total': [1000, 2000, 300, 400, 5000],
+    })
+    assert tagihan[['jenis', 'referensi', 'jumlah']].values.tolist() == [
+        ['Piutang', 'A1', 3000], ['Utang', 'Impor', 300], ['Utang', 'Impor', 400]]
+    assert tagihan['tanggal'].tolist()[0] == date(2025, 1, 1)
+
+
+def test_impor_berpotongan_satu_tagihan_per_transaksi(db):
+    bersama = BukuBersama(db)
+    piutang = bersama.snapshot().buku.saldo.saldo('Piutang Usaha')
+    csv = pd.DataFrame([
+        {'tanggal': '2025-08-06', 'jenis': 'Penjualan', 'item': 'keripik kenikir', 'qty': 1,
+         'metode_bayar': 'Kredit', 'transaksi_id': f'K{i // 3}'}
+        for i in range(7)
+    ]).to_csv(index=False)
+    snapshot = bersama.snapshot()
+    impor(io.StringIO(csv), snapshot.harga_jual, {}, bersama.posting_kolom, ukuran_chunk=2, katalog=snapshot.katalog)
+
+    pembantu = bersama.snapshot().pembantu
+    assert pembantu.terbuka('Piutang')[['referensi', 'jumlah']].values.tolist() == [
+        ['K0', 45000], ['K1', 45000], ['K2', 15000]]
+    assert bersama.snapshot().buku.saldo.saldo('Piutang Usaha') - piutang == pembantu.total('Piutang') == 105000
+    assert db.conn.execute("SELECT COUNT(*) FROM jurnal WHERE keterangan LIKE 'Penjualan Kredit ID K%'").fetchone() == (6,)
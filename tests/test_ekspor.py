@@ -0,0 +1,163 @@
+import io
+import re
+import zipfile
+from datetime import date
+from xml.etree import ElementTree
+
+import pandas as pd
+
+import akuntansi
+import ekspor
+from buku_besar import BatchPosting
+from penyimpanan import KOLOM_JURNAL
+from periode import PeriodeBuku
+
+NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+
+
+def _tulis(fungsi):
+    # fungsi(keluar) -> (isi file, nilai kembali fungsi)
+    keluar = io.BytesIO()
+    hasil = fungsi(keluar)
+    return keluar.getvalue(), hasil
+
+
+# --- XLSX ---
+def _nilai(sel):
+    if sel.get('t') == 'inlineStr':
+        return ''.join(sel.itertext())
+    v = sel.find(NS + 'v')
+    if v is None:
+        return None
+    if sel.get('s') == '1':
+        return (pd.Timestamp('1899-12-30') + pd.Timedelta(days=int(v.text))).date()
+    return float(v.text)
+
+
+def _baca_xlsx(data):
+    # {nama lembar: [baris]}; sekaligus memeriksa relasi & content type setiap lembar
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        assert zf.testzip() is None
+        isi = set(zf.namelist())
+        jenis = zf.read('[Content_Types].xml').decode()
+        relasi = zf.read('xl/_rels/workbook.xml.rels').decode()
+        lembar = {}
+        for i, sheet in enumerate(ElementTree.fromstring(zf.read('xl/workbook.xml')).iter(NS + 'sheet'), start=1):
+            path = f'xl/worksheets/sheet{i}.xml'
+            assert path in isi and f'/{path}' in jenis and f'Target="worksheets/sheet{i}.xml"' in relasi
+            akar = ElementTree.fromstring(zf.read(path))
+            lembar[sheet.get('name')] = [[_nilai(sel) for sel in baris] for baris in akar.iter(NS + 'row')]
+    return lembar
+
+
+def test_xlsx_header_angka_tanggal_dan_teks():
+    df = pd.DataFrame({
+        'tanggal': [date(2025, 7, 28), None],
+        'keterangan': ['Kas & <Bank>', 'baris\x01dua'],
+        'debit': [150000, 0],
+    })
+    data, _ = _tulis(lambda f: ekspor.tulis_tabel([df, df.iloc[:1]], list(df.columns), 'xlsx', f))
+    assert _baca_xlsx(data) == {'Data': [
+        ['tanggal', 'keterangan', 'debit'],
+        [date(2025, 7, 28), 'Kas & <Bank>', 150000.0],
+        [None, 'barisdua', 0.0],
+        [date(2025, 7, 28), 'Kas & <Bank>', 150000.0],
+    ]}
+
+
+def test_xlsx_dilanjutkan_ke_lembar_berikutnya(monkeypatch):
+    monkeypatch.setattr(ekspor, 'BARIS_MAKS_XLSX', 4)
+    potongan = [pd.DataFrame({'no': range(i, i + 2)}) for i in range(0, 7, 2)]
+    data, _ = _tulis(lambda f: ekspor.tulis_xlsx([('Jurnal', ['no'], potongan)], f))
+    lembar = _baca_xlsx(data)
+    assert list(lembar) == ['Jurnal', 'Jurnal (2)', 'Jurnal (3)']
+    assert [b for isi in lembar.values() for b in isi if b != ['no']] == [[float(i)] for i in range(8)]
+    assert all(isi[0] == ['no'] and len(isi) <= 4 for isi in lembar.values())
+
+
+def test_xlsx_jurnal_dari_database(db):
+    data, _ = _tulis(lambda f: ekspor.tulis_tabel(db.potongan_jurnal(4), KOLOM_JURNAL, 'xlsx', f, 'Jurnal Umum'))
+    header, *baris = _baca_xlsx(data)['Jurnal Umum']
+    jurnal = db.muat_jurnal()
+    assert header == KOLOM_JURNAL
+    assert len(baris) == len(jurnal)
+    debit, kredit = KOLOM_JURNAL.index('debit'), KOLOM_JURNAL.index('kredit')
+    assert sum(b[debit] for b in baris) == sum(b[kredit] for b in baris) == jurnal['debit'].sum()
+
+
+def test_csv_bom_dan_header_tanpa_baris():
+    data, _ = _tulis(lambda f: ekspor.tulis_csv([], f, ['a', 'b']))
+    assert data == '﻿a,b\n'.encode('utf-8')
+
+
+# --- LAPORAN BULANAN ---
+def test_laporan_bulanan_sama_tutup_buku_atau_tidak(db):
+    batch = akuntansi.batch_pembelian(date(2025, 8, 3), pd.DataFrame([
+        {'item': 'Gula', 'qty': 2, 'satuan': 'kg', 'harga': 14000, 'metode_bayar': 'Kredit'}]), BatchPosting())
+    akuntansi.batch_penjualan('A1', date(2025, 9, 9), [{'item': 'keripik kenikir', 'qty': 2, 'harga': 15000, 'metode_bayar': 'Tunai'}], batch)
+    db.simpan(transaksi=batch.transaksi, jurnal=batch.jurnal)
+
+    laporan = pd.concat(ekspor.laporan_bulanan(PeriodeBuku.dari_db(db), db, sampai=date(2025, 10, 31)))
+    assert laporan.to_dict('records') == [
+        {'periode': '2025-07', 'pendapatan': 225000, 'beban': 0, 'laba': 225000,
+         'kas': -350000, 'piutang': 75000, 'bahan_baku': 500000, 'utang': 0},
+        {'periode': '2025-08', 'pendapatan': 0, 'beban': 0, 'laba': 0,
+         'kas': -350000, 'piutang': 75000, 'bahan_baku': 528000, 'utang': 28000},
+        {'periode': '2025-09', 'pendapatan': 30000, 'beban': 0, 'laba': 30000,
+         'kas': -320000, 'piutang': 75000, 'bahan_baku': 528000, 'utang': 28000},
+        {'periode': '2025-10', 'pendapatan': 0, 'beban': 0, 'laba': 0,
+         'kas': -320000, 'piutang': 75000, 'bahan_baku': 528000, 'utang': 28000},
+    ]
+    ditutup = PeriodeBuku.dari_db(db).tutup(db, '2025-09')
+    laporan_ditutup = pd.concat(ekspor.laporan_bulanan(ditutup, db, sampai=date(2025, 10, 31)))
+    pd.testing.assert_frame_equal(laporan_ditutup, laporan)
+    # mulai di tengah rentang: saldo awal dari neraca sebelum tanggal `dari`
+    sebagian = pd.concat(ekspor.laporan_bulanan(ditutup, db, date(2025, 9, 1), date(2025, 9, 30)))
+    assert sebagian.to_dict('records') == laporan.iloc[[2]].to_dict('records')
+
+
+# --- PDF ---
+def _periksa_pdf(data):
+    # Offset di tabel xref harus menunjuk ke objeknya; mengembalikan jumlah halaman
+    assert data.startswith(b'%PDF-1.4\n') and data.endswith(b'%%EOF\n')
+    xref = int(re.search(rb'startxref\n(\d+)\n', data).group(1))
+    assert data[xref:].startswith(b'xref\n0 ')
+    jumlah = int(re.match(rb'xref\n0 (\d+)\n', data[xref:]).group(1))
+    offset = re.findall(rb'(\d{10}) 00000 n \n', data[xref:])
+    assert len(offset) == jumlah - 1
+    for nomor, posisi in enumerate(offset, start=1):
+        assert data[int(posisi):].startswith(b'%d 0 obj\n' % nomor)
+    for panjang, stream in re.findall(rb'<< /Length (\d+) >>\nstream\n(.*?)\nendstream', data, re.S):
+        assert int(panjang) == len(stream)
+    halaman = len(re.findall(rb'/Type /Page /Parent', data))
+    assert int(re.search(rb'/Type /Pages /Kids \[[^\]]*\] /Count (\d+)', data).group(1)) == halaman
+    return halaman
+
+
+def _transaksi(transaksi_id, jumlah_baris):
+    return pd.DataFrame({
+        'transaksi_id': transaksi_id, 'tanggal': date(2025, 7, 28), 'item': 'keripik kenikir (pedas)',
+        'qty': 1, 'harga': 15000, 'total': 15000, 'metode_bayar': 'Tunai'}, index=range(jumlah_baris))
+
+
+def test_invoice_terpotong_tetap_satu_halaman():
+    # A1 terbelah di batas dua potongan, baris tanpa transaksi_id dilewati
+    potongan = [_transaksi('A1', 2), pd.concat([_transaksi('A1', 1), _transaksi('', 1), _transaksi('B2', 1)])]
+    data, jumlah = _tulis(lambda f: ekspor.tulis_invoice_pdf(potongan, f))
+    assert jumlah == 2
+    assert _periksa_pdf(data) == 2
+    assert data.count(b'A1') == 1 and data.count(b'B2') == 1
+    assert b'keripik kenikir \\(pedas\\)' in data
+
+
+def test_invoice_panjang_berlanjut_ke_halaman_berikutnya():
+    data, jumlah = _tulis(lambda f: ekspor.tulis_invoice_pdf([_transaksi('A1', ekspor.PDFTeks.BARIS_PER_HALAMAN + 5)], f))
+    assert jumlah == 1
+    assert _periksa_pdf(data) == 2
+
+
+def test_invoice_tanpa_data():
+    data, jumlah = _tulis(lambda f: ekspor.tulis_invoice_pdf([], f))
+    assert jumlah == 0
+    assert _periksa_pdf(data) == 1
+    assert b'\\(tidak ada data\\)' in data
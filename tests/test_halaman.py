@@ -0,0 +1,62 @@
+from datetime import date
+
+import pytest
+
+from penyimpanan import Penyimpanan
+
+
+@pytest.fixture
+def buku(tmp_path):
+    # 30 hari Juli 2025: penjualan tunai setiap hari, pembelian kredit setiap hari ke-5
+    db = Penyimpanan(str(tmp_path / 'halaman.db'))
+    transaksi, jurnal = [], []
+    for hari in range(1, 31):
+        tanggal = date(2025, 7, hari)
+        transaksi.append({'transaksi_id': f'J{hari:02d}', 'tanggal': tanggal, 'jenis': 'Penjualan', 'metode_bayar': 'Tunai',
+                          'item': 'keripik kenikir', 'qty': 2, 'harga': 15000, 'total': 30000, 'catatan': ''})
+        jurnal += [
+            {'tanggal': tanggal, 'keterangan': f'Penjualan J{hari:02d}', 'debit': 30000, 'kredit': 0, 'akun': 'Kas', 'kredit_akun': ''},
+            {'tanggal': tanggal, 'keterangan': f'Penjualan J{hari:02d}', 'debit': 0, 'kredit': 30000, 'akun': '', 'kredit_akun': 'Penjualan'},
+        ]
+        if hari % 5 == 0:
+            transaksi.append({'transaksi_id': '', 'tanggal': tanggal, 'jenis': 'Pembelian', 'metode_bayar': 'Kredit',
+                              'item': 'Gula', 'qty': 1, 'harga': 14000, 'total': 14000, 'catatan': '50% diskon_toko'})
+            jurnal += [
+                {'tanggal': tanggal, 'keterangan': 'Pembelian Gula', 'debit': 14000, 'kredit': 0, 'akun': 'Bahan Baku', 'kredit_akun': ''},
+                {'tanggal': tanggal, 'keterangan': 'Pembelian Gula', 'debit': 0, 'kredit': 14000, 'akun': '', 'kredit_akun': 'Utang Usaha'},
+            ]
+    db.simpan(transaksi=transaksi, jurnal=jurnal)
+    return db
+
+
+def test_halaman_jurnal_berurutan_tanpa_celah(buku):
+    total = buku.hitung_jurnal()
+    assert total == {'jumlah_baris': 72, 'total_debit': 984000, 'total_kredit': 984000}
+    halaman = [buku.halaman_jurnal(25, offset) for offset in (0, 25, 50, 75)]
+    assert [len(h) for h in halaman] == [25, 25, 22, 0]
+    assert halaman[0]['keterangan'].iloc[0] == 'Penjualan J01'
+    assert halaman[2]['keterangan'].iloc[-1] == 'Pembelian Gula'
+    assert halaman[1]['tanggal'].iloc[0] == date(2025, 7, 11)
+
+
+def test_filter_jurnal_tanggal_akun_dan_kata(buku):
+    # rentang tanggal inklusif di kedua sisi
+    assert buku.hitung_jurnal(dari=date(2025, 7, 5), sampai=date(2025, 7, 10))['jumlah_baris'] == 6 * 2 + 2 * 2
+    # akun dicocokkan di sisi debit maupun kredit
+    assert buku.hitung_jurnal(akun='Utang Usaha') == {'jumlah_baris': 6, 'total_debit': 0, 'total_kredit': 84000}
+    assert buku.hitung_jurnal(akun='Kas', kata='J1')['jumlah_baris'] == 10
+    hasil = buku.halaman_jurnal(5, 0, akun='Kas', kata='j2')
+    assert hasil['keterangan'].tolist() == [f'Penjualan J2{i}' for i in range(5)]
+
+
+def test_filter_transaksi_dan_wildcard_like_diloloskan(buku):
+    assert buku.hitung_transaksi(jenis='Pembelian') == {'jumlah_baris': 6, 'total_qty': 6, 'total': 84000}
+    assert buku.hitung_transaksi(jenis='Penjualan', sampai=date(2025, 7, 3))['total'] == 90000
+    assert buku.hitung_transaksi(item='Gula', dari=date(2025, 7, 25))['jumlah_baris'] == 2
+    # % dan _ di kata dicari apa adanya, bukan sebagai wildcard LIKE
+    assert buku.hitung_transaksi(kata='50%')['jumlah_baris'] == 6
+    assert buku.hitung_transaksi(kata='J_1')['jumlah_baris'] == 0
+    assert buku.hitung_transaksi(kata='%')['jumlah_baris'] == 6
+    halaman = buku.halaman_transaksi(3, 1, jenis='Penjualan', kata='J0')
+    assert halaman['transaksi_id'].tolist() == ['J02', 'J03', 'J04']
+    assert halaman['tanggal'].iloc[0] == date(2025, 7, 2)
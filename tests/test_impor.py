@@ -0,0 +1,92 @@
+import io
+import warnings
+
+import pandas as pd
+
+from impor import impor, siapkan_chunk
+
+HARGA_JUAL = {'kue bawang rasa original': 15000, 'keripik kenikir': 15000}
+SATUAN_BAHAN = {'Tepung Terigu': 'kg', 'Gula': 'kg'}
+
+
+def _csv(baris):
+    return io.StringIO(pd.DataFrame(baris).to_csv(index=False))
+
+
+def _impor(baris, ukuran_chunk):
+    ditulis = []
+    ringkasan = impor(_csv(baris), HARGA_JUAL, SATUAN_BAHAN, lambda t, j: ditulis.append((t, j)), ukuran_chunk)
+    return ringkasan, ditulis
+
+
+def test_jurnal_penjualan_satu_pasang_per_transaksi():
+    transaksi, jurnal, ditolak, _ = siapkan_chunk(pd.DataFrame([
+        {'tanggal': '2025-01-06', 'jenis': 'Penjualan', 'item': 'keripik kenikir', 'qty': 2, 'transaksi_id': 'A1'},
+        {'tanggal': '2025-01-06', 'jenis': 'Penjualan', 'item': 'kue bawang rasa original', 'qty': 1, 'transaksi_id': 'A1'},
+        {'tanggal': '2025-01-07', 'jenis': 'Pembelian', 'item': 'Gula', 'qty': 5, 'harga': 14000, 'metode_bayar': 'Kredit'},
+    ]), HARGA_JUAL, SATUAN_BAHAN)
+    assert len(ditolak) == 0
+    assert transaksi['total'].tolist() == [30000, 15000, 70000]
+    assert jurnal['keterangan'].tolist() == ['Penjualan Tunai ID A1'] * 2 + ['Pembelian Kredit 5 kg Gula'] * 2
+    assert jurnal['debit'].tolist() == [45000, 0, 70000, 0]
+    assert jurnal['kredit'].tolist() == [0, 45000, 0, 70000]
+    assert jurnal['kredit_akun'].tolist() == ['', 'Penjualan', '', 'Utang Usaha']
+
+
+def test_baris_tidak_valid_ditolak_dengan_alasan():
+    ringkasan, ditulis = _impor([
+        {'tanggal': 'bukan tanggal', 'jenis': 'Penjualan', 'item': 'keripik kenikir', 'qty': 1},
+        {'tanggal': '2025-01-06', 'jenis': 'Penjualan', 'item': 'produk lain', 'qty': 1},
+        {'tanggal': '2025-01-06', 'jenis': 'Pembelian', 'item': 'Gula', 'qty': 0, 'harga': 14000},
+        {'tanggal': '2025-01-06', 'jenis': 'Penjualan', 'item': 'keripik kenikir', 'qty': 1},
+    ], ukuran_chunk=2)
+    assert (ringkasan.jumlah_baris, ringkasan.jumlah_valid, ringkasan.jumlah_ditolak) == (4, 1, 3)
+    assert ringkasan.alasan_ditolak == {
+        'tanggal tidak valid': 1, 'produk tidak ada di daftar harga jual': 1, 'qty harus lebih dari 0': 1}
+    assert len(ditulis) == 1
+
+
+def test_tanggal_iso_dan_campuran_tanpa_peringatan():
+    baris = [
+        {'tanggal': t, 'jenis': 'Penjualan', 'item': 'keripik kenikir', 'qty': 1}
+        for t in ['2025-01-06', '2025-01-06 13:45:00', '07/01/2025', '8 Jan 2025', '2025-13-01', '31/02/2025', '']
+    ]
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        ringkasan, ditulis = _impor(baris, ukuran_chunk=10)
+    assert ringkasan.alasan_ditolak == {'tanggal tidak valid': 3}
+    tanggal = [str(t)[:10] for t in ditulis[0][0]['tanggal']]
+    assert tanggal == ['2025-01-06', '2025-01-06', '2025-01-07', '2025-01-08']
+
+
+def test_transaksi_terbelah_di_batas_potongan_tetap_satu_jurnal():
+    baris = [
+        {'tanggal': '2025-01-06', 'jenis': 'Penjualan', 'item': 'keripik kenikir', 'qty': 1,
+         'metode_bayar': 'Kredit', 'transaksi_id': f'T{i // 3}'}
+        for i in range(9)
+    ]
+    ringkasan, ditulis = _impor(baris, ukuran_chunk=2)
+    assert (ringkasan.jumlah_baris, ringkasan.jumlah_valid, ringkasan.jumlah_jurnal) == (9, 9, 6)
+    for transaksi, jurnal in ditulis:
+        # setiap transaksi_id hanya muncul di satu potongan
+        assert len(set(transaksi['transaksi_id'])) * 3 == len(transaksi['transaksi_id'])
+    debit = [d for _, jurnal in ditulis for d in jurnal['debit'] if d]
+    assert debit == [45000, 45000, 45000]
+
+
+def test_potongan_sama_dengan_impor_sekaligus():
+    baris = [
+        {'tanggal': f'2025-01-{1 + i % 28:02d}', 'jenis': 'Penjualan' if i % 4 else 'Pembelian',
+         'item': 'keripik kenikir' if i % 4 else 'Gula', 'qty': 1 + i % 3, 'harga': 15000 if i % 4 else 14000}
+        for i in range(101)
+    ]
+    total = {}
+    for ukuran in (7, 1000):
+        ringkasan, ditulis = _impor(baris, ukuran)
+        total[ukuran] = (
+            ringkasan.jumlah_valid, ringkasan.jumlah_jurnal,
+            sum(int(j['debit'].sum()) for _, j in ditulis), sum(int(j['kredit'].sum()) for _, j in ditulis),
+            ringkasan.qty_penjualan.to_dict(), ringkasan.qty_pembelian.to_dict(),
+        )
+    assert total[7] == total[1000]
+    assert total[7][2] == total[7][3]
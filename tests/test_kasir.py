@@ -0,0 +1,199 @@
+import io
+import json
+import sqlite3
+import threading
+import time
+from datetime import date
+
+import pandas as pd
+import pytest
+
+import buku_bersama
+import kasir
+from buku_bersama import PERCOBAAN_TULIS, BukuBersama
+from katalog import Katalog
+from penyimpanan import DataBerubah, Penyimpanan
+
+KATALOG = Katalog(
+    pd.DataFrame([
+        {'item': 'Jus Jambu', 'kode': 'JJ-01', 'barcode': '8991234567890', 'harga': 10000},
+        {'item': 'Keripik', 'kode': '', 'barcode': '', 'harga': 15000},
+    ]),
+    pd.DataFrame([
+        {'item': 'Jus Jambu', 'berlaku': '2025-01-01', 'harga': 8000},
+        {'item': 'Jus Jambu', 'berlaku': '2025-06-01', 'harga': 10000},
+    ]),
+)
+SATUAN_BAHAN = {'Gula': 'kg'}
+
+
+# --- VALIDASI PESANAN ---
+def test_penjualan_dengan_kode_dan_harga_pada_tanggal():
+    jenis, tanggal, isi, pihak, total = kasir.siapkan_pesanan({
+        'tanggal': '2025-05-31', 'metode_bayar': 'kredit', 'pihak': ' Toko A ',
+        'items': [{'kode': '8991234567890', 'qty': 2}, {'item': 'Keripik', 'qty': '1', 'harga': 0, 'metode_bayar': 'Tunai'}],
+    }, KATALOG, SATUAN_BAHAN)
+    assert (jenis, tanggal, pihak, total) == ('Penjualan', date(2025, 5, 31), 'Toko A', 16000)
+    assert isi == [
+        {'item': 'Jus Jambu', 'qty': 2, 'harga': 8000, 'metode_bayar': 'Kredit'},
+        {'item': 'Keripik', 'qty': 1, 'harga': 0, 'metode_bayar': 'Tunai'},
+    ]
+
+
+def test_pembelian_memakai_satuan_inventaris():
+    jenis, _, isi, pihak, total = kasir.siapkan_pesanan({
+        'jenis': 'pembelian', 'items': [{'item': 'Gula', 'qty': 2.5, 'harga': 14000}, {'item': 'Vanili', 'qty': 1, 'satuan': 'botol', 'harga': 5000}],
+    }, KATALOG, SATUAN_BAHAN)
+    assert (jenis, pihak, total) == ('Pembelian', 'Umum', 40000)
+    assert isi.to_dict('records') == [
+        {'item': 'Gula', 'qty': 2.5, 'satuan': 'kg', 'harga': 14000, 'metode_bayar': 'Tunai'},
+        {'item': 'Vanili', 'qty': 1, 'satuan': 'botol', 'harga': 5000, 'metode_bayar': 'Tunai'},
+    ]
+
+
+@pytest.mark.parametrize('pesanan, pesan', [
+    ([], 'objek JSON'),
+    ({'jenis': 'Retur', 'items': [{'item': 'Keripik', 'qty': 1}]}, 'jenis'),
+    ({'items': []}, 'items'),
+    ({'items': ['Keripik']}, 'items'),
+    ({'tanggal': '31-31-2025', 'items': [{'item': 'Keripik', 'qty': 1}]}, 'tanggal tidak valid'),
+    ({'items': [{'item': 'Es Jambu', 'qty': 1}]}, 'produk tidak ada'),
+    ({'items': [{'item': 'Keripik', 'qty': 0}]}, 'qty harus lebih dari 0'),
+    ({'items': [{'item': 'Keripik', 'qty': 'dua'}]}, 'qty tidak valid'),
+    ({'items': [{'item': 'Keripik', 'qty': 1, 'harga': -1}]}, 'harga tidak valid'),
+    ({'items': [{'item': 'Keripik', 'qty': 1, 'metode_bayar': 'QRIS'}]}, 'metode_bayar'),
+    ({'jenis': 'Pembelian', 'items': [{'item': 'Vanili', 'qty': 1, 'harga': 5000}]}, 'wajib punya satuan'),
+    ({'jenis': 'Pembelian', 'items': [{'item': 'Gula', 'qty': 1}]}, 'harga tidak valid'),
+])
+def test_pesanan_tidak_valid_ditolak(pesanan, pesan):
+    with pytest.raises(ValueError, match=pesan):
+        kasir.siapkan_pesanan(pesanan, KATALOG, SATUAN_BAHAN)
+
+
+# --- CLI JSON LINES ---
+def _cli(db, monkeypatch, capsys, baris):
+    monkeypatch.setattr('sys.stdin', io.StringIO(''.join(b + '\n' for b in baris)))
+    kode = kasir.main(['--db', db.path, '--batch', '2'])
+    return kode, [json.loads(b) for b in capsys.readouterr().out.splitlines()]
+
+
+def test_satu_baris_keluaran_per_baris_masukan(db, monkeypatch, capsys):
+    kode, keluaran = _cli(db, monkeypatch, capsys, [
+        json.dumps({'items': [{'item': 'keripik kenikir', 'qty': 2}]}),
+        '',
+        '{bukan json',
+        json.dumps({'jenis': 'Pembelian', 'pihak': 'Toko A', 'items': [{'item': 'Gula', 'qty': 5, 'harga': 14000, 'metode_bayar': 'Kredit'}]}),
+        json.dumps({'items': [{'item': 'Es Jambu', 'qty': 1}]}),
+    ])
+    assert kode == 1
+    assert [k['baris'] for k in keluaran] == [1, 3, 4, 5]
+    assert keluaran[0]['jenis'] == 'Penjualan' and keluaran[0]['total'] == 30000 and keluaran[0]['transaksi_id']
+    assert keluaran[1]['error'].startswith('JSON tidak valid')
+    assert keluaran[2] == {'baris': 4, 'jenis': 'Pembelian', 'transaksi_id': None, 'total': 70000}
+    assert keluaran[3] == {'baris': 5, 'error': 'produk tidak ada di daftar harga jual: Es Jambu'}
+    ulang = Penyimpanan(db.path)
+    assert ulang.conn.execute("SELECT SUM(total) FROM transaksi WHERE tanggal = ?", [date.today().isoformat()]).fetchone() == (100000,)
+    assert ulang.conn.execute("SELECT jenis, pihak, jumlah FROM tagihan").fetchall() == [('Utang', 'Toko A', 70000)]
+
+
+def test_input_kosong_bukan_kegagalan(db, monkeypatch, capsys):
+    assert _cli(db, monkeypatch, capsys, []) == (0, [])
+    kode, keluaran = _cli(db, monkeypatch, capsys, [json.dumps({'items': [{'item': 'keripik kenikir', 'qty': 1}]})])
+    assert kode == 0 and 'error' not in keluaran[0]
+
+
+def test_batch_pesanan_satu_posting_urut(db):
+    bersama = BukuBersama(db)
+    hasil = kasir.posting(bersama, [
+        {'items': [{'item': 'keripik kenikir', 'qty': 2}]},
+        {'jenis': 'Pembelian', 'items': [{'item': 'Gula', 'qty': 2, 'harga': 14000}]},
+        {'items': [{'item': 'Es Jambu', 'qty': 1}]},
+        {'items': [{'item': 'keripik kenikir', 'qty': 2}]},
+    ])
+    assert [h.get('jenis') for h in hasil] == ['Penjualan', 'Pembelian', None, 'Penjualan']
+    assert hasil[0]['transaksi_id'] != hasil[3]['transaksi_id']
+    gula = bersama.snapshot().inventaris.set_index('item').at['Gula', 'qty']
+    assert gula == pytest.approx(20 - 0.1 + 2 - 0.1)
+
+
+# --- PENULISAN BERSAMA PROSES LAIN ---
+def _tolak_simpan(db, kali):
+    # Penyimpanan.simpan() yang pura-pura didahului proses lain `kali` kali berturut-turut
+    asli, dicoba = db.simpan, []
+
+    def simpan(**data):
+        if data.get('versi') is not None:
+            dicoba.append(1)
+            if len(dicoba) <= kali:
+                raise DataBerubah("database sudah diubah proses lain")
+        return asli(**data)
+    db.simpan = simpan
+    return dicoba
+
+
+def test_didahului_proses_lain_diulang_dengan_data_baru(db):
+    bersama = BukuBersama(db)
+    jumlah = db.conn.execute("SELECT COUNT(*) FROM transaksi").fetchone()[0]
+    dicoba = _tolak_simpan(db, 1)
+    bersama.penjualan(date.today(), [{'item': 'keripik kenikir', 'qty': 1, 'harga': 15000, 'metode_bayar': 'Tunai'}])
+    assert len(dicoba) == 2
+    assert db.conn.execute("SELECT COUNT(*) FROM transaksi").fetchone()[0] == jumlah + 1
+
+
+def test_batas_percobaan_dilaporkan_sebagai_error_database(db, monkeypatch, capsys):
+    bersama = BukuBersama(db)
+    jumlah = db.conn.execute("SELECT COUNT(*) FROM transaksi").fetchone()[0]
+    dicoba = _tolak_simpan(db, PERCOBAAN_TULIS)
+    with pytest.raises(sqlite3.Error):
+        kasir.posting(bersama, [{'items': [{'item': 'keripik kenikir', 'qty': 1}]}])
+    assert len(dicoba) == PERCOBAAN_TULIS
+    assert db.conn.execute("SELECT COUNT(*) FROM transaksi").fetchone()[0] == jumlah
+    # penulis tetap hidup
+    kasir.posting(bersama, [{'items': [{'item': 'keripik kenikir', 'qty': 1}]}])
+    assert db.conn.execute("SELECT COUNT(*) FROM transaksi").fetchone()[0] == jumlah + 1
+
+    # CLI: setiap pesanan batch itu mendapat error, proses tidak berhenti
+    monkeypatch.setattr(Penyimpanan, 'simpan', _selalu_ditolak(Penyimpanan.simpan))
+    monkeypatch.setattr('sys.stdin', io.StringIO(json.dumps({'items': [{'item': 'keripik kenikir', 'qty': 1}]}) + '\n' + '{}\n'))
+    assert kasir.main(['--db', db.path]) == 1
+    keluaran = [json.loads(b) for b in capsys.readouterr().out.splitlines()]
+    assert keluaran[0]['error'].startswith('data gagal disimpan') and keluaran[1]['baris'] == 2
+
+
+def _selalu_ditolak(simpan):
+    def tolak(self, **data):
+        if data.get('versi') is not None:
+            raise DataBerubah("database sudah diubah proses lain")
+        return simpan(self, **data)
+    return tolak
+
+
+def test_snapshot_tidak_menunggu_lock_penulis(db, monkeypatch):
+    monkeypatch.setattr(buku_bersama, 'INTERVAL_CEK_VERSI_S', 0.05)
+    bersama = BukuBersama(db)
+    sebelum = bersama.snapshot()
+
+    # proses lain (koneksi lain) menulis; penulis memuat ulang sendiri saat antrean kosong
+    lain = Penyimpanan(db.path)
+    lain.simpan(stok=pd.DataFrame([{'item': 'Gula', 'qty': 5.0, 'satuan': 'kg', 'min_stok': 5, 'status': 'Cukup'}]))
+    for _ in range(100):
+        if bersama.snapshot() is not sebelum:
+            break
+        time.sleep(0.05)
+    assert bersama.snapshot().inventaris.set_index('item').at['Gula', 'qty'] == 25
+
+    # pembaca tetap mendapat snapshot selagi lock database dipegang thread lain
+    dipegang, selesai = threading.Event(), threading.Event()
+
+    def pegang():
+        with db.lock:
+            dipegang.set()
+            selesai.wait(5)
+    threading.Thread(target=pegang).start()
+    dipegang.wait()
+    try:
+        mulai = time.perf_counter()
+        bersama.snapshot()
+        assert time.perf_counter() - mulai < 0.5
+    finally:
+        selesai.set()
@@ -0,0 +1,94 @@
+from datetime import date, datetime
+
+import pandas as pd
+import pytest
+
+import katalog
+from katalog import Katalog
+
+RASA = ['jagung', 'keju', 'pedas', 'balado', 'original', 'rumput laut', 'sapi panggang']
+JUMLAH_SKU = 20_000
+
+
+def _nama(i):
+    return f'keripik {i:05d} rasa {RASA[i % len(RASA)]}'
+
+
+@pytest.fixture(scope='module')
+def besar():
+    n = JUMLAH_SKU
+    produk = pd.DataFrame({
+        'item': [_nama(i) for i in range(n)],
+        'kode': [f'SKU{i:05d}' for i in range(n)],
+        'barcode': [f'899{i:010d}' for i in range(n)],
+        'harga': [1000 + i for i in range(n)],
+    })
+    return Katalog(produk.iloc[::-1])
+
+
+def test_kode_dan_awalan(besar):
+    assert besar.cari('sku00042', batas=1) == [_nama(42)]
+    assert besar.cari('8990000000042')[0] == _nama(42)
+    assert besar.cari('KERIPIK 0004', batas=5) == [_nama(40 + i) for i in range(5)]
+    # awalan kode ikut setelah awalan nama
+    assert besar.cari('sku1999', batas=3) == [_nama(19990), _nama(19991), _nama(19992)]
+
+
+def test_tengah_nama_lewat_indeks_kata(besar, monkeypatch):
+    dibaca = []
+    asli = katalog._kunci
+    monkeypatch.setattr(katalog, '_kunci', lambda teks: dibaca.append(teks) or asli(teks))
+    # di tengah kata & melintasi batas kata (batas = jumlah yang cocok, jadi tanpa fuzzy)
+    assert besar.cari('01234 rasa', batas=1) == [_nama(1234)]
+    assert besar.cari('1234 ras', batas=2) == [_nama(1234), _nama(11234)]
+    assert besar.cari('put la', batas=3) == [_nama(5), _nama(12), _nama(19)]
+    # hanya kandidat dari indeks yang dibaca, bukan seluruh katalog
+    assert len(dibaca) < 100
+
+
+def test_fuzzy_salah_ketik(besar):
+    assert besar.cari('keripik 01235 rasa baldo')[0] == _nama(1235)
+    assert set(besar.cari('sapi pangang', batas=3)) <= {_nama(i) for i in range(6, JUMLAH_SKU, 7)}
+    assert besar.cari('zzzz') == []
+
+
+def test_tanpa_teks_semua_produk_urutan_katalog():
+    kecil = Katalog(pd.DataFrame({'item': ['b', 'a'], 'kode': ['', ''], 'barcode': ['', ''], 'harga': [1, 2]}))
+    assert kecil.cari('') == kecil.cari(None) == ['b', 'a']
+    assert kecil.saring('  ')['item'].tolist() == ['b', 'a']
+
+
+# --- HARGA PER TANGGAL ---
+RIWAYAT = Katalog(
+    pd.DataFrame([
+        {'item': 'Jus Jambu', 'kode': '', 'barcode': '', 'harga': 12000},
+        {'item': 'Keripik', 'kode': '', 'barcode': '', 'harga': 15000},
+    ]),
+    pd.DataFrame([
+        {'item': 'Jus Jambu', 'berlaku': '2025-06-01', 'harga': 10000},
+        {'item': 'Jus Jambu', 'berlaku': '2025-01-01', 'harga': 8000},
+        {'item': 'Jus Jambu', 'berlaku': '2026-01-01', 'harga': 12000},
+    ]),
+)
+
+
+@pytest.mark.parametrize('tanggal, harga', [
+    (date(2024, 12, 31), 8000),  # sebelum riwayat pertama: harga pertama
+    (date(2025, 1, 1), 8000),
+    (date(2025, 5, 31), 8000),
+    (date(2025, 6, 1), 10000),  # berlaku mulai tanggalnya
+    (datetime(2025, 12, 31, 23, 59), 10000),
+    ('2026-01-01', 12000),
+    (date(2030, 1, 1), 12000),
+])
+def test_harga_pada_batas_tanggal(tanggal, harga):
+    assert RIWAYAT.harga_pada('Jus Jambu', tanggal) == harga
+    assert RIWAYAT.harga_pada_kolom(['Jus Jambu'], [tanggal]).tolist() == [harga]
+
+
+def test_harga_tanpa_riwayat():
+    assert RIWAYAT.harga_pada('Keripik', date(2020, 1, 1)) == 15000
+    assert RIWAYAT.harga_pada('Es Jambu', date(2025, 1, 1)) is None
+    harga = RIWAYAT.harga_pada_kolom(['Keripik', 'Es Jambu', 'Jus Jambu'], [date(2025, 1, 1), date(2025, 1, 1), None])
+    assert harga.iloc[0] == 15000 and harga.iloc[1:].isna().tolist() == [True, False]
+    assert harga.iloc[2] == 12000
@@ -0,0 +1,70 @@
+import threading
+
+import pytest
+
+from laporan_latar import LaporanGagal, PoolLaporan
+
+
+class Laporan:
+    # Fungsi laporan yang mencatat berapa kali dihitung; bisa ditahan atau dibuat gagal
+    def __init__(self, gagal=False):
+        self.dihitung = 0
+        self.gagal = gagal
+        self.lanjut = threading.Event()
+        self.lanjut.set()
+
+    def __call__(self, nilai):
+        self.dihitung += 1
+        self.lanjut.wait(5)
+        if self.gagal:
+            raise ZeroDivisionError('division by zero')
+        return nilai * 2
+
+
+def test_hasil_disimpan_per_versi():
+    pool, laporan = PoolLaporan(), Laporan()
+    assert pool.minta('lr', (), ('b', 1), laporan, 21, tunggu=5) == (42, None)
+    assert pool.minta('lr', (), ('b', 1), laporan, 99, tunggu=5) == (42, None)
+    assert laporan.dihitung == 1
+    assert pool.minta('lr', (), ('b', 2), laporan, 5, tunggu=5) == (10, None)
+    assert laporan.dihitung == 2
+
+
+def test_versi_baru_belum_selesai_memakai_hasil_terakhir():
+    pool, laporan = PoolLaporan(), Laporan()
+    pool.minta('lr', (), ('b', 1), laporan, 1, tunggu=5)
+    laporan.lanjut.clear()
+    hasil, future = pool.minta('lr', (), ('b', 2), laporan, 2, tunggu=0)
+    assert hasil == 2 and future is not None
+    laporan.lanjut.set()
+    future.result(5)
+    assert pool.minta('lr', (), ('b', 2), laporan, 2) == (4, None)
+
+
+def test_gagal_dilaporkan_tanpa_dihitung_ulang():
+    pool, laporan = PoolLaporan(), Laporan(gagal=True)
+    with pytest.raises(LaporanGagal, match='division by zero') as e:
+        pool.minta('lr', (), ('b', 1), laporan, 1, tunggu=5)
+    assert isinstance(e.value.__cause__, ZeroDivisionError)
+    with pytest.raises(LaporanGagal):
+        pool.minta('lr', (), ('b', 1), laporan, 1, tunggu=5)
+    assert laporan.dihitung == 1
+    # setelah posting baru (versi berubah) dihitung lagi
+    laporan.gagal = False
+    assert pool.minta('lr', (), ('b', 2), laporan, 1, tunggu=5) == (2, None)
+    assert laporan.dihitung == 2
+
+
+def test_gagal_di_latar_belakang_tidak_dikirim_ulang():
+    pool, laporan = PoolLaporan(), Laporan(gagal=True)
+    laporan.lanjut.clear()
+    hasil, future = pool.minta('lr', (), ('b', 1), laporan, 1, tunggu=0)
+    assert hasil is None
+    laporan.lanjut.set()
+    with pytest.raises(ZeroDivisionError):
+        future.result(5)
+    # rerun setelah future selesai: error yang sama, tanpa future baru
+    for _ in range(3):
+        with pytest.raises(LaporanGagal):
+            pool.minta('lr', (), ('b', 1), laporan, 1, tunggu=0)
+    assert laporan.dihitung == 1
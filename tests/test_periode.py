@@ -0,0 +1,105 @@
+import io
+from datetime import date, timedelta
+
+import pandas as pd
+import pytest
+
+import akuntansi
+from buku_bersama import BukuBersama
+from buku_besar import BatchPosting
+from impor import impor
+from periode import PeriodeBuku
+
+
+def _jual(db, tanggal, qty, metode='Tunai'):
+    batch = akuntansi.batch_penjualan(f'ID-{tanggal}-{metode}', tanggal, [
+        {'item': 'keripik kenikir', 'qty': qty, 'harga': 15000, 'metode_bayar': metode}])
+    db.simpan(transaksi=batch.transaksi, jurnal=batch.jurnal)
+
+
+def _beli(db, tanggal, total):
+    batch = akuntansi.batch_pembelian(tanggal, pd.DataFrame([
+        {'item': 'Gula', 'qty': 1, 'satuan': 'kg', 'harga': total, 'metode_bayar': 'Kredit'}]), BatchPosting())
+    db.simpan(transaksi=batch.transaksi, jurnal=batch.jurnal)
+
+
+@pytest.fixture
+def periode(db):
+    # Data awal Juli 2025 + Agustus s.d. Oktober 2025; Juli-September ditutup
+    _jual(db, date(2025, 8, 1), 2)
+    _jual(db, date(2025, 8, 31), 1, 'Kredit')
+    _beli(db, date(2025, 9, 15), 40000)
+    _jual(db, date(2025, 10, 1), 4)
+    return PeriodeBuku.dari_db(db).tutup(db, '2025-09')
+
+
+def _sama_dengan_jurnal(periode, db, dari, sampai):
+    saldo, total = periode.mutasi(db, dari, sampai)
+    debit, kredit, total_db = db.mutasi(dari, sampai)
+    assert {k: v for k, v in total.items() if v} == {k: v for k, v in total_db.items() if v}
+    assert {k: v for k, v in saldo.debit.items() if v} == {k: v for k, v in debit.items() if k and v}
+    assert {k: v for k, v in saldo.kredit.items() if v} == {k: v for k, v in kredit.items() if k and v}
+    return saldo, total
+
+
+def test_tutup_berurutan_dari_bulan_pertama(periode):
+    assert periode.periode == ['2025-07', '2025-08', '2025-09']
+    assert periode.ditutup_sampai == '2025-09'
+
+
+@pytest.mark.parametrize('dari, sampai', [
+    (None, None),
+    (date(2025, 7, 1), date(2025, 9, 30)),   # bulan tertutup penuh
+    (date(2025, 7, 29), date(2025, 8, 1)),   # potongan dua bulan tertutup
+    (date(2025, 8, 1), date(2025, 8, 31)),   # batas tepat satu bulan
+    (date(2025, 8, 2), date(2025, 8, 30)),   # di dalam satu bulan tertutup
+    (date(2025, 8, 15), date(2025, 10, 31)), # tertutup + bulan berjalan
+    (date(2025, 10, 1), None),               # hanya bulan berjalan
+    (None, date(2025, 8, 31)),
+])
+def test_mutasi_sama_dengan_jurnal(periode, db, dari, sampai):
+    _sama_dengan_jurnal(periode, db, dari, sampai)
+
+
+def test_laba_rugi_dan_neraca_lintas_bulan(periode, db):
+    assert akuntansi.laba_rugi_periode(periode, db, date(2025, 8, 1), date(2025, 10, 31)) == {
+        'pendapatan': 105000, 'beban': 0, 'laba': 105000}
+    neraca = akuntansi.neraca_saldo_periode(periode, db, date(2025, 9, 30))
+    # data awal: kas 150.000 - 500.000, piutang 75.000, bahan baku 500.000
+    assert neraca['kas'] == -350000 + 30000
+    assert neraca['piutang'] == 75000 + 15000
+    assert neraca['bahan_baku'] == 500000 + 40000
+    assert neraca['utang'] == 40000
+    assert neraca['total_aset'] == neraca['total_kewajiban_ekuitas']
+
+
+def test_buka_membuka_bulan_itu_dan_sesudahnya(periode, db):
+    assert periode.buka(db, date(2025, 10, 5)) is periode
+    dibuka = periode.buka(db, date(2025, 8, 20))
+    assert dibuka.periode == ['2025-07']
+    assert PeriodeBuku.dari_db(db).periode == ['2025-07']
+    _sama_dengan_jurnal(dibuka, db, date(2025, 7, 15), date(2025, 9, 20))
+
+
+def test_impor_bertanggal_lama_membuka_lalu_menutup_kembali(db):
+    bersama = BukuBersama(db)
+    bulan_lalu = (date.today().replace(day=1) - timedelta(days=1)).strftime('%Y-%m')
+    assert bersama.snapshot().periode.ditutup_sampai == bulan_lalu
+    sebelum = akuntansi.laba_rugi_periode(bersama.snapshot().periode, db, date(2025, 8, 1), date(2025, 8, 31))
+
+    # 20 kue bawang = 2 kg Tepung Terigu dari lot data awal (Rp10.000/kg)
+    csv = pd.DataFrame([
+        {'tanggal': '2025-08-10', 'jenis': 'Penjualan', 'item': 'kue bawang rasa original', 'qty': 20, 'transaksi_id': 'A1'},
+    ]).to_csv(index=False)
+    snapshot = bersama.snapshot()
+    impor(io.StringIO(csv), snapshot.harga_jual, {}, bersama.posting_kolom, katalog=snapshot.katalog)
+    assert bersama.snapshot().periode.ditutup_sampai == '2025-07'
+
+    bersama.tutup_periode()
+    periode = bersama.snapshot().periode
+    assert periode.ditutup_sampai == bulan_lalu
+    sesudah = akuntansi.laba_rugi_periode(periode, db, date(2025, 8, 1), date(2025, 8, 31))
+    assert sesudah['pendapatan'] - sebelum['pendapatan'] == 300000
+    assert sesudah['beban'] - sebelum['beban'] == 20000
+    _sama_dengan_jurnal(periode, db, date(2025, 7, 15), date(2025, 8, 20))
+    _sama_dengan_jurnal(periode, db, None, None)
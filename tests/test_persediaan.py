@@ -0,0 +1,177 @@
+import io
+from datetime import date
+
+import pandas as pd
+import pytest
+
+import akuntansi
+from buku_bersama import BukuBersama
+from impor import impor
+from penyimpanan import Penyimpanan
+from persediaan import PersediaanFIFO, hpp_riwayat
+from resep import MatriksResep
+
+
+def _fifo():
+    fifo = PersediaanFIFO([(1, 'Gula', 10.0, 1000.0), (2, 'Gula', 5.0, 1200.0)], {'Gula': 1200.0})
+    fifo.mulai()
+    return fifo
+
+
+def test_pakai_dari_lot_tertua():
+    fifo = _fifo()
+    assert fifo.pakai('Gula', 12) == 10 * 1000 + 2 * 1200
+    assert fifo.nilai() == {'Gula': (3.0, 3600.0)}
+    assert fifo.perubahan() == ([], [(0.0, 1), (3.0, 2)])
+
+
+def test_pemakaian_melebihi_lot_memakai_harga_terakhir():
+    fifo = _fifo()
+    assert fifo.pakai('Gula', 20) == 10 * 1000 + 5 * 1200 + 5 * 1200
+    assert fifo.nilai() == {}
+    # bahan yang belum pernah dibeli tidak punya biaya
+    assert fifo.pakai('Minyak Goreng', 3) == 0
+
+
+def test_lot_baru_mendapat_id_dari_database():
+    fifo = _fifo()
+    fifo.tambah('Gula', date(2025, 8, 1), 4, 1500)
+    assert fifo.pakai('Gula', 17) == 10 * 1000 + 5 * 1200 + 2 * 1500
+    baru, sisa = fifo.perubahan()
+    assert baru == [('Gula', date(2025, 8, 1), 4.0, 2.0, 1500.0)]
+    assert sisa == [(0.0, 1), (0.0, 2)]
+    fifo.selesai([7])
+    assert PersediaanFIFO([(7, 'Gula', 2.0, 1500.0)]).nilai() == fifo.nilai()
+    fifo.mulai()
+    fifo.pakai('Gula', 1)
+    assert fifo.perubahan() == ([], [(1.0, 7)])
+
+
+def test_batalkan_mengembalikan_lot_dan_harga_terakhir():
+    fifo = _fifo()
+    fifo.tambah('Gula', date(2025, 8, 1), 4, 1500)
+    fifo.tambah('Tepung Terigu', date(2025, 8, 1), 1, 9000)
+    fifo.pakai('Gula', 18)
+    fifo.batalkan()
+    assert fifo.nilai() == {'Gula': (15.0, 16000.0)}
+    fifo.mulai()
+    # harga terakhir kembali ke lot lama; Tepung Terigu belum pernah dibeli
+    assert fifo.pakai('Gula', 16) == 10 * 1000 + 5 * 1200 + 1200
+    assert fifo.pakai('Tepung Terigu', 1) == 0
+
+
+def test_hpp_riwayat_urut_tanggal():
+    resep = MatriksResep(pd.DataFrame([{'produk': 'keripik kenikir', 'bahan': 'Gula', 'qty': 0.5}]))
+    transaksi = pd.DataFrame([
+        {'tanggal': date(2025, 8, 2), 'jenis': 'Penjualan', 'item': 'keripik kenikir', 'qty': 4, 'harga': 15000},
+        {'tanggal': date(2025, 8, 1), 'jenis': 'Pembelian', 'item': 'Gula', 'qty': 3, 'harga': 2000},
+        {'tanggal': date(2025, 8, 3), 'jenis': 'Penjualan', 'item': 'keripik kenikir', 'qty': 4, 'harga': 15000},
+    ])
+    fifo = PersediaanFIFO()
+    fifo.mulai()
+    biaya = hpp_riwayat(transaksi, resep, fifo)
+    # 2 kg dari lot, lalu 1 kg sisa lot + 1 kg di atas lot dengan harga terakhir
+    assert dict(biaya) == {date(2025, 8, 2): 4000, date(2025, 8, 3): 4000}
+    assert fifo.nilai() == {}
+
+
+# --- HPP DI BUKU BESAR ---
+def _pembelian(item, qty, harga, metode='Tunai'):
+    return pd.DataFrame([{'item': item, 'qty': qty, 'satuan': 'kg', 'harga': harga, 'metode_bayar': metode}],
+                        columns=akuntansi.KOLOM_DAFTAR_PEMBELIAN)
+
+
+def _seimbang(buku):
+    neraca = akuntansi.neraca_saldo(buku)
+    assert neraca['total_aset'] == neraca['total_kewajiban_ekuitas']
+    return neraca
+
+
+def test_penjualan_membebankan_hpp_fifo(db):
+    bersama = BukuBersama(db)
+    # data awal: 50 kg Tepung Terigu @ Rp10.000 (penjualan data awal terjadi sebelum pembelian)
+    assert bersama.fifo.nilai()['Tepung Terigu'] == (50.0, 500000.0)
+    bersama.pembelian(date.today(), _pembelian('Tepung Terigu', 10, 12000))
+    awal = akuntansi.laba_rugi(bersama.snapshot().buku)
+    bahan_awal = _seimbang(bersama.snapshot().buku)['bahan_baku']
+
+    # 510 kue bawang = 51 kg: 50 kg lot pertama + 1 kg lot kedua
+    bersama.penjualan(date.today(), [{'item': 'kue bawang rasa original', 'qty': 510, 'harga': 15000, 'metode_bayar': 'Tunai'}])
+    buku = bersama.snapshot().buku
+    laba_rugi = akuntansi.laba_rugi(buku)
+    assert laba_rugi['beban'] - awal['beban'] == 512000
+    assert laba_rugi['pendapatan'] - awal['pendapatan'] == 510 * 15000
+    assert _seimbang(buku)['bahan_baku'] == bahan_awal - 512000
+    assert bersama.fifo.nilai() == {'Tepung Terigu': (9.0, 108000.0)}
+
+    # dibuka ulang dari database: lot sama, riwayat tidak diputar ulang
+    ulang = BukuBersama(Penyimpanan(db.path))
+    assert ulang.fifo.nilai() == bersama.fifo.nilai()
+    assert akuntansi.laba_rugi(ulang.snapshot().buku) == laba_rugi
+
+
+def test_posting_gagal_tidak_mengubah_lot(db, monkeypatch):
+    bersama = BukuBersama(db)
+    lot = bersama.fifo.nilai()
+    beban = akuntansi.laba_rugi(bersama.snapshot().buku)['beban']
+
+    def gagal(**data):
+        raise RuntimeError('disk penuh')
+    monkeypatch.setattr(bersama, '_simpan', gagal)
+    with pytest.raises(RuntimeError):
+        bersama.penjualan(date.today(), [{'item': 'kue bawang rasa original', 'qty': 30, 'harga': 15000, 'metode_bayar': 'Tunai'}])
+    monkeypatch.undo()
+    assert bersama.fifo.nilai() == lot
+    assert akuntansi.laba_rugi(bersama.snapshot().buku)['beban'] == beban
+    assert PersediaanFIFO.dari_db(db).nilai() == lot
+
+
+def test_reset_mengosongkan_lot_tanpa_memutar_ulang_riwayat(db):
+    bersama = BukuBersama(db)
+    bersama.reset()
+    assert db.conn.execute("SELECT COUNT(*) FROM lot_bahan").fetchone() == (0,)
+    assert db.baca_pengaturan('hpp_fifo') == '1'
+    bersama.pembelian(date.today(), _pembelian('Gula', 2, 14000))
+    ulang = BukuBersama(Penyimpanan(db.path))
+    assert ulang.fifo.nilai() == bersama.fifo.nilai() == {'Gula': (2.0, 28000.0)}
+    assert akuntansi.laba_rugi(ulang.snapshot().buku)['beban'] == 0
+
+
+CSV_IMPOR = pd.DataFrame([
+    {'tanggal': '2025-08-05', 'jenis': 'Pembelian', 'item': 'Tepung Terigu', 'qty': 10, 'harga': 12000, 'metode_bayar': 'Kredit'},
+    {'tanggal': '2025-08-06', 'jenis': 'Penjualan', 'item': 'kue bawang rasa original', 'qty': 20, 'transaksi_id': 'A1'},
+]).to_csv(index=False)
+
+
+def _impor_lot(db, perbarui_stok):
+    bersama = BukuBersama(db)
+    beban = akuntansi.laba_rugi(bersama.snapshot().buku)['beban']
+    snapshot = bersama.snapshot()
+    impor(io.StringIO(CSV_IMPOR), snapshot.harga_jual, {'Tepung Terigu': 'kg'},
+          lambda t, j: bersama.posting_kolom(t, j, perbarui_stok), katalog=snapshot.katalog)
+
+    # 2 kg dari lot data awal (Rp10.000), lot impor ada di belakangnya
+    buku = bersama.snapshot().buku
+    assert akuntansi.laba_rugi(buku)['beban'] - beban == 20000
+    _seimbang(buku)
+    hpp = db.conn.execute("SELECT tanggal, debit FROM jurnal WHERE keterangan LIKE 'HPP Penjualan Impor%' AND debit > 0").fetchall()
+    assert hpp == [('2025-08-06', 20000)]
+    return bersama
+
+
+def test_impor_dengan_stok_memakai_lot_dan_stok_bersama(db):
+    bersama = _impor_lot(db, True)
+    assert bersama.fifo.nilai() == {'Tepung Terigu': (58.0, 600000.0)}
+    assert PersediaanFIFO.dari_db(db).nilai() == bersama.fifo.nilai()
+    # stok berubah sebanyak lot: +10 kg dibeli, -2 kg terpakai
+    assert bersama.snapshot().inventaris.set_index('item').at['Tepung Terigu', 'qty'] == pytest.approx(58.0)
+    assert db.muat_inventaris().set_index('item').at['Tepung Terigu', 'qty'] == pytest.approx(58.0)
+
+
+def test_impor_tanpa_stok_tidak_mengubah_lot(db):
+    # lot data awal dibuat saat buku pertama kali dibuka
+    lot = BukuBersama(db).fifo.nilai()
+    bersama = _impor_lot(db, False)
+    assert bersama.fifo.nilai() == lot == PersediaanFIFO.dari_db(db).nilai()
+    assert lot['Tepung Terigu'] == (50.0, 500000.0)
+    assert db.muat_inventaris().set_index('item').at['Tepung Terigu', 'qty'] == 50.0
@@ -0,0 +1,114 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from penyimpanan import Penyimpanan
+from prakiraan import (
+    BATAS_CAKUPAN_HARI, HARI_RIWAYAT, TARGET_CAKUPAN_HARI, WAKTU_TUNGGU_HARI, PemakaianHarian, peringatan_baru,
+    prakiraan_restock,
+)
+from resep import MatriksResep
+
+HARI_INI = date.today()
+
+
+def _pemakaian(**per_bahan):
+    # per_bahan: nama -> array pemakaian HARI_RIWAYAT hari (terakhir = hari ini)
+    return PemakaianHarian(list(per_bahan), np.column_stack(list(per_bahan.values())).astype(float), HARI_INI)
+
+
+def _hari(terakhir=0.0, sebelumnya=0.0, n=7):
+    # `terakhir` per hari untuk n hari terakhir, `sebelumnya` untuk hari-hari sebelumnya
+    return np.r_[np.full(HARI_RIWAYAT - n, sebelumnya), np.full(n, terakhir)]
+
+
+def _inventaris(*baris):
+    return pd.DataFrame(baris, columns=['item', 'qty', 'satuan', 'min_stok'])
+
+
+def test_laju_memakai_jendela_terbesar():
+    laju = _pemakaian(Gula=_hari(terakhir=2), Tepung=_hari(sebelumnya=1)).laju()
+    assert laju.loc['Gula'].tolist() == pytest.approx([2, 0.5, 2])
+    # minggu ini sepi, pola bulanan tetap dipakai
+    assert laju.loc['Tepung'].tolist() == pytest.approx([0, 0.75, 0.75])
+
+
+def test_jendela_digeser_per_hari():
+    pemakaian = _pemakaian(Gula=np.arange(HARI_RIWAYAT, dtype=float))
+    geser = pemakaian.geser(HARI_INI + timedelta(days=3))
+    assert geser.data[:, 0].tolist() == list(range(3, HARI_RIWAYAT)) + [0, 0, 0]
+    assert not pemakaian.geser(HARI_INI + timedelta(days=HARI_RIWAYAT)).data.any()
+    assert pemakaian.geser(HARI_INI - timedelta(days=1)) is pemakaian
+
+
+def test_posting_penjualan_masuk_ke_hari_tanggalnya():
+    pemakaian = _pemakaian(Gula=_hari())
+    baru = pemakaian.dengan([
+        (HARI_INI, pd.Series({'Gula': 0.5, 'Vanili': 9.0})),
+        (HARI_INI - timedelta(days=2), pd.Series({'Gula': 1.0})),
+        (HARI_INI - timedelta(days=HARI_RIWAYAT), pd.Series({'Gula': 100.0})),
+    ])
+    assert baru.data[-3:, 0].tolist() == [1.0, 0.0, 0.5]
+    assert baru.data.sum() == 1.5
+    # snapshot lama tidak berubah
+    assert not pemakaian.data.any()
+
+
+def test_pemakaian_dari_penjualan_harian(tmp_path):
+    db = Penyimpanan(str(tmp_path / 'prakiraan.db'))
+    resep = MatriksResep(pd.DataFrame([{'produk': 'kue', 'bahan': 'Tepung', 'qty': 0.1}, {'produk': 'kue', 'bahan': 'Gula', 'qty': 0.02}]))
+    db.simpan(transaksi=[
+        {'transaksi_id': f'T{i}', 'tanggal': tanggal, 'jenis': jenis, 'metode_bayar': 'Tunai', 'item': item,
+         'qty': qty, 'harga': 1000, 'total': 1000 * qty, 'catatan': ''}
+        for i, (tanggal, jenis, item, qty) in enumerate([
+            (HARI_INI, 'Penjualan', 'kue', 10),
+            (HARI_INI, 'Penjualan', 'kue', 5),
+            (HARI_INI - timedelta(days=1), 'Penjualan', 'kue', 20),
+            (HARI_INI - timedelta(days=HARI_RIWAYAT), 'Penjualan', 'kue', 1000),
+            (HARI_INI, 'Pembelian', 'Tepung', 50),
+            (HARI_INI, 'Penjualan', 'produk lain', 7),
+        ])
+    ])
+    pemakaian = PemakaianHarian.dari_db(db, resep)
+    assert list(pemakaian.bahan) == ['Tepung', 'Gula']
+    assert pemakaian.data[-2:].ravel().tolist() == pytest.approx([2.0, 0.4, 1.5, 0.3])
+    assert pemakaian.data.sum() == pytest.approx(3.5 + 0.7)
+
+
+def test_batas_status_dan_saran_beli():
+    laju = 2.0
+    pemakaian = _pemakaian(Gula=_hari(terakhir=laju), Tepung=_hari(terakhir=laju), Minyak=_hari(terakhir=laju))
+    prakiraan = prakiraan_restock(_inventaris(
+        ['Gula', laju * BATAS_CAKUPAN_HARI, 'kg', 5],  # tepat di batas cakupan: cukup
+        ['Tepung', laju * BATAS_CAKUPAN_HARI - 0.1, 'kg', 5],  # di bawah batas cakupan
+        ['Minyak', 4, 'liter', 4],  # stok = minimum
+        ['Vanili', 1, 'botol', 5],  # tidak dipakai resep, di bawah minimum
+        ['Garam', 6, 'kg', 5],  # tidak dipakai resep
+    ), pemakaian, per_tanggal=HARI_INI).set_index('item')
+    assert prakiraan['status'].tolist() == ['Cukup', 'Perlu Restock', 'Perlu Restock', 'Perlu Restock', 'Cukup']
+    assert prakiraan.at['Gula', 'cakupan_hari'] == BATAS_CAKUPAN_HARI
+    assert prakiraan.at['Gula', 'habis_tanggal'] == np.datetime64(HARI_INI + timedelta(days=BATAS_CAKUPAN_HARI))
+    assert prakiraan.at['Gula', 'saran_beli'] == 0
+    target = laju * (WAKTU_TUNGGU_HARI + TARGET_CAKUPAN_HARI) + 5
+    assert prakiraan.at['Tepung', 'saran_beli'] == np.ceil(target - (laju * BATAS_CAKUPAN_HARI - 0.1))
+    assert prakiraan.at['Minyak', 'cakupan_hari'] == 2
+    # tanpa pemakaian: cakupan tak terbatas, tidak ada tanggal habis, saran cukup sampai minimum
+    assert prakiraan.at['Vanili', 'cakupan_hari'] == np.inf and pd.isna(prakiraan.at['Vanili', 'habis_tanggal'])
+    assert prakiraan.at['Vanili', 'saran_beli'] == 4
+    assert prakiraan.at['Garam', 'laju_harian'] == 0
+
+
+def test_stok_negatif_habis_hari_ini():
+    prakiraan = prakiraan_restock(_inventaris(['Gula', -3, 'kg', 0]), _pemakaian(Gula=_hari(terakhir=1)), per_tanggal=HARI_INI)
+    assert prakiraan.at[0, 'cakupan_hari'] == 0
+    assert prakiraan.at[0, 'habis_tanggal'] == np.datetime64(HARI_INI)
+    assert prakiraan.at[0, 'saran_beli'] == WAKTU_TUNGGU_HARI + TARGET_CAKUPAN_HARI + 3
+
+
+def test_peringatan_hanya_untuk_bahan_yang_baru_perlu_restock():
+    lama = pd.DataFrame({'item': ['Gula', 'Tepung', 'Minyak'], 'status': ['Perlu Restock', 'Cukup', 'Cukup']})
+    baru = pd.DataFrame({'item': ['Gula', 'Tepung', 'Minyak', 'Vanili'], 'status': ['Perlu Restock', 'Perlu Restock', 'Cukup', 'Perlu Restock']})
+    assert [p['item'] for p in peringatan_baru(lama, baru)] == ['Tepung', 'Vanili']
+    assert [p['item'] for p in peringatan_baru(None, baru)] == ['Gula', 'Tepung', 'Vanili']
@@ -0,0 +1,94 @@
+import json
+import marshal
+import threading
+
+from profil import Profil
+
+
+def _rerun(profil, menu, bagian=('muat sesi', 'sidebar')):
+    profil.mulai_rerun()
+    for nama in bagian:
+        profil.tandai(nama)
+    profil.selesai_rerun(menu, lambda: {'jurnal': (10, 2048)})
+
+
+def test_tidak_aktif_tidak_mencatat():
+    profil = Profil()
+    dipanggil = []
+    posting = profil.fungsi(lambda x: dipanggil.append(x) or x * 2)
+    profil.mulai_rerun()
+    assert posting(3) == 6 and dipanggil == [3]
+    with profil.ukur('blok'):
+        pass
+    profil.selesai_rerun('Dashboard', lambda: 1 / 0)
+    assert list(profil.riwayat) == [] and profil.ke_prof() is None
+
+
+def test_rerun_dicatat_per_bagian_dan_fungsi():
+    profil = Profil()
+    profil.aktif = True
+
+    @profil.fungsi
+    def posting():
+        return 'ok'
+
+    profil.mulai_rerun()
+    profil.tandai('muat sesi')
+    assert posting() == 'ok' and posting() == 'ok'
+    with profil.ukur('grafik'):
+        pass
+    profil.selesai_rerun('Catat Transaksi', lambda: {'jurnal': (10, 2048)})
+    catatan, = profil.riwayat
+    assert catatan['menu'] == 'Catat Transaksi'
+    assert set(catatan['bagian']) == {'muat sesi', 'posting', 'grafik'}
+    assert catatan['data'] == {'jurnal': {'baris': 10, 'byte': 2048}}
+    assert catatan['total_ms'] >= sum(catatan['bagian'].values()) - 1e-3
+
+
+def test_rerun_terputus_dan_riwayat_bergulir():
+    profil = Profil(panjang_riwayat=3)
+    profil.aktif = True
+    profil.mulai_rerun()
+    profil.tandai('muat sesi')
+    # st.rerun() sebelum selesai_rerun: dicatat sebagai terputus di rerun berikutnya
+    _rerun(profil, 'Dashboard')
+    assert [c['menu'] for c in profil.riwayat] == ['(terputus)', 'Dashboard']
+    for menu in ('A', 'B', 'C'):
+        _rerun(profil, menu)
+    assert [c['menu'] for c in profil.riwayat] == ['A', 'B', 'C']
+
+    ringkasan = {b['bagian']: b for b in profil.ringkasan()}
+    assert set(ringkasan) == {'rerun A', 'rerun B', 'rerun C', 'muat sesi', 'sidebar'}
+    assert ringkasan['sidebar']['jumlah'] == 3
+    assert ringkasan['sidebar']['maks_ms'] >= ringkasan['sidebar']['p95_ms'] >= 0
+    assert json.loads(profil.ke_json())['ringkasan'] == profil.ringkasan()
+    profil.reset()
+    assert list(profil.riwayat) == []
+
+
+def test_rerun_tiap_thread_terpisah_dan_cprofile_satu_pemilik():
+    profil = Profil()
+    profil.aktif = True
+    profil.rekam_cprofile = True
+    mulai, lanjut = threading.Barrier(2), threading.Event()
+    direkam = {}
+
+    def sesi(menu):
+        profil.mulai_rerun()
+        direkam[menu] = profil._lokal.rerun['profiler'] is not None
+        mulai.wait()
+        lanjut.wait(5)
+        profil.tandai(menu)
+        profil.selesai_rerun(menu)
+
+    thread = [threading.Thread(target=sesi, args=(m,)) for m in ('A', 'B')]
+    for t in thread:
+        t.start()
+    lanjut.set()
+    for t in thread:
+        t.join()
+    assert sorted(c['menu'] for c in profil.riwayat) == ['A', 'B']
+    assert all(list(c['bagian']) == [c['menu']] for c in profil.riwayat)
+    # hanya satu thread yang memegang cProfile pada satu waktu
+    assert sorted(direkam.values()) == [False, True]
+    assert isinstance(marshal.loads(profil.ke_prof()), dict)
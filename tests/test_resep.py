@@ -0,0 +1,53 @@
+import pandas as pd
+import pytest
+
+from resep import MatriksResep, bersihkan_resep, kurangi_stok
+
+RESEP = pd.DataFrame([
+    {'produk': 'kue bawang', 'bahan': 'Tepung Terigu', 'qty': 0.1},
+    {'produk': 'kue bawang', 'bahan': 'Minyak Goreng', 'qty': 0.02},
+    {'produk': 'keripik kenikir', 'bahan': 'Gula', 'qty': 0.05},
+    {'produk': 'keripik kenikir', 'bahan': 'Gula', 'qty': '0.05'},
+    {'produk': '', 'bahan': 'Gula', 'qty': 1},
+    {'produk': 'jus jambu', 'bahan': None, 'qty': 1},
+])
+
+
+def _inventaris():
+    return pd.DataFrame({'item': ['Tepung Terigu', 'Gula', 'Minyak Goreng'], 'qty': [50.0, 20.0, 10.0]})
+
+
+def test_resep_dibersihkan_dan_baris_ganda_digabung():
+    resep = bersihkan_resep(RESEP)
+    assert resep.values.tolist() == [
+        ['kue bawang', 'Tepung Terigu', 0.1],
+        ['kue bawang', 'Minyak Goreng', 0.02],
+        ['keripik kenikir', 'Gula', 0.1],
+    ]
+
+
+def test_pemakaian_bahan_per_keranjang():
+    matriks = MatriksResep(RESEP)
+    pemakaian = matriks.pemakaian_bahan(['kue bawang', 'keripik kenikir', 'kue bawang', 'jus jambu'], [2, 3, 1, 5])
+    assert pemakaian.to_dict() == pytest.approx({'Tepung Terigu': 0.3, 'Minyak Goreng': 0.06, 'Gula': 0.3})
+
+
+def test_resep_kosong_tidak_memakai_bahan():
+    pemakaian = MatriksResep(pd.DataFrame(columns=['produk', 'bahan', 'qty'])).pemakaian_bahan(['kue bawang'], [1])
+    assert pemakaian.empty
+
+
+def test_kurangi_stok_melewati_bahan_yang_tidak_ada():
+    pemakaian = pd.Series({'Gula': 0.3, 'Vanili': 1.0, 'Tepung Terigu': 0.0})
+    inventaris = kurangi_stok(_inventaris(), pemakaian)
+    assert inventaris['qty'].tolist() == pytest.approx([50.0, 19.7, 10.0])
+
+
+def test_bahan_dipakai_beberapa_produk_dijumlahkan():
+    resep = pd.DataFrame([
+        {'produk': 'kue bawang', 'bahan': 'Gula', 'qty': 0.01},
+        {'produk': 'keripik kenikir', 'bahan': 'Gula', 'qty': 0.1},
+    ])
+    pemakaian = MatriksResep(resep).pemakaian_bahan(['kue bawang', 'keripik kenikir'], [10, 1])
+    inventaris = kurangi_stok(_inventaris(), pemakaian)
+    assert inventaris.set_index('item').at['Gula', 'qty'] == pytest.approx(19.8)
@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from skema import SKEMA_INVENTARIS, SKEMA_JURNAL, SKEMA_TRANSAKSI, terapkan_skema
+
+
+def test_tipe_dan_urutan_kolom():
+    df = terapkan_skema(pd.DataFrame({
+        'total': ['15000', 2500.4], 'tanggal': ['2025-07-01', '2025-07-02 13:45'], 'jenis': ['Penjualan', None],
+        'qty': [1, '2.5'], 'item': ['Gula', 'Gula'], 'harga': [15000, None],
+    }), SKEMA_TRANSAKSI)
+    assert list(df.columns) == list(SKEMA_TRANSAKSI)
+    assert df['total'].tolist() == [15000, 2500] and df['total'].dtype == np.int64
+    assert df['harga'].tolist() == [15000, 0]
+    assert df['qty'].tolist() == [1.0, 2.5]
+    assert df['tanggal'].tolist() == [pd.Timestamp('2025-07-01'), pd.Timestamp('2025-07-02')]
+    assert isinstance(df['jenis'].dtype, pd.CategoricalDtype) and df['jenis'].tolist() == ['Penjualan', '']
+    assert df['catatan'].tolist() == ['', '']
+
+
+@pytest.mark.parametrize('skema, kolom, nilai', [
+    (SKEMA_JURNAL, 'debit', ['15000', 'lima ribu']),
+    (SKEMA_JURNAL, 'kredit', pd.to_datetime(['2025-07-01', '2025-07-02'])),
+    (SKEMA_INVENTARIS, 'qty', [1.5, 'dua']),
+    (SKEMA_INVENTARIS, 'min_stok', pd.to_datetime(['2025-07-01', '2025-07-02'])),
+    (SKEMA_JURNAL, 'tanggal', ['2025-07-01', 'kemarin']),
+    (SKEMA_JURNAL, 'tanggal', [20250701, 20250702]),
+])
+def test_tipe_salah_ditolak(skema, kolom, nilai):
+    with pytest.raises(ValueError):
+        terapkan_skema(pd.DataFrame({kolom: nilai}), skema)
@@ -0,0 +1,35 @@
+from datetime import date
+
+import pytest
+
+import sumber_daya
+
+
+@pytest.fixture
+def db_arsip(db, monkeypatch):
+    monkeypatch.setattr(sumber_daya, 'get_penyimpanan', lambda: db)
+    sumber_daya._render_invoice_arsip.clear()
+    yield db
+    sumber_daya._render_invoice_arsip.clear()
+
+
+def _jual(db, transaksi_id):
+    db.simpan(transaksi=[{'transaksi_id': transaksi_id, 'tanggal': date(2025, 1, 6), 'jenis': 'Penjualan', 'metode_bayar': 'Tunai',
+                          'item': 'keripik kenikir', 'qty': 2, 'harga': 15000, 'total': 30000, 'catatan': ''}])
+
+
+def test_invoice_arsip_tidak_ditemukan_tidak_di_cache(db_arsip):
+    assert sumber_daya.render_invoice_arsip('b1', 1, 'A1') is None
+    _jual(db_arsip, 'A1')
+    teks, html = sumber_daya.render_invoice_arsip('b1', 1, 'A1')
+    assert 'A1' in teks and 'keripik kenikir' in html
+
+
+def test_invoice_arsip_di_cache_per_versi_buku(db_arsip):
+    _jual(db_arsip, 'A1')
+    hasil = sumber_daya.render_invoice_arsip('b1', 1, 'A1')
+    db_arsip.hapus_semua()
+    # versi yang sama memakai cache, setelah Reset/tutup buku (id/versi baru) dibaca ulang
+    assert sumber_daya.render_invoice_arsip('b1', 1, 'A1') == hasil
+    assert sumber_daya.render_invoice_arsip('b1', 2, 'A1') is None
+    assert sumber_daya.render_invoice_arsip('b2', 1, 'A1') is None
@@ -0,0 +1,386 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from benchmark import siapkan_database
+from penyimpanan import DB_PATH
+
+# --- UJI BEBAN (RERUN STREAMLIT END-TO-END) ---
+# benchmark.py mengukur jalur aplikasi tanpa Streamlit; di sini jamfix.py sendiri
+# dijalankan tanpa browser lewat AppTest, jadi biaya rerun ikut terukur: state
+# widget, data_editor keranjang, serialisasi grafik & tabel. Beberapa sesi
+# berjalan bersamaan (satu thread per sesi) di satu proses, berbagi penyimpanan,
+# BukuBersama & pool laporan seperti sesi-sesi di satu server, di atas buku besar
+# sintetis (benchmark.siapkan_database). Setiap sesi mengulang alur kasir:
+#
+#   keranjang         pilih produk, isi jumlah, Tambah Produk (3 rerun per baris),
+#                     lalu ubah metode bayar di data_editor & isi nama pelanggan
+#   bayar             Bayar & Simpan Transaksi
+#   invoice           cetak ulang invoice transaksi tadi
+#   dashboard         buka Dashboard, rerun sampai grafik selesai dihitung
+#   laporan_keuangan  buka Laporan Keuangan
+#
+# Hasilnya per alur: latensi rerun p50/p95/p99, sebagai JSON. Semua sesi berbagi
+# satu proses, jadi RSS selama fase bersamaan tidak bisa dibagi per alur; yang
+# dilaporkan hanya RSS puncak seluruh proses (total.rss_puncak_mb). RSS per alur
+# (rss_per_alur_mb) diukur sesudahnya dengan satu sesi yang menjalankan satu alur
+# kasir sendirian, sampel setiap RSS_INTERVAL_S detik. Anggaran latensi diperiksa
+# lewat --anggaran; kode keluar 1 kalau ada yang terlampaui.
+#
+#   python uji_beban.py --transaksi 100000 --sesi 8 --ulang 3 --output hasil.json
+#   python uji_beban.py --anggaran keranjang=300 --anggaran dashboard:p99=3000
+#
+# Baris keranjang ditambah lewat tombol Tambah Produk; sel data_editor keranjang
+# diisi lewat at.session_state dengan format edited_rows yang sama seperti kiriman
+# browser, jadi jalur edit keranjang ikut terukur.
+
+TRANSAKSI_DEFAULT = 100_000
+SESI_DEFAULT = 4
+ULANG_DEFAULT = 3
+BARIS_KERANJANG = 20
+
+ALUR = ['buka_aplikasi', 'keranjang', 'bayar', 'invoice', 'dashboard', 'laporan_keuangan']
+PERSENTIL = [50, 95, 99]
+
+# Laporan latar belakang diperiksa ulang seperti fragmen tunggu_laporan di jamfix.py
+TUNGGU_LAPORAN_S = 0.5
+BATAS_TUNGGU_LAPORAN = 120
+TIMEOUT_RERUN_S = 300
+RSS_INTERVAL_S = 0.05
+
+FILE_APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'jamfix.py')
+FILE_LOGO = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'logo.png')
+
+
+def rss_mb():
+    # RSS proses saat ini; di luar Linux memakai puncak RSS (ru_maxrss)
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except OSError:
+        import resource
+        maks = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maks / 2**20 if sys.platform == 'darwin' else maks / 2**10
+
+
+@contextmanager
+def apptest_bersamaan():
+    # AppTest dibuat untuk satu sesi pada satu waktu; tiga hal disesuaikan supaya
+    # beberapa sesi bisa berjalan bersamaan di thread masing-masing (semuanya
+    # dikembalikan seperti semula saat keluar dari blok with):
+    # - AppTest membuat ScriptCache baru di setiap run, jadi jamfix.py dikompilasi
+    #   ulang setiap rerun (server Streamlit hanya sekali) dan ast.parse tidak aman
+    #   dijalankan bersamaan. Bytecode dikompilasi sekali untuk semua sesi.
+    # - Setiap run memasang Runtime tiruan global lalu mengosongkannya di akhir run,
+    #   padahal sesi lain masih berjalan. Selama kosong, Runtime tiruan terakhir dipakai.
+    # - Opsi global.appTest hanya dinyalakan selama satu run (patch config.get_option);
+    #   run yang selesai mematikannya untuk sesi lain, dan run yang bertumpuk bisa
+    #   meninggalkan get_option tiruan terpasang. Opsi ini dinyalakan permanen.
+    from streamlit import config
+    from streamlit.runtime.runtime import Runtime
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+
+    get_bytecode_asli = ScriptCache.get_bytecode
+    instance_asli = Runtime.__dict__['instance']
+    exists_asli = Runtime.__dict__['exists']
+    get_option_asli = config.get_option
+    app_test_asli = config.get_option('global.appTest')
+    lock = threading.Lock()
+    bytecode = {}
+    terakhir = []
+
+    def get_bytecode(self, script_path):
+        with lock:
+            if script_path not in bytecode:
+                bytecode[script_path] = get_bytecode_asli(self, script_path)
+            return bytecode[script_path]
+
+    def instance(cls):
+        if cls._instance is not None:
+            terakhir[:] = [cls._instance]
+            return cls._instance
+        if not terakhir:
+            raise RuntimeError("Runtime hasn't been created!")
+        return terakhir[0]
+
+    def exists(cls):
+        return cls._instance is not None or bool(terakhir)
+
+    config.set_option('global.appTest', True)
+    ScriptCache.get_bytecode = get_bytecode
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(exists)
+    try:
+        yield
+    finally:
+        ScriptCache.get_bytecode = get_bytecode_asli
+        Runtime.instance = instance_asli
+        Runtime.exists = exists_asli
+        config.get_option = get_option_asli
+        config.set_option('global.appTest', app_test_asli)
+
+
+class PencatatRSS:
+    # Sampel RSS berkala di thread terpisah; puncak() = RSS terbesar dalam rentang waktu
+    def __init__(self, interval=RSS_INTERVAL_S):
+        self.interval = interval
+        self.sampel = []
+        self._berhenti = threading.Event()
+        self._thread = threading.Thread(target=self._jalan, name='rss', daemon=True)
+
+    def _jalan(self):
+        while not self._berhenti.is_set():
+            self.sampel.append((time.perf_counter(), rss_mb()))
+            self._berhenti.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._berhenti.set()
+        self._thread.join()
+
+    def puncak(self, rentang):
+        waktu = np.array([t for t, _ in self.sampel])
+        rss = np.array([r for _, r in self.sampel])
+        hasil = 0.0
+        for mulai, selesai in rentang:
+            # sampel terakhir sebelum rentang dimulai juga dihitung (rentang lebih pendek dari interval)
+            i = max(np.searchsorted(waktu, mulai, side='right') - 1, 0)
+            j = np.searchsorted(waktu, selesai, side='right')
+            if j > i:
+                hasil = max(hasil, float(rss[i:j].max()))
+        return hasil
+
+
+def _widget(daftar, label):
+    for w in daftar:
+        if w.label == label:
+            return w
+    raise LookupError(f"widget tidak ditemukan: {label}")
+
+
+class Sesi:
+    # Satu sesi browser: satu AppTest yang dijalankan di satu thread
+    def __init__(self, nomor, seed=0):
+        from streamlit.testing.v1 import AppTest
+
+        self.nomor = nomor
+        self.rng = np.random.default_rng(seed + nomor)
+        self.at = AppTest.from_file(FILE_APP, default_timeout=TIMEOUT_RERUN_S)
+        self.latensi = {alur: [] for alur in ALUR}
+        self.rentang = {alur: [] for alur in ALUR}
+        self.error = []
+
+    def _rerun(self, alur, aksi=None):
+        mulai = time.perf_counter()
+        (aksi or self.at.run)()
+        selesai = time.perf_counter()
+        self.latensi[alur].append((selesai - mulai) * 1000)
+        self.rentang[alur].append((mulai, selesai))
+        if self.at.exception:
+            self.error.append({'sesi': self.nomor, 'alur': alur, 'error': [e.message for e in self.at.exception]})
+            raise RuntimeError(self.at.exception[0].message)
+
+    def _menu(self, alur, menu):
+        self._rerun(alur, _widget(self.at.sidebar.radio, "Pilih Menu:").set_value(menu).run)
+
+    def _tunggu_laporan(self, alur):
+        # Laporan berat dihitung di pool latar belakang (pesan ⏳ di halaman);
+        # halaman dijalankan ulang sampai hasil terbarunya tampil
+        for _ in range(BATAS_TUNGGU_LAPORAN):
+            if not any(str(e.value).startswith("⏳") for e in [*self.at.info, *self.at.caption]):
+                return
+            time.sleep(TUNGGU_LAPORAN_S)
+            self._rerun(alur)
+
+    def alur_kasir(self, baris_keranjang):
+        self._menu('keranjang', "Catat Transaksi")
+        for _ in range(baris_keranjang):
+            pilih = _widget(self.at.selectbox, "Pilih Produk")
+            self._rerun('keranjang', pilih.set_value(pilih.options[self.rng.integers(len(pilih.options))]).run)
+            self._rerun('keranjang', _widget(self.at.number_input, "Jumlah (pcs)").set_value(int(self.rng.integers(1, 6))).run)
+            self._rerun('keranjang', _widget(self.at.button, "➕ Tambah Produk").click().run)
+        # Edit sel seperti dari browser: baris genap dibayar Kredit
+        kredit = range(0, baris_keranjang, 2)
+        self.at.session_state['editor_keranjang'] = {
+            'edited_rows': {i: {'metode_bayar': 'Kredit'} for i in kredit}, 'added_rows': [], 'deleted_rows': []}
+        self._rerun('keranjang')
+        keranjang = self.at.session_state.cart
+        if any(keranjang[i]['metode_bayar'] != 'Kredit' for i in kredit):
+            raise RuntimeError("edit data_editor keranjang tidak diterapkan")
+        if len(kredit):
+            self._rerun('keranjang', _widget(self.at.text_input, "Nama Pelanggan (Kredit)").input(f"Pelanggan {self.nomor}").run)
+
+        self._rerun('bayar', _widget(self.at.button, "Bayar & Simpan Transaksi").click().run)
+        transaksi_id = self.at.session_state.last_invoice_id
+        if not transaksi_id:
+            raise RuntimeError("transaksi tidak tersimpan")
+        self._rerun('invoice', _widget(self.at.text_input, "ID Transaksi").input(transaksi_id).run)
+        self._rerun('invoice', _widget(self.at.button, "Selesaikan Transaksi Baru").click().run)
+
+        self._menu('dashboard', "Dashboard")
+        self._tunggu_laporan('dashboard')
+        self._menu('laporan_keuangan', "Laporan Keuangan")
+        self._tunggu_laporan('laporan_keuangan')
+
+    def jalankan(self, ulang, baris_keranjang, mulai_bersama):
+        mulai_bersama.wait()
+        try:
+            self._rerun('buka_aplikasi')
+            for _ in range(ulang):
+                self.alur_kasir(baris_keranjang)
+        except Exception as e:
+            if not self.error:
+                self.error.append({'sesi': self.nomor, 'error': [f"{type(e).__name__}: {e}"]})
+
+
+def _statistik(latensi, rss=None):
+    waktu = np.asarray(latensi)
+    if not len(waktu):
+        return {'jumlah_rerun': 0}
+    hasil = {'jumlah_rerun': len(waktu)}
+    for p in PERSENTIL:
+        hasil[f'p{p}_ms'] = round(float(np.percentile(waktu, p)), 3)
+    hasil['maks_ms'] = round(float(waktu.max()), 3)
+    if rss is not None:
+        hasil['rss_puncak_mb'] = round(rss, 1)
+    return hasil
+
+
+def jalankan(n, sesi=SESI_DEFAULT, ulang=ULANG_DEFAULT, baris_keranjang=BARIS_KERANJANG, folder=None, seed=0):
+    from streamlit.testing.v1 import AppTest
+
+    hasil = {'jumlah_transaksi': n, 'sesi': sesi, 'ulang': ulang, 'baris_keranjang': baris_keranjang}
+    folder_awal = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        # jamfix.py membuka database (DB_PATH) & logo dari folder kerja
+        folder = folder or tmp
+        os.makedirs(folder, exist_ok=True)
+        shutil.copy(FILE_LOGO, folder)
+        os.chdir(folder)
+        try:
+            mulai = time.perf_counter()
+            if not os.path.exists(DB_PATH):
+                siapkan_database(DB_PATH, n, seed).conn.close()
+            hasil['siapkan_data_s'] = round(time.perf_counter() - mulai, 3)
+
+            with apptest_bersamaan():
+                # Sesi pertama memuat buku besar bersama (st.cache_resource); diukur terpisah
+                mulai = time.perf_counter()
+                AppTest.from_file(FILE_APP, default_timeout=TIMEOUT_RERUN_S).run()
+                hasil['muat_awal_s'] = round(time.perf_counter() - mulai, 3)
+                hasil['rss_setelah_muat_mb'] = round(rss_mb(), 1)
+
+                daftar_sesi = [Sesi(i, seed) for i in range(sesi)]
+                mulai_bersama = threading.Barrier(sesi)
+                thread = [
+                    threading.Thread(target=s.jalankan, args=(ulang, baris_keranjang, mulai_bersama), name=f'sesi-{s.nomor}')
+                    for s in daftar_sesi
+                ]
+                with PencatatRSS() as rss:
+                    mulai = time.perf_counter()
+                    for t in thread:
+                        t.start()
+                    for t in thread:
+                        t.join()
+                    hasil['durasi_s'] = round(time.perf_counter() - mulai, 3)
+
+                # RSS per alur: satu sesi sendirian, jadi hanya alur itu yang berjalan
+                sendiri = Sesi(sesi, seed)
+                with PencatatRSS() as rss_sendiri:
+                    sendiri.jalankan(1, baris_keranjang, threading.Barrier(1))
+        finally:
+            os.chdir(folder_awal)
+
+    hasil['alur'] = {alur: _statistik([ms for s in daftar_sesi for ms in s.latensi[alur]]) for alur in ALUR}
+    semua = [ms for s in daftar_sesi for daftar in s.latensi.values() for ms in daftar]
+    hasil['total'] = _statistik(semua, max((r for _, r in rss.sampel), default=0.0))
+    hasil['rss_per_alur_mb'] = {alur: round(rss_sendiri.puncak(sendiri.rentang[alur]), 1) for alur in ALUR}
+    hasil['error'] = [e for s in [*daftar_sesi, sendiri] for e in s.error]
+    return hasil
+
+
+# --- ANGGARAN LATENSI ---
+def baca_anggaran(teks):
+    # "alur=ms" (p95) atau "alur:p99=ms"; alur boleh "total"
+    try:
+        kunci, ms = teks.split('=')
+        alur, _, persentil = kunci.partition(':')
+        persentil = persentil or 'p95'
+        if alur not in ALUR + ['total'] or persentil not in [f'p{p}' for p in PERSENTIL]:
+            raise ValueError
+        return alur, persentil, float(ms)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"anggaran harus ALUR[:p50|p95|p99]=MS, ALUR salah satu dari {', '.join(ALUR)}, total") from None
+
+
+def periksa_anggaran(hasil, anggaran):
+    # Daftar pelanggaran anggaran (teks), kosong kalau semua terpenuhi
+    pelanggaran = []
+    for alur, persentil, batas in anggaran:
+        statistik = hasil['total'] if alur == 'total' else hasil['alur'][alur]
+        nilai = statistik.get(f'{persentil}_ms')
+        if nilai is not None and nilai > batas:
+            pelanggaran.append(f"{alur} {persentil} {nilai:,.1f} ms > anggaran {batas:,.1f} ms")
+    return pelanggaran
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Uji beban rerun jamfix.py (AppTest) dengan beberapa sesi bersamaan")
+    parser.add_argument('--transaksi', type=int, default=TRANSAKSI_DEFAULT, help="jumlah transaksi sintetis di buku besar")
+    parser.add_argument('--sesi', type=int, default=SESI_DEFAULT, help="jumlah sesi bersamaan")
+    parser.add_argument('--ulang', type=int, default=ULANG_DEFAULT, help="jumlah alur kasir per sesi")
+    parser.add_argument('--baris-keranjang', type=int, default=BARIS_KERANJANG, help="jumlah baris keranjang per transaksi")
+    parser.add_argument('--anggaran', type=baca_anggaran, action='append', default=[], metavar='ALUR[:pXX]=MS',
+                        help="batas latensi rerun (default p95), boleh lebih dari satu")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--folder', help="folder database sintetis; database yang sudah ada dipakai ulang (default: folder sementara)")
+    parser.add_argument('--output', help="file JSON hasil (default: stdout)")
+    args = parser.parse_args(argv)
+
+    # peringatan Streamlit di setiap rerun AppTest (ScriptRunContext, deprecation) tidak relevan di sini
+    logging.disable(logging.WARNING)
+    print(f"uji beban {args.sesi} sesi x {args.ulang} alur, {args.transaksi:,} transaksi...", file=sys.stderr)
+    hasil = jalankan(args.transaksi, args.sesi, args.ulang, args.baris_keranjang, args.folder, args.seed)
+    pelanggaran = periksa_anggaran(hasil, args.anggaran)
+
+    laporan = {
+        'waktu': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'streamlit': __import__('streamlit').__version__,
+        'platform': platform.platform(),
+        'hasil': hasil,
+        'anggaran': [{'alur': a, 'persentil': p, 'batas_ms': b} for a, p, b in args.anggaran],
+        'pelanggaran': pelanggaran,
+    }
+    teks = json.dumps(laporan, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(teks + '\n')
+    else:
+        print(teks)
+    for p in pelanggaran:
+        print(f"MELAMPAUI ANGGARAN: {p}", file=sys.stderr)
+    for e in hasil['error']:
+        print(f"ERROR sesi {e['sesi']}: {e['error'][0]}", file=sys.stderr)
+    return 1 if pelanggaran or hasil['error'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())